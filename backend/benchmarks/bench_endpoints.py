@@ -0,0 +1,161 @@
+"""
+Latency percentiles and query counts of the key API endpoints at several
+data scales, written to JSON so runs on different commits can be compared.
+
+    python benchmarks/bench_endpoints.py --scales small medium
+    python benchmarks/bench_endpoints.py --compare benchmarks/results/endpoints-<old>.json
+
+Data comes from the same generator as `manage.py seed_scale`.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from harness import BACKEND_DIR, percentiles, test_database
+
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.management.commands.seed_scale import SCALES
+from core.models import Appointment, Availability, Doctor, Slot, User
+from core.services.seed import seed_scale
+
+RESULTS_DIR = BACKEND_DIR / 'benchmarks' / 'results'
+
+
+def git_revision():
+    try:
+        sha = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain'], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return sha, dirty
+
+
+def measure(client, request, repeat):
+    """Call `request(client, i)` `repeat` times; latency and query count per call"""
+    samples, queries, statuses = [], [], set()
+    for i in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request(client, i)
+            samples.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+    return {
+        **{name: round(value, 3) for name, value in percentiles(samples).items()},
+        'queries_median': statistics.median(queries),
+        'queries_max': max(queries),
+        'statuses': sorted(statuses),
+    }
+
+
+def scenarios(repeat):
+    """(name, request) pairs over the seeded data"""
+    today = timezone.localdate()
+    busiest = (
+        Appointment.objects.filter(start_date_time__date__gte=today)
+        .values('doctor').annotate(n=Count('id'))
+        .order_by('-n').values_list('doctor', flat=True).first()
+    ) or Doctor.objects.values_list('pk', flat=True).first()
+    availability = Availability.objects.filter(doctor_id=busiest, date__gte=today).first()
+    free_slots = list(
+        Slot.objects.free().filter(date__gt=today, doctor__is_approved=True)
+        .order_by('?').values_list('doctor_id', 'date', 'start_time', 'end_time')[:repeat]
+    )
+
+    def book(client, i):
+        doctor_id, date, start, end = free_slots[i % len(free_slots)]
+        return client.post(reverse('patient-appointment-list-create'), {
+            'doctor': doctor_id,
+            'start_date_time': timezone.make_aware(datetime.combine(date, start)).isoformat(),
+            'end_date_time': timezone.make_aware(datetime.combine(date, end)).isoformat(),
+        })
+
+    return [
+        ('doctors', lambda client, i: client.get(reverse('doctors-list'))),
+        ('availabilities', lambda client, i: client.get(reverse('availability-list'))),
+        ('by_doctor', lambda client, i: client.get(reverse('availability-by-doctor'), {'doctor_id': busiest})),
+        ('slots', lambda client, i: client.get(reverse('availability-slots', args=[availability.pk]))),
+        ('slot_search', lambda client, i: client.get(reverse('slot-search'))),
+        # Every approved doctor over the full 90-day window
+        ('calendar', lambda client, i: client.get(reverse('availability-calendar'))),
+        ('booking', book),
+    ]
+
+
+def run_scale(name, repeat):
+    with test_database():
+        counts = seed_scale(SCALES[name])
+        client = APIClient()
+        client.force_authenticate(User.objects.filter(role='patient').first())
+        results = {}
+        for endpoint, request in scenarios(repeat):
+            if endpoint != 'booking':
+                # One unmeasured call warms caches, as in a long-running worker
+                request(client, 0)
+            results[endpoint] = measure(client, request, repeat)
+            print(
+                f"{name:>8} {endpoint:>15}: p50 {results[endpoint]['p50']:>8.2f}ms"
+                f"  p95 {results[endpoint]['p95']:>8.2f}ms  queries {results[endpoint]['queries_median']}"
+            )
+        return {'rows': counts, 'endpoints': results}
+
+
+def compare(current, previous):
+    """Print p50 and query count changes against an earlier results file"""
+    print(f"\nAgainst {previous['commit']}:")
+    for scale, data in current['scales'].items():
+        before = previous['scales'].get(scale, {}).get('endpoints', {})
+        for endpoint, now in data['endpoints'].items():
+            if endpoint not in before:
+                continue
+            old = before[endpoint]
+            change = (now['p50'] - old['p50']) / old['p50'] * 100 if old['p50'] else 0
+            print(
+                f"{scale:>8} {endpoint:>15}: p50 {old['p50']:>8.2f} -> {now['p50']:>8.2f}ms ({change:+.0f}%)"
+                f"  queries {old['queries_median']} -> {now['queries_median']}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', nargs='+', choices=SCALES, default=['small'])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--output', help="JSON file to write (default benchmarks/results/endpoints-<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    commit, dirty = git_revision()
+    report = {
+        'commit': commit + ('-dirty' if dirty else ''),
+        'created_at': datetime.now(dt_timezone.utc).isoformat(),
+        'database': connection.vendor,
+        'repeat': args.repeat,
+        'scales': {name: run_scale(name, args.repeat) for name in args.scales},
+    }
+
+    output = args.output or RESULTS_DIR / f"endpoints-{report['commit']}.json"
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(report, json.load(handle))
+
+
+if __name__ == '__main__':
+    main()
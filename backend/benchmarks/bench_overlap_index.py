@@ -0,0 +1,101 @@
+"""
+Booking latency with the overlap index, as a doctor's history grows.
+
+A booking request runs one overlap check while validating (the index,
+or a range scan without it) and book_appointment, which keeps the
+range scan inside its transaction as the final guard. This times the check
+alone and the whole booking, end to end, with each kind of validation
+check, for 1k, 10k and 100k appointments.
+"""
+import random
+from datetime import time, timedelta
+
+from harness import percentiles, test_database, timed
+
+from django.utils import timezone
+
+from core.models import Appointment, Availability, Slot, User
+from core.services.booking import book_appointment
+from core.services.overlap_index import db_has_overlap, overlap_index
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 200
+
+
+def seed(doctor, patient, count):
+    """Half the history in the past, half ahead, one 30 min booking per hour"""
+    base = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=count // 2)
+    Appointment.objects.bulk_create(
+        (
+            Appointment(
+                doctor=doctor,
+                patient=patient,
+                start_date_time=base + timedelta(hours=i),
+                end_date_time=base + timedelta(hours=i, minutes=30),
+            )
+            for i in range(count)
+        ),
+        batch_size=5_000,
+    )
+    return base
+
+
+def free_slots(doctor, starts):
+    """A bookable slot for each start; bulk_create skips the slot sync"""
+    availability = Availability(
+        doctor=doctor, date=timezone.localdate(), start_time=time(0), end_time=time(23, 59),
+    )
+    Availability.objects.bulk_create([availability])
+    availability = Availability.objects.get(doctor=doctor)
+    slots = []
+    for start in starts:
+        local_start, local_end = timezone.localtime(start), timezone.localtime(start + timedelta(minutes=30))
+        slots.append(Slot(
+            availability=availability, doctor=doctor, date=local_start.date(),
+            start_time=local_start.time(), end_time=local_end.time(),
+        ))
+    Slot.objects.bulk_create(slots, batch_size=5_000)
+
+
+def main():
+    with test_database():
+        patient = User.objects.create_user(username="bench-patient", role="patient").patient_profile
+        print(
+            f"{'rows':>8} | {'scan check':>10} {'index check':>11} |"
+            f" {'booking, scan p50':>17} {'p95':>8} | {'booking, index p50':>18} {'p95':>8}"
+        )
+        for size in SIZES:
+            doctor = User.objects.create_user(username=f"bench-doctor-{size}", role="doctor").doctor
+            base = seed(doctor, patient, size)
+            # Free half hours in the future part of the history, one per booking
+            hours = random.sample(range(size // 2 + 1, size), 2 * REPEAT)
+            starts = [base + timedelta(hours=hour, minutes=30) for hour in hours]
+            free_slots(doctor, starts)
+            scan_starts, index_starts = iter(starts[:REPEAT]), iter(starts[REPEAT:])
+
+            def candidate():
+                start = base + timedelta(hours=random.randrange(size // 2 + 1, size), minutes=30)
+                return start, start + timedelta(minutes=30)
+
+            def book(check, starts):
+                start = next(starts)
+                end = start + timedelta(minutes=30)
+                # What AppointmentSerializer.validate runs, then the booking itself
+                check(doctor.pk, start, end)
+                book_appointment(doctor, patient, start, end)
+
+            overlap_index.forget()
+            overlap_index.intervals(doctor.pk)
+            scan_check = percentiles(timed(lambda: db_has_overlap(doctor.pk, *candidate()), REPEAT))
+            index_check = percentiles(timed(lambda: overlap_index.has_overlap(doctor.pk, *candidate()), REPEAT))
+            scan = percentiles(timed(lambda: book(db_has_overlap, scan_starts), REPEAT))
+            index = percentiles(timed(lambda: book(overlap_index.has_overlap, index_starts), REPEAT))
+
+            print(
+                f"{size:>8} | {scan_check['p50']:>8.3f}ms {index_check['p50']:>9.3f}ms |"
+                f" {scan['p50']:>15.3f}ms {scan['p95']:>6.3f}ms | {index['p50']:>16.3f}ms {index['p95']:>6.3f}ms"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Slot listing and slot validation: integer-minute grids against the
+datetime/strftime implementation they replaced.
+
+- list: the time_slots payload of one availability, marked against booked slots
+- validate: whether a requested start/end is one of the availability's slots
+"""
+import datetime as dt
+import random
+
+from harness import percentiles, timed
+
+from core.serializers.availability_serializers import format_minute
+from core.services.slot_grid import minutes, slot_grid, slot_index
+
+REPEAT = 2_000
+# (start, end, slot duration) of typical shifts
+SHIFTS = [(dt.time(9), dt.time(17), 15), (dt.time(9), dt.time(13), 30), (dt.time(8), dt.time(20), 10)]
+DATE = dt.date(2030, 1, 7)
+
+
+def legacy_slots(start_time, end_time, duration):
+    """Availability.get_time_slots before the slot grid"""
+    current = dt.datetime.combine(DATE, start_time)
+    end = dt.datetime.combine(DATE, end_time)
+    step = dt.timedelta(minutes=duration)
+    slots = []
+    while current + step <= end:
+        slots.append({'start_time': current.time().strftime('%H:%M'), 'end_time': (current + step).time().strftime('%H:%M')})
+        current += step
+    return slots
+
+
+def legacy_list(start_time, end_time, duration, booked):
+    slots = legacy_slots(start_time, end_time, duration)
+    for slot in slots:
+        start = dt.datetime.strptime(slot['start_time'], '%H:%M').time()
+        end = dt.datetime.strptime(slot['end_time'], '%H:%M').time()
+        slot['is_available'] = (start, end) not in booked
+    return slots
+
+
+def grid_list(start, end, duration, booked):
+    return [
+        {
+            'start_time': format_minute(minute),
+            'end_time': format_minute(minute + duration),
+            'is_available': (minute, minute + duration) not in booked,
+        }
+        for minute in slot_grid(start, end, duration)
+    ]
+
+
+def legacy_validate(start_time, end_time, duration, requested):
+    """Linear scan over the formatted slots, parsing each back"""
+    for slot in legacy_slots(start_time, end_time, duration):
+        start = dt.datetime.strptime(slot['start_time'], '%H:%M').time()
+        end = dt.datetime.strptime(slot['end_time'], '%H:%M').time()
+        if (start, end) == requested:
+            return True
+    return False
+
+
+def main():
+    print(f"{'shift':>18} | {'op':>8} | {'legacy p50':>11} {'grid p50':>11} | {'speedup':>7}")
+    for start_time, end_time, duration in SHIFTS:
+        start, end = minutes(start_time), minutes(end_time)
+        starts = slot_grid(start, end, duration)
+        booked_minutes = {(m, m + duration) for m in random.sample(starts, len(starts) // 3)}
+        booked_times = {
+            (dt.time(a // 60, a % 60), dt.time(b // 60, b % 60)) for a, b in booked_minutes
+        }
+
+        def requested():
+            # The last slot: the worst case for the linear scan
+            return starts[-1], starts[-1] + duration
+
+        cases = {
+            'list': (
+                lambda: legacy_list(start_time, end_time, duration, booked_times),
+                lambda: grid_list(start, end, duration, booked_minutes),
+            ),
+            'validate': (
+                lambda: legacy_validate(
+                    start_time, end_time, duration, tuple(dt.time(m // 60, m % 60) for m in requested())
+                ),
+                lambda: slot_index(start, end, duration, *requested()) is not None,
+            ),
+        }
+        assert grid_list(start, end, duration, booked_minutes) == legacy_list(start_time, end_time, duration, booked_times)
+        for op, (legacy, grid) in cases.items():
+            legacy_p50 = percentiles(timed(legacy, REPEAT))['p50']
+            grid_p50 = percentiles(timed(grid, REPEAT))['p50']
+            shift = f"{start_time:%H:%M}-{end_time:%H:%M}/{duration}m"
+            print(
+                f"{shift:>18} | {op:>8} | {legacy_p50 * 1000:>9.1f}us {grid_p50 * 1000:>9.1f}us | "
+                f"{legacy_p50 / grid_p50:>6.0f}x"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Concurrent writes against a SQLite file: default settings against the
+production mode of core.sqlite.
+
+Each worker books appointments and publishes availabilities, each write
+in a transaction that reads before it writes, as the views do.
+
+- baseline: rollback journal, deferred transactions, no pragmas
+- tuned: WAL, busy_timeout, synchronous=NORMAL, BEGIN IMMEDIATE
+- tuned+queue: one process of threads, bookings and availabilities
+  funnelled through core.services.write_queue
+
+Lock errors are writes that failed with "database is locked" after the
+booking service's own retries.
+"""
+import argparse
+import datetime as dt
+import multiprocessing
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import harness  # noqa: F401
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+from django.utils import timezone
+
+from core.models import Availability, Doctor, Patient, User
+from core.services.booking import book_appointment
+from core.services.write_queue import write_queue
+from core.sqlite import SQLITE_DEFAULTS
+
+MODES = {
+    'baseline': {'sqlite': {'ENABLED': False}, 'options': {}, 'threads': False},
+    'tuned': {'sqlite': {}, 'options': {'transaction_mode': 'IMMEDIATE'}, 'threads': False},
+    'tuned+queue': {
+        'sqlite': {'WRITE_QUEUE': True},
+        'options': {'transaction_mode': 'IMMEDIATE'},
+        'threads': True,
+    },
+}
+FIRST_DAY = dt.date(2030, 1, 7)
+# Bookable 15-minute slots per seeded availability
+SLOTS_PER_DAY = 32
+
+
+def configure(mode):
+    settings.SQLITE = {**SQLITE_DEFAULTS, **MODES[mode]['sqlite']}
+    connection.settings_dict['OPTIONS'] = dict(MODES[mode]['options'])
+
+
+def seed(workers, ops):
+    doctor = User.objects.create_user(username='doc', role='doctor').doctor
+    patients = [
+        User.objects.create_user(username=f'pat{n}', role='patient').patient_profile.pk
+        for n in range(workers)
+    ]
+    bookings = workers * ops
+    for day in range(bookings // SLOTS_PER_DAY + 1):
+        Availability.objects.create(
+            doctor=doctor, date=FIRST_DAY + dt.timedelta(days=day),
+            start_time=dt.time(9), end_time=dt.time(17), slot_duration=15,
+        )
+    return doctor.pk, patients
+
+
+def slot_start(n):
+    day = FIRST_DAY + dt.timedelta(days=n // SLOTS_PER_DAY)
+    start = dt.datetime.combine(day, dt.time(9)) + dt.timedelta(minutes=15 * (n % SLOTS_PER_DAY))
+    return timezone.make_aware(start)
+
+
+def book(doctor, patient, n):
+    start = slot_start(n)
+    book_appointment(doctor, patient, start, start + dt.timedelta(minutes=15))
+
+
+def publish(doctor, n):
+    # Past the booking calendar, one day per write
+    with transaction.atomic():
+        Availability.objects.create(
+            doctor=doctor, date=FIRST_DAY + dt.timedelta(days=1000 + n),
+            start_time=dt.time(9), end_time=dt.time(12), slot_duration=30,
+        )
+
+
+def work(worker, workers, ops, doctor_id, patient_id):
+    """Run `ops` bookings and `ops` availability writes; return (writes, lock errors)"""
+    doctor, patient = Doctor.objects.get(pk=doctor_id), Patient.objects.get(pk=patient_id)
+    writes = errors = 0
+    for i in range(ops):
+        n = i * workers + worker
+        for func, args in ((book, (doctor, patient, n)), (publish, (doctor, n))):
+            try:
+                write_queue.run(func, *args)
+                writes += 1
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                errors += 1
+    return writes, errors
+
+
+def process_worker(mode, worker, workers, ops, doctor_id, patient_id, barrier, results):
+    connections.close_all()
+    configure(mode)
+    barrier.wait()
+    results.put(work(worker, workers, ops, doctor_id, patient_id))
+    connections.close_all()
+
+
+def run_processes(mode, workers, ops, doctor_id, patients):
+    context = multiprocessing.get_context('fork')
+    barrier, results = context.Barrier(workers + 1), context.Queue()
+    processes = [
+        context.Process(
+            target=process_worker,
+            args=(mode, n, workers, ops, doctor_id, patients[n], barrier, results),
+        )
+        for n in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    started = time.perf_counter()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return outcomes, elapsed
+
+
+def run_threads(mode, workers, ops, doctor_id, patients):
+    barrier, outcomes = threading.Barrier(workers + 1), []
+
+    def thread_worker(n):
+        try:
+            barrier.wait()
+            outcomes.append(work(n, workers, ops, doctor_id, patients[n]))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=thread_worker, args=(n,)) for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return outcomes, time.perf_counter() - started
+
+
+def run(mode, workers, ops, directory):
+    configure(mode)
+    connection.settings_dict['TEST']['NAME'] = str(Path(directory) / f'{mode}.sqlite3')
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        doctor_id, patients = seed(workers, ops)
+        connections.close_all()
+        runner = run_threads if MODES[mode]['threads'] else run_processes
+        outcomes, elapsed = runner(mode, workers, ops, doctor_id, patients)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    writes = sum(w for w, _ in outcomes)
+    errors = sum(e for _, e in outcomes)
+    return writes, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent SQLite write throughput and lock errors")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=50, help="bookings and availability writes per worker")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.ops * 2} writes")
+    print(f"{'mode':>12} | {'writes':>6} {'lock errors':>11} | {'seconds':>7} {'writes/s':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in args.modes:
+            writes, errors, elapsed = run(mode, args.workers, args.ops, directory)
+            print(f"{mode:>12} | {writes:>6} {errors:>11} | {elapsed:>7.2f} {writes / elapsed:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
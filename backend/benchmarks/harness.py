@@ -0,0 +1,59 @@
+"""
+Shared bootstrap for the benchmark scripts in this folder.
+
+Run them from the backend directory, e.g.::
+
+    python benchmarks/bench_overlap_index.py
+
+Each script works on a throwaway test database, never on db.sqlite3.
+"""
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'medical_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+
+@contextmanager
+def test_database():
+    """Create a fresh test database for the duration of a benchmark"""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def timed(func, repeat):
+    """Run func `repeat` times and return the samples in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        'p50': statistics.median(ordered),
+        'p95': ordered[max(int(len(ordered) * 0.95) - 1, 0)],
+        'p99': ordered[max(int(len(ordered) * 0.99) - 1, 0)],
+        'max': ordered[-1],
+    }
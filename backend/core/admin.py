@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Doctor,Specialty,Patient,Appointment,Availability
+from django.utils import timezone
+from .models import Doctor,Specialty,Patient,Appointment,Availability,Slot,OutboxEmail
+from .services import directory_cache
 # Register your models here.
 
 @admin.register(Specialty)
@@ -40,11 +42,13 @@ class DoctorAdmin(admin.ModelAdmin):
     @admin.action(description="Approve selected doctors")
     def approve_doctors(self, request, queryset):
         updated = queryset.update(is_approved=True)
+        directory_cache.bump_version()
         self.message_user(request, f"{updated} doctor(s) approved successfully!")
 
     @admin.action(description="Block selected doctors")
     def block_doctors(self, request, queryset):
         updated = queryset.update(is_approved=False)
+        directory_cache.bump_version()
         self.message_user(request, f"{updated} doctor(s) blocked successfully!")
         
         
@@ -99,3 +103,30 @@ class AppointmentAdmin(admin.ModelAdmin):
     def get_time_range(self, obj):
         return f"{obj.start_date_time.strftime('%H:%M')} - {obj.end_date_time.strftime('%H:%M')}"
     get_time_range.short_description = 'Time Range'
+
+
+@admin.register(Slot)
+class SlotAdmin(admin.ModelAdmin):
+    list_display = ['doctor', 'date', 'start_time', 'end_time', 'is_free']
+    list_filter = ['is_free', 'date']
+    search_fields = ['doctor__user__username']
+    ordering = ['date', 'start_time']
+    list_select_related = ['doctor__user', 'doctor__specialty']
+    raw_id_fields = ['availability', 'appointment']
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'last_error']
+    ordering = ['-created_at']
+    readonly_fields = ['claimed_by', 'last_error', 'created_at', 'sent_at']
+    actions = ['retry_emails']
+
+    @admin.action(description="Retry selected emails")
+    def retry_emails(self, request, queryset):
+        updated = queryset.exclude(status=OutboxEmail.STATUS_SENT).update(
+            status=OutboxEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f"{updated} email(s) queued for retry.")
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class CoreConfig(AppConfig):
@@ -7,3 +8,8 @@ class CoreConfig(AppConfig):
     
     def ready(self):
         import core.signals
+        import core.sqlite
+        from core.db_router import check_replica_cache
+        from core.services.directory_cache import check_directory_cache
+        checks.register(check_replica_cache, checks.Tags.caches)
+        checks.register(check_directory_cache, checks.Tags.caches)
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .services.user_cache import user_cache
+
+
+# Claims MyTokenObtainPairSerializer adds so a ClaimsUser can answer without a query
+IDENTITY_CLAIMS = ('role', 'username', 'is_staff')
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from the claims of a validated access token, without a query.
+
+    id, username, role and is_staff come from the token. Any other attribute
+    (email, doctor, patient_profile, ...) loads the full User through the
+    user cache the first time it is read.
+    """
+
+    @cached_property
+    def id(self):
+        # Simple JWT stores the id claim as a string
+        return get_user_model()._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @cached_property
+    def full_user(self):
+        return load_user(self.id)
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'token':
+            raise AttributeError(name)
+        return getattr(self.full_user, name)
+
+
+def load_user(user_id):
+    try:
+        user = user_cache.get(user_id)
+    except get_user_model().DoesNotExist as error:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found") from error
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that does not look the user up on every request.
+
+    Safe requests to views with `claims_user = True` get a ClaimsUser built
+    from the token (role is embedded by MyTokenObtainPairSerializer). Every
+    other request gets the User model from the process-local user cache.
+    """
+
+    def authenticate(self, request):
+        self.request = request
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as error:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from error
+
+        view = self.request.parser_context.get('view') if self.request.parser_context else None
+        if (
+            getattr(view, 'claims_user', False)
+            and self.request.method in SAFE_METHODS
+            and all(claim in validated_token for claim in IDENTITY_CLAIMS)
+            and not api_settings.CHECK_REVOKE_TOKEN
+        ):
+            return ClaimsUser(validated_token)
+
+        user = load_user(get_user_model()._meta.pk.to_python(user_id))
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,151 @@
+"""
+Primary/replica database routing.
+
+Reads go to a replica only inside a request that ReplicaMiddleware marked
+as replica-safe: a safe method on a view with `read_replica = True`, from
+a client that has not written in the last PIN_SECONDS. Everything else goes
+to the primary:
+- writes
+- reads after a write in the same request
+- reads inside a transaction
+- reads outside requests (commands, signals, shell)
+So a client always reads its own bookings back.
+
+Replica aliases are listed in READ_REPLICAS['ALIASES']; with none, every
+query goes to the primary as before.
+
+The pin is kept in the default cache, so with several worker processes
+that cache must be shared (Redis, Memcached, database): with a
+per-process cache a client is only pinned on the worker it wrote through.
+A system check warns about that combination.
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+READ_REPLICAS_DEFAULTS = {
+    'ALIASES': [],
+    # How long a client's reads stay on the primary after it wrote; cover replication lag
+    'PIN_SECONDS': 5,
+}
+
+
+def read_replicas_setting(name):
+    return getattr(settings, 'READ_REPLICAS', {}).get(name, READ_REPLICAS_DEFAULTS[name])
+
+
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_replica_cache(app_configs=None, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if read_replicas_setting('ALIASES') and backend in PER_PROCESS_CACHES:
+        return [checks.Warning(
+            "Read replicas are enabled with a per-process cache.",
+            hint="Clients are only pinned to the primary after a write on the worker that "
+                 "served it. Use a shared cache backend with more than one worker process.",
+            id='core.W001',
+        )]
+    return []
+
+
+class RoutingState:
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+@contextmanager
+def use_primary():
+    """Send the reads of the block to the primary, e.g. to fill a shared cache"""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous, state.use_replica = state.use_replica, False
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        aliases = read_replicas_setting('ALIASES')
+        if (
+            state is None or not state.use_replica or state.wrote or not aliases
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def pin_key(request):
+    """Cache key identifying the client, or None for anonymous requests"""
+    credential = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return 'db-pin:' + hashlib.sha256(credential.encode()).hexdigest()
+
+
+class ReplicaMiddleware:
+    """
+    Mark replica-safe requests for ReplicaRouter, and pin a client to the
+    primary for PIN_SECONDS after any request of it that wrote.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and read_replicas_setting('ALIASES'):
+            key = pin_key(request)
+            if key is not None:
+                cache.set(key, True, read_replicas_setting('PIN_SECONDS'))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if (
+            request.method in SAFE_METHODS
+            and getattr(view_class, 'read_replica', False)
+            and read_replicas_setting('ALIASES')
+        ):
+            key = pin_key(request)
+            _state.get().use_replica = key is None or not cache.get(key)
+        return None
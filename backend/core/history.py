@@ -0,0 +1,41 @@
+"""
+Appointment history lists that can reach into the archive.
+
+With `?include_archived=true` a list view pages through its live
+appointments and its archived ones (core.services.archive) as one list,
+in the paginator's order. Without it only the live table is read.
+"""
+from abc import ABC, abstractmethod
+
+from .serializers.appointment_serializers import AppointmentHistorySerializer
+
+
+class ArchivedHistoryMixin(ABC):
+    """
+    For paginated appointment list views. A view using it cannot be
+    instantiated without get_archived_queryset().
+    """
+
+    def include_archived(self):
+        params = AppointmentHistorySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data['include_archived']
+
+    @abstractmethod
+    def get_archived_queryset(self):
+        """
+        The ArchivedAppointment rows the caller may see, restricted the way
+        get_queryset() restricts Appointment (same owner, none when the
+        caller has no profile). Ordering is left to the paginator.
+        """
+
+    def list(self, request, *args, **kwargs):
+        if not self.include_archived():
+            return super().list(request, *args, **kwargs)
+        querysets = [
+            self.filter_queryset(self.get_queryset()),
+            self.filter_queryset(self.get_archived_queryset()),
+        ]
+        page = self.paginate_queryset(querysets)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,79 @@
+"""
+Request-scoped identity: the authenticated user and its role profile.
+
+Views and permissions call get_identity(request) instead of probing
+`request.user.doctor` / `patient_profile`. The role comes straight from the
+user (a token claim for ClaimsUser). The profile is loaded on first use,
+together with the user, in one joined query. That is a user cache hit for
+JWT requests, so usually no query at all. The result is kept on the
+request for the rest of the request.
+"""
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+
+from .authentication import ClaimsUser
+from .services.user_cache import PROFILE_RELATIONS
+
+
+# Role -> accessor of its profile on the user
+PROFILE_ACCESSORS = {'doctor': 'doctor', 'patient': 'patient_profile'}
+
+
+def profile_cached(user, role):
+    """True if the profile of the given role is already loaded on the user"""
+    accessor = PROFILE_ACCESSORS.get(role)
+    return accessor is None or getattr(type(user), accessor).is_cached(user)
+
+
+class Identity:
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def id(self):
+        return self.user.pk
+
+    @property
+    def role(self):
+        return getattr(self.user, 'role', None)
+
+    @property
+    def is_doctor(self):
+        return self.role == 'doctor'
+
+    @property
+    def is_patient(self):
+        return self.role == 'patient'
+
+    @cached_property
+    def profiled_user(self):
+        """The user with its profiles joined"""
+        user = self.user
+        if isinstance(user, ClaimsUser):
+            user = user.full_user
+        if profile_cached(user, self.role):
+            return user
+        return get_user_model().objects.select_related(*PROFILE_RELATIONS).get(pk=user.pk)
+
+    @cached_property
+    def doctor(self):
+        """The Doctor profile, or None for other roles"""
+        if not self.is_doctor:
+            return None
+        return getattr(self.profiled_user, PROFILE_ACCESSORS['doctor'], None)
+
+    @cached_property
+    def patient(self):
+        """The Patient profile, or None for other roles"""
+        if not self.is_patient:
+            return None
+        return getattr(self.profiled_user, PROFILE_ACCESSORS['patient'], None)
+
+
+def get_identity(request):
+    """The Identity of the request's user, built once per request"""
+    identity = getattr(request, '_identity', None)
+    if identity is None or identity.user is not request.user:
+        identity = request._identity = Identity(request.user)
+    return identity
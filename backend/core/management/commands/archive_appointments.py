@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.archive import archive_appointments, archive_cutoff, archive_setting, due
+
+
+class Command(BaseCommand):
+    help = (
+        "Move appointments that ended more than --horizon-days ago to the archive table, "
+        "in batches; safe to interrupt and rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int, default=archive_setting('HORIZON_DAYS'))
+        parser.add_argument('--batch-size', type=int, default=archive_setting('BATCH_SIZE'))
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be archived.")
+
+    def handle(self, *args, **options):
+        if options['horizon_days'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--horizon-days must be >= 0 and --batch-size >= 1.")
+
+        cutoff = archive_cutoff(options['horizon_days'])
+        if options['dry_run']:
+            self.stdout.write(f"{due(cutoff).count()} appointment(s) ended before {cutoff:%Y-%m-%d %H:%M}.")
+            return
+
+        def progress(count):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Archived {count}...")
+
+        archived = archive_appointments(
+            cutoff,
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            progress=progress,
+        )
+        self.stdout.write(f"Archived {archived} appointment(s) that ended before {cutoff:%Y-%m-%d %H:%M}.")
@@ -0,0 +1,41 @@
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from core.services import appointment_export
+
+
+def date_argument(value):
+    date = parse_date(value)
+    if date is None:
+        raise ValueError(value)
+    return date
+
+
+class Command(BaseCommand):
+    help = "Stream appointments to a CSV or NDJSON file, optionally filtered by doctor and date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help="Output file, or '-' for stdout.")
+        parser.add_argument('--format', choices=appointment_export.FORMATS, default='csv')
+        parser.add_argument('--doctor', type=int, help="Doctor id.")
+        parser.add_argument('--start-date', type=date_argument, help="YYYY-MM-DD, inclusive.")
+        parser.add_argument('--end-date', type=date_argument, help="YYYY-MM-DD, inclusive.")
+        parser.add_argument('--include-archived', action='store_true', help="Add archived appointments.")
+
+    def handle(self, *args, **options):
+        start_date, end_date = options['start_date'], options['end_date']
+        if start_date and end_date and end_date < start_date:
+            raise CommandError("--end-date must not be before --start-date.")
+
+        rows = appointment_export.export_rows(options['doctor'], start_date, end_date, options['include_archived'])
+        path = options['output']
+        try:
+            output = nullcontext(self.stdout) if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f"Cannot write {path}: {e}")
+        with output as stream:
+            for piece in appointment_export.render(rows, options['format']):
+                # Every piece ends in a newline, so stdout adds no extra ending
+                stream.write(piece)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.services.token_blacklist import blacklist_filter_setting, purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted refresh tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=blacklist_filter_setting('PURGE_BATCH_SIZE'))
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(f"Deleted {deleted} expired token(s).")
@@ -0,0 +1,38 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core.services.outbox import drain_outbox, outbox_setting
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches, over one mail connection per drain."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=outbox_setting('BATCH_SIZE'))
+        parser.add_argument('--max-attempts', type=int, default=outbox_setting('MAX_ATTEMPTS'))
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep polling for new emails instead of exiting once the outbox is drained.",
+        )
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        connection = get_connection(fail_silently=False)
+        try:
+            while True:
+                sent, failed = drain_outbox(
+                    connection=connection,
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                )
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
@@ -0,0 +1,272 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Single process: values live in memory and are rendered on scrape.
+Multiple workers (gunicorn): set METRICS['MULTIPROCESS_DIR'] to a directory
+shared by the workers and cleared on deploy. Each process dumps its values
+to `<dir>/metrics-<pid>.json` at most every FLUSH_INTERVAL, with a deferred
+dump for changes made in between and a last one at exit. The scrape merges
+every file, so the numbers add up whichever worker answers the scrape.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+METRICS_DEFAULTS = {
+    'ENABLED': True,
+    'MULTIPROCESS_DIR': None,
+    # Seconds between dumps of this process' values in multiprocess mode
+    'FLUSH_INTERVAL': 1.0,
+}
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def metrics_setting(name):
+    return getattr(settings, 'METRICS', {}).get(name, METRICS_DEFAULTS[name])
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def describe(self):
+        return {'type': self.type, 'help': self.documentation, 'labelnames': list(self.labelnames)}
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.changed()
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            sample = self.values.get(key)
+            if sample is None:
+                sample = self.values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+                    break
+            sample['sum'] += value
+            sample['count'] += 1
+        self.registry.changed()
+
+    def describe(self):
+        return {**super().describe(), 'buckets': list(self.buckets)}
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._timer = None
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The parent's timer thread does not exist in the child
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    # Snapshots
+
+    def snapshot(self):
+        """JSON-friendly copy of this process' values"""
+        with self.lock:
+            return {
+                name: {
+                    **metric.describe(),
+                    'samples': [
+                        [list(key), json.loads(json.dumps(value))] for key, value in metric.values.items()
+                    ],
+                }
+                for name, metric in self.metrics.items()
+            }
+
+    def collect(self):
+        """Values of every process when in multiprocess mode, else this one"""
+        directory = metrics_setting('MULTIPROCESS_DIR')
+        if not directory:
+            return self.snapshot()
+        self.flush(force=True)
+        merged = {}
+        for path in Path(directory).glob('metrics-*.json'):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # Being replaced by its owner right now; its values show up next scrape
+                continue
+            merge_snapshot(merged, snapshot)
+        return merged
+
+    # Multiprocess mode
+
+    def changed(self):
+        if metrics_setting('MULTIPROCESS_DIR') and not self.flush():
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Dump throttled changes once the interval is up, even if no more come"""
+        with self._flush_lock:
+            if self._timer is not None:
+                return
+            delay = max(0.0, self._last_flush + metrics_setting('FLUSH_INTERVAL') - time.monotonic())
+            self._timer = threading.Timer(delay, self._deferred_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _deferred_flush(self):
+        with self._flush_lock:
+            self._timer = None
+        try:
+            self.flush(force=True)
+        except OSError:
+            # Directory cleared on deploy; the next change tries again
+            pass
+
+    def flush(self, force=False):
+        """Dump this process' values; returns False if nothing was written"""
+        directory = metrics_setting('MULTIPROCESS_DIR')
+        if not directory:
+            return False
+        with self._flush_lock:
+            now = time.monotonic()
+            if not force and now - self._last_flush < metrics_setting('FLUSH_INTERVAL'):
+                return False
+            self._last_flush = now
+            path = Path(directory) / f'metrics-{os.getpid()}.json'
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self.snapshot()))
+            os.replace(tmp, path)
+        return True
+
+    def reset(self):
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+
+
+def merge_snapshot(merged, snapshot):
+    """Add `snapshot` into `merged`: counters and histogram buckets are summed"""
+    for name, metric in snapshot.items():
+        target = merged.setdefault(name, {**metric, 'samples': []})
+        samples = {tuple(key): value for key, value in target['samples']}
+        for key, value in metric['samples']:
+            key = tuple(key)
+            current = samples.get(key)
+            if current is None:
+                samples[key] = value
+            elif metric['type'] == 'histogram':
+                samples[key] = {
+                    'buckets': [a + b for a, b in zip(current['buckets'], value['buckets'])],
+                    'sum': current['sum'] + value['sum'],
+                    'count': current['count'] + value['count'],
+                }
+            else:
+                samples[key] = current + value
+        target['samples'] = [[list(key), value] for key, value in samples.items()]
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition(collected):
+    """Render collected values in the Prometheus text format (version 0.0.4)"""
+    lines = []
+    for name, metric in sorted(collected.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric['labelnames']
+        for key, value in sorted(metric['samples'], key=lambda sample: sample[0]):
+            if metric['type'] == 'histogram':
+                cumulative = 0
+                for bound, count in zip(metric['buckets'], value['buckets']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labelnames, key, [('le', _number(float(bound)))])} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labelnames, key, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_labels(labelnames, key)} {value['count']}")
+            else:
+                lines.append(f"{name}{_labels(labelnames, key)} {_number(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+# Changes from the last interval; gunicorn's worker_exit hook does the same
+atexit.register(registry.flush, force=True)
+
+http_requests = registry.counter(
+    'http_requests_total', "HTTP requests by view, method and status.", ['view', 'method', 'status']
+)
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', "HTTP request latency by view.", ['view', 'method']
+)
+http_request_queries = registry.histogram(
+    'http_request_db_queries', "Database queries per request by view.", ['view'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+booking_validation_failures = registry.counter(
+    'booking_validation_failures_total', "Rejected bookings by reason.", ['reason']
+)
+outbox_emails = registry.counter(
+    'outbox_emails_total', "Outbox delivery attempts by result.", ['result']
+)
+outbox_send_duration = registry.histogram(
+    'outbox_email_send_seconds', "Time to hand one outbox email to the mail backend.", ['result']
+)
@@ -0,0 +1,49 @@
+import time
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .. import metrics
+
+
+class QueryCounter:
+    """connection.execute_wrapper that only counts queries"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Request count, latency and DB query count per view for /api/metrics/.
+
+    Requests are labelled with the URL name (e.g. `availability-list`), not
+    the path, so ids in URLs don't blow up the number of series.
+    Disable with METRICS = {'ENABLED': False}.
+    """
+
+    def __init__(self, get_response):
+        if not metrics.metrics_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else 'unmatched'
+        metrics.http_requests.inc(view=view, method=request.method, status=response.status_code)
+        metrics.http_request_duration.observe(elapsed, view=view, method=request.method)
+        metrics.http_request_queries.observe(counter.count, view=view)
+        return response
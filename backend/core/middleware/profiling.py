@@ -0,0 +1,110 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('core.profiling')
+
+PROFILING_DEFAULTS = {
+    'ENABLED': False,
+    # Same SQL shape run more than this many times in one request is an N+1
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'RESPONSE_HEADERS': True,
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+def profiling_setting(name):
+    return getattr(settings, 'SQL_PROFILING', {}).get(name, PROFILING_DEFAULTS[name])
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """SQL shape with literals and IN-list lengths normalized away"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryProfiler:
+    """connection.execute_wrapper that records every query of a request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.examples = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            shape = fingerprint(sql)
+            self.shapes[shape] += 1
+            self.examples.setdefault(shape, sql)
+
+    def repeated(self, threshold):
+        """[(count, shape)] for shapes run more than `threshold` times"""
+        return [(count, shape) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+class SQLProfilingMiddleware:
+    """
+    Per-request query count, DB time and N+1 detection.
+
+    Enable with SQL_PROFILING = {'ENABLED': True}. When disabled the
+    middleware removes itself from the chain at startup, so it costs nothing.
+    Results go to X-DB-* response headers and a JSON line on the
+    `core.profiling` logger (WARNING when an N+1 is found).
+    """
+
+    def __init__(self, get_response):
+        if not profiling_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = profiling_setting('N_PLUS_ONE_THRESHOLD')
+        self.headers = profiling_setting('RESPONSE_HEADERS')
+
+    def __call__(self, request):
+        profiler = QueryProfiler()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(profiler))
+            response = self.get_response(request)
+
+        repeated = profiler.repeated(self.threshold)
+        db_time_ms = round(profiler.duration * 1000, 2)
+
+        if self.headers:
+            response['X-DB-Query-Count'] = str(profiler.count)
+            response['X-DB-Time-Ms'] = str(db_time_ms)
+            response['X-DB-N-Plus-One'] = str(len(repeated))
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profiler.count,
+            'db_time_ms': db_time_ms,
+            'n_plus_one': [
+                {'count': count, 'sql': profiler.examples[shape]} for count, shape in repeated
+            ],
+        }
+        logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(record))
+        return response
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:47
+
+from datetime import datetime, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_slots(apps, schema_editor):
+    Availability = apps.get_model('core', 'Availability')
+    Appointment = apps.get_model('core', 'Appointment')
+    Slot = apps.get_model('core', 'Slot')
+
+    booked = {}
+    for appointment in Appointment.objects.all():
+        start = timezone.localtime(appointment.start_date_time)
+        end = timezone.localtime(appointment.end_date_time)
+        booked[(appointment.doctor_id, start.date(), start.time(), end.time())] = appointment.pk
+
+    slots = []
+    for availability in Availability.objects.exclude(date=None):
+        current_dt = datetime.combine(availability.date, availability.start_time)
+        end_dt = datetime.combine(availability.date, availability.end_time)
+        step = timedelta(minutes=availability.slot_duration)
+        while current_dt + step <= end_dt:
+            start, end = current_dt.time(), (current_dt + step).time()
+            appointment_id = booked.pop((availability.doctor_id, availability.date, start, end), None)
+            slots.append(Slot(
+                availability=availability,
+                doctor_id=availability.doctor_id,
+                date=availability.date,
+                start_time=start,
+                end_time=end,
+                is_free=appointment_id is None,
+                appointment_id=appointment_id,
+            ))
+            current_dt += step
+    Slot.objects.bulk_create(slots, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_availability_options_availability_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Slot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('is_free', models.BooleanField(default=True)),
+                ('appointment', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slot', to='core.appointment')),
+                ('availability', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='core.availability')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='core.doctor')),
+            ],
+            options={
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['date', 'is_free'], name='slot_date_free_idx')],
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'date', 'start_time'), name='slot_doctor_date_start_uniq')],
+            },
+        ),
+        migrations.RunPython(create_slots, migrations.RunPython.noop),
+    ]
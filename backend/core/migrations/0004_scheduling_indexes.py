@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_slot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'start_date_time', 'end_date_time'], name='appt_doctor_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'start_date_time'], name='appt_patient_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['date', 'start_time'], name='avail_date_start_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:54
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_double_bookings(apps, schema_editor):
+    """Stop with a list of the double bookings the constraint would reject"""
+    Appointment = apps.get_model('core', 'Appointment')
+    duplicates = list(
+        Appointment.objects.using(schema_editor.connection.alias)
+        .values('doctor_id', 'start_date_time')
+        .annotate(n=Count('id'))
+        .filter(n__gt=1)
+        .order_by('doctor_id', 'start_date_time')
+    )
+    if duplicates:
+        listed = '\n'.join(
+            f"  doctor {row['doctor_id']} at {row['start_date_time']}: {row['n']} appointments"
+            for row in duplicates
+        )
+        raise RuntimeError(
+            "Cannot add appt_doctor_start_uniq: these doctors are double booked.\n"
+            f"{listed}\n"
+            "Move or cancel all but one appointment of each, then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_outbox_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(fields=('doctor', 'start_date_time'), name='appt_doctor_start_uniq'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_appointment_doctor_start_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['start_date_time'], name='appt_start_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_appointment_start_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_date_time', models.DateTimeField()),
+                ('end_date_time', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='core.doctor')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='core.patient')),
+            ],
+            options={
+                'ordering': ['start_date_time'],
+                'indexes': [models.Index(fields=['doctor', 'start_date_time'], name='archive_doctor_start_idx'), models.Index(fields=['patient', 'start_date_time'], name='archive_patient_start_idx')],
+            },
+        ),
+    ]
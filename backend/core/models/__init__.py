@@ -4,5 +4,8 @@ from .patient import Patient
 from .specialty import Specialty
 from .appointment import Appointment
 from .availability import Availability
+from .slot import Slot
+from .outbox import OutboxEmail
+from .archived_appointment import ArchivedAppointment
 
-__all__ = ['User', 'Doctor', 'Patient','Specialty','Appointment','Availability']
\ No newline at end of file
+__all__ = ['User', 'Doctor', 'Patient','Specialty','Appointment','Availability','Slot','OutboxEmail','ArchivedAppointment']
\ No newline at end of file
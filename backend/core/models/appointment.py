@@ -51,13 +51,21 @@ class Appointment(models.Model):
             raise ValidationError("Appointment is outside doctor's availability")
 
         # Overlapping check
-        overlapping = Appointment.objects.filter(
-            doctor=self.doctor,
-            start_date_time__lt=self.end_date_time,
-            end_date_time__gt=self.start_date_time
-        ).exclude(pk=self.pk)
-        if overlapping.exists():
+        from core.services.overlap_index import overlap_index
+        if overlap_index.has_overlap(self.doctor_id, self.start_date_time, self.end_date_time, exclude=self.pk):
             raise ValidationError("This doctor already has an appointment in this time range")
 
     class Meta:
         ordering = ['start_date_time']
+        constraints = [
+            # Last line of defence against double booking under concurrency
+            models.UniqueConstraint(fields=['doctor', 'start_date_time'], name='appt_doctor_start_uniq'),
+        ]
+        indexes = [
+            # Overlap checks: doctor + time range
+            models.Index(fields=['doctor', 'start_date_time', 'end_date_time'], name='appt_doctor_range_idx'),
+            # Patient appointment list
+            models.Index(fields=['patient', 'start_date_time'], name='appt_patient_start_idx'),
+            # Exports across all doctors by date range
+            models.Index(fields=['start_date_time'], name='appt_start_idx'),
+        ]
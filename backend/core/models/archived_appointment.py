@@ -0,0 +1,36 @@
+from django.db import models
+from core.models.doctor import Doctor
+from core.models.patient import Patient
+
+
+class ArchivedAppointment(models.Model):
+    """
+    A past appointment moved out of the Appointment table by the
+    `archive_appointments` command. It keeps its original id, so history
+    can list both tables together without clashes.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='archived_appointments')
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='archived_appointments')
+    start_date_time = models.DateTimeField()
+    end_date_time = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def duration(self):
+        return self.end_date_time - self.start_date_time
+
+    @property
+    def date(self):
+        return self.start_date_time.date()
+
+    def __str__(self):
+        return f"{self.patient} - {self.start_date_time:%Y-%m-%d %H:%M} to {self.end_date_time:%H:%M} (archived)"
+
+    class Meta:
+        ordering = ['start_date_time']
+        indexes = [
+            # Doctor and patient history lists
+            models.Index(fields=['doctor', 'start_date_time'], name='archive_doctor_start_idx'),
+            models.Index(fields=['patient', 'start_date_time'], name='archive_patient_start_idx'),
+        ]
@@ -1,8 +1,8 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from datetime import datetime, timedelta
 from ..models.doctor import Doctor
+from ..services.slot_grid import minutes, slot_grid, to_time
 
 
 class Availability(models.Model):
@@ -15,6 +15,10 @@ class Availability(models.Model):
     class Meta:
         ordering = ['date', 'start_time']
         unique_together = ['doctor', 'date', 'start_time']
+        indexes = [
+            # Upcoming availabilities listing
+            models.Index(fields=['date', 'start_time'], name='avail_date_start_idx'),
+        ]
 
     def __str__(self):
         return f"Dr. {self.doctor.user.username} - {self.date} ({self.start_time}-{self.end_time})"
@@ -53,32 +57,14 @@ class Availability(models.Model):
     @property
     def duration_minutes(self):
         """Calculate total duration in minutes"""
-        start_dt = datetime.combine(self.date, self.start_time)
-        end_dt = datetime.combine(self.date, self.end_time)
-        return int((end_dt - start_dt).total_seconds() / 60)
+        return minutes(self.end_time) - minutes(self.start_time)
 
-    def get_time_slots(self):
-        """Generate all possible time slots based on slot_duration"""
-        slots = []
-        current_time = self.start_time
-        
-        while True:
-            # Calculate end time for this slot
-            current_dt = datetime.combine(self.date, current_time)
-            slot_end_dt = current_dt + timedelta(minutes=self.slot_duration)
-            slot_end_time = slot_end_dt.time()
-            
-            # If slot end time exceeds availability end time, break
-            if slot_end_time > self.end_time:
-                break
-            
-            slots.append({
-                'start_time': current_time.strftime('%H:%M'),
-                'end_time': slot_end_time.strftime('%H:%M'),
-            })
-            
-            # Move to next slot
-            current_dt = slot_end_dt
-            current_time = current_dt.time()
-        
-        return slots
\ No newline at end of file
+    @property
+    def slot_starts(self):
+        """Start minutes (after midnight) of every slot, see core.services.slot_grid"""
+        return slot_grid(minutes(self.start_time), minutes(self.end_time), self.slot_duration)
+
+    def iter_slot_bounds(self):
+        """Yield (start_time, end_time) pairs for every slot based on slot_duration"""
+        for start in self.slot_starts:
+            yield to_time(start), to_time(start + self.slot_duration)
@@ -0,0 +1,71 @@
+from django.db import models
+from django.utils import timezone
+from core.models.appointment import Appointment
+from core.models.availability import Availability
+from core.models.doctor import Doctor
+
+
+class SlotQuerySet(models.QuerySet):
+
+    def free(self):
+        return self.filter(is_free=True)
+
+    def for_range(self, doctor, start_date_time, end_date_time):
+        """Slot matching an appointment's start/end exactly"""
+        start = timezone.localtime(start_date_time)
+        end = timezone.localtime(end_date_time)
+        return self.filter(
+            doctor=doctor,
+            date=start.date(),
+            start_time=start.time(),
+            end_time=end.time(),
+        )
+
+    def claim(self, slot):
+        """
+        Compare-and-set a free slot to booked. Only one concurrent caller
+        gets True; the UPDATE also takes the write lock on SQLite.
+        """
+        return bool(self.filter(pk=slot.pk, is_free=True).update(is_free=False))
+
+    def book(self, slot, appointment):
+        """
+        Link an appointment to a slot that is free or claimed but not yet
+        linked; returns False if another appointment holds it
+        """
+        return bool(
+            self.filter(pk=slot.pk, appointment__isnull=True).update(is_free=False, appointment=appointment)
+        )
+
+    def release(self, appointment):
+        return self.filter(appointment=appointment).update(is_free=True, appointment=None)
+
+
+class Slot(models.Model):
+    """A single bookable slot, materialized from an Availability"""
+    availability = models.ForeignKey(Availability, on_delete=models.CASCADE, related_name='slots')
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='slots')
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    is_free = models.BooleanField(default=True)
+    appointment = models.OneToOneField(
+        Appointment, on_delete=models.SET_NULL, null=True, blank=True, related_name='slot'
+    )
+
+    objects = SlotQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['date', 'start_time']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['doctor', 'date', 'start_time'], name='slot_doctor_date_start_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'is_free'], name='slot_date_free_idx'),
+        ]
+
+    def __str__(self):
+        state = "free" if self.is_free else "booked"
+        return f"{self.date} {self.start_time:%H:%M}-{self.end_time:%H:%M} ({state})"
@@ -0,0 +1,145 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite key.
+
+    The cursor holds the ordering values of the last row served, and the next
+    page is fetched with a `WHERE key > cursor` filter instead of an OFFSET,
+    so pages stay stable while rows are inserted and no COUNT(*) is issued.
+    `ordering` must end with a unique field to break ties.
+
+    A list of querysets with the same ordering fields (e.g. live and archived
+    appointments) pages as their union: each is cut at the cursor and the
+    pieces are merged. The ordering must then run in a single direction.
+
+    A row with a null ordering value has no place after a cursor, so such
+    rows are left out of the pages.
+    """
+    ordering = ('id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+        max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except (TypeError, ValueError):
+            pass
+        return max(1, min(page_size, max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        querysets = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+        position = self.decode_cursor(request, querysets[0].model)
+        rows = []
+        for queryset in querysets:
+            queryset = self.without_null_keys(queryset).order_by(*self.ordering)
+            if position is not None:
+                queryset = queryset.filter(self.after(position))
+            rows.extend(queryset[:self.page_size + 1])
+        if len(querysets) > 1:
+            rows.sort(key=self.get_position, reverse=self.ordering[0].startswith('-'))
+
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    # Keys
+
+    @property
+    def fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def without_null_keys(self, queryset):
+        nullable = [name for name in self.fields if queryset.model._meta.get_field(name).null]
+        return queryset.filter(**{f'{name}__isnull': False for name in nullable})
+
+    def get_position(self, row):
+        return [getattr(row, name) for name in self.fields]
+
+    def after(self, position):
+        """Rows strictly after `position` in `ordering` order"""
+        clauses = []
+        for i, name in enumerate(self.ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            equal = {f: v for f, v in zip(self.fields[:i], position[:i])}
+            clauses.append(Q(**equal, **{f'{field}__{lookup}': position[i]}))
+        return reduce(or_, clauses)
+
+    # Cursor encoding
+
+    def encode_cursor(self, position):
+        values = [v.isoformat() if hasattr(v, 'isoformat') else v for v in position]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+            if any(value is None for value in position):
+                raise ValueError
+            return position
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class AvailabilityCursorPagination(KeysetPagination):
+    ordering = ('date', 'start_time', 'id')
+
+
+class AppointmentCursorPagination(KeysetPagination):
+    ordering = ('start_date_time', 'id')
+
+
+class RecentAppointmentCursorPagination(KeysetPagination):
+    ordering = ('-start_date_time', '-id')
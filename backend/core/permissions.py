@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .identity import get_identity
 
 class IsDoctor(permissions.BasePermission):
     """
@@ -7,6 +8,20 @@ class IsDoctor(permissions.BasePermission):
 
     def has_permission(self, request, view):
         return bool(
-            request.user and  
-            request.user.role == 'doctor'
+            request.user and
+            request.user.is_authenticated and
+            get_identity(request).is_doctor
+        )
+
+
+class IsAdmin(permissions.BasePermission):
+    """
+    Allow only users with role='admin' (or Django staff) to access the view.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(
+            user and user.is_authenticated and
+            (get_identity(request).role == 'admin' or user.is_staff)
         )
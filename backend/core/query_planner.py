@@ -0,0 +1,192 @@
+"""
+Derive select_related / prefetch_related / only() from a serializer.
+
+Every read-only field's source path is walked through the model:
+- forward foreign keys and one-to-ones become select_related
+- reverse and many-to-many relations become prefetch_related
+- the plain columns that are reached become only()
+
+Anything the planner cannot see through loads its whole model. That
+covers model properties such as Appointment.duration, `source='*'`
+fields and SerializerMethodFields. A serializer can list what its method
+fields read in `Meta.related_sources`, as dotted paths:
+
+    class Meta:
+        related_sources = ['user.username', 'specialty.name']
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+LOOKUP_SEP = '__'
+
+
+def join(prefix, name):
+    return f'{prefix}{LOOKUP_SEP}{name}' if prefix else name
+
+
+def get_field(model, attr):
+    """Model field by name, or reverse relation by accessor (e.g. appointment_set)"""
+    try:
+        return model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        for relation in model._meta.related_objects:
+            if relation.get_accessor_name() == attr:
+                return relation
+        raise
+
+
+def nested_serializer(field):
+    """The child serializer of a nested field, or None"""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+class QueryPlan:
+
+    def __init__(self, model):
+        self.model = model
+        self.select_related = set()
+        self.prefetch_related = set()
+        self.only = set()
+        # prefix -> model of levels that must load every column
+        self.full = {}
+
+    def apply(self, queryset, restrict_columns=True, extra_columns=()):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(self.prefetch_related))
+        if restrict_columns:
+            queryset = queryset.only(*self.columns(extra_columns))
+        return queryset
+
+    def columns(self, extra=()):
+        columns = set(self.only) | set(extra)
+        for prefix, model in self.full.items():
+            columns.update(
+                join(prefix, field.name) for field in model._meta.concrete_fields
+            )
+        return sorted(columns)
+
+    # Building
+
+    def add_serializer(self, serializer, model, prefix='', prefetched=False):
+        hints = getattr(getattr(serializer, 'Meta', None), 'related_sources', None)
+        for path in hints or ():
+            self.add_source(model, prefix, path.split('.'), None, prefetched)
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            child = nested_serializer(field)
+            if isinstance(field, serializers.SerializerMethodField):
+                if hints is None:
+                    self.load_fully(model, prefix, prefetched)
+            elif field.source == '*':
+                if child is not None:
+                    self.add_serializer(child, model, prefix, prefetched)
+                else:
+                    self.load_fully(model, prefix, prefetched)
+            else:
+                self.add_source(model, prefix, field.source_attrs, field, prefetched)
+
+    def add_source(self, model, prefix, attrs, field, prefetched):
+        for position, attr in enumerate(attrs):
+            last = position == len(attrs) - 1
+            if attr == 'pk':
+                attr = model._meta.pk.name
+            try:
+                model_field = get_field(model, attr)
+            except FieldDoesNotExist:
+                # Property or method: no telling which columns it reads
+                self.load_fully(model, prefix, prefetched)
+                return
+
+            # Plain columns, including foreign keys read by attname (doctor_id)
+            by_attname = attr != model_field.name and attr == getattr(model_field, 'attname', None)
+            if not model_field.is_relation or by_attname:
+                self.add_column(join(prefix, model_field.name), prefetched)
+                return
+
+            single = model_field.many_to_one or model_field.one_to_one
+            related_pk = model_field.related_model._meta.pk.name
+            pk_only = last and isinstance(field, (RelatedField, ManyRelatedField))
+            if single and model_field.concrete and attrs[position + 1:] in (['pk'], [related_pk]):
+                pk_only = True
+            if pk_only:
+                # Only the related primary key is rendered: the foreign key column is enough
+                if single and model_field.concrete:
+                    self.add_column(join(prefix, model_field.name), prefetched)
+                else:
+                    self.prefetch_related.add(join(prefix, attr))
+                return
+
+            path = join(prefix, attr)
+            if single and not prefetched:
+                if model_field.concrete:
+                    self.add_column(path, prefetched)
+                self.select_related.add(path)
+            else:
+                self.prefetch_related.add(path)
+                prefetched = True
+            model, prefix = model_field.related_model, path
+
+            if last:
+                child = nested_serializer(field) if field is not None else None
+                if child is not None:
+                    self.add_serializer(child, model, prefix, prefetched)
+                else:
+                    # The related object itself, e.g. through __str__
+                    self.load_fully(model, prefix, prefetched)
+
+    def add_column(self, path, prefetched):
+        # Columns of prefetched rows are loaded by their own query
+        if not prefetched:
+            self.only.add(path)
+
+    def load_fully(self, model, prefix, prefetched):
+        if not prefetched:
+            self.full[prefix] = model
+
+
+_plans = {}
+
+
+def plan_for(serializer_class, model):
+    """The QueryPlan of a serializer class, built once per process"""
+    key = (serializer_class, model)
+    if key not in _plans:
+        plan = QueryPlan(model)
+        plan.add_serializer(serializer_class(), model)
+        _plans[key] = plan
+    return _plans[key]
+
+
+class QueryPlannerMixin:
+    """
+    Apply the serializer's QueryPlan to querysets of a DRF view.
+
+    Generic views get it through filter_queryset(), which list, retrieve,
+    update and destroy run on get_queryset(). Custom actions call
+    plan_queryset() with the serializer they render. Column restriction
+    only applies to safe methods, so writes still save full instances.
+    """
+
+    def filter_queryset(self, queryset):
+        return self.plan_queryset(super().filter_queryset(queryset))
+
+    def plan_queryset(self, queryset, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        plan = plan_for(serializer_class, queryset.model)
+        # Keyset pagination reads its ordering columns from the last row
+        ordering = [name.lstrip('-') for name in getattr(getattr(self, 'paginator', None), 'ordering', ())]
+        return plan.apply(
+            queryset,
+            restrict_columns=self.request.method in SAFE_METHODS,
+            extra_columns=[name for name in ordering if LOOKUP_SEP not in name],
+        )
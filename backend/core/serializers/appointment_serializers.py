@@ -1,9 +1,16 @@
-from django.core.mail import send_mail
-from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
 from rest_framework import serializers
+from core import metrics
 from core.models.appointment import Appointment
-from datetime import datetime, timedelta
+from core.models.availability import Availability
+from core.models.slot import Slot
+from core.services.overlap_index import overlap_index
+from core.services.booking import book_appointment, reschedule_appointment
+from core.services.write_queue import write_queue
+from core.services.outbox import enqueue_email
+from core.services import appointment_export
+from core.identity import get_identity
 
 
 class AppointmentSerializer(serializers.ModelSerializer):
@@ -26,6 +33,8 @@ class AppointmentSerializer(serializers.ModelSerializer):
             'date',
         ]
         read_only_fields = ['duration', 'date', 'patient_name', 'doctor_name', 'specialty', 'patient']
+        # Double booking is reported by validate() and enforced by the booking service
+        validators = []
 
     def validate(self, data):
         """
@@ -38,81 +47,96 @@ class AppointmentSerializer(serializers.ModelSerializer):
 
         # Basic time validation
         if start >= end:
-            raise serializers.ValidationError("Start time must be before end time.")
+            raise self.reject('invalid_range', "Start time must be before end time.")
         if start < timezone.now():
-            raise serializers.ValidationError("Appointment must be scheduled in the future.")
-
-        # Get the date and times
-        appointment_date = start.date()
-        appointment_start_time = start.time()
-        appointment_end_time = end.time()
-
-        # Check if doctor has availability for this date and time
-        from core.models.availability import Availability
-        
-        availabilities = Availability.objects.filter(
-            doctor=doctor,
-            date=appointment_date,
-            start_time__lte=appointment_start_time,
-            end_time__gte=appointment_end_time
-        )
-
-        if not availabilities.exists():
-            raise serializers.ValidationError(
-                "The doctor is not available at this date and time. "
-                "Please check the doctor's availability schedule."
-            )
-
-        # Verify the appointment matches a valid time slot
-        availability = availabilities.first()
-        valid_slot = False
-        
-        for slot in availability.get_time_slots():
-            slot_start = datetime.strptime(slot['start_time'], '%H:%M').time()
-            slot_end = datetime.strptime(slot['end_time'], '%H:%M').time()
-            
-            if appointment_start_time == slot_start and appointment_end_time == slot_end:
-                valid_slot = True
-                break
-
-        if not valid_slot:
-            raise serializers.ValidationError(
+            raise self.reject('in_past', "Appointment must be scheduled in the future.")
+
+        # Look up the materialized slot matching the requested time
+        slot = Slot.objects.for_range(doctor, start, end).first()
+
+        if slot is None:
+            appointment_date = start.date()
+            available = Availability.objects.filter(
+                doctor=doctor,
+                date=appointment_date,
+                start_time__lte=start.time(),
+                end_time__gte=end.time()
+            ).exists()
+            if not available:
+                raise self.reject(
+                    'doctor_unavailable',
+                    "The doctor is not available at this date and time. "
+                    "Please check the doctor's availability schedule."
+                )
+            raise self.reject(
+                'slot_mismatch',
                 f"The selected time does not match the doctor's available time slots. "
                 f"Please select a valid slot from the doctor's schedule."
             )
 
+        if not slot.is_free and (self.instance is None or slot.appointment_id != self.instance.pk):
+            raise self.reject(
+                'slot_booked',
+                "This time slot is already booked. Please choose another time."
+            )
+
         # Check for overlapping appointments
-        overlapping = Appointment.objects.filter(
-            doctor=doctor,
-            start_date_time__lt=end,
-            end_date_time__gt=start
-        )
-        if self.instance:
-            overlapping = overlapping.exclude(pk=self.instance.pk)
-        
-        if overlapping.exists():
-            raise serializers.ValidationError(
+        exclude = self.instance.pk if self.instance else None
+        if overlap_index.has_overlap(doctor.pk, start, end, exclude=exclude):
+            raise self.reject(
+                'overlap',
                 "This time slot is already booked. Please choose another time."
             )
 
         # Security: prevent users from modifying appointments they don't own
         request = self.context.get('request')
         if request and self.instance:
-            if request.user != self.instance.patient.user:
-                raise serializers.ValidationError(
+            patient = get_identity(request).patient
+            if patient is None or self.instance.patient_id != patient.pk:
+                raise self.reject(
+                    'not_owner',
                     "You are not authorized to modify this appointment."
                 )
 
         return data
 
+    def reject(self, reason, message):
+        """Count a rejected booking by reason and build the error to raise"""
+        metrics.booking_validation_failures.inc(reason=reason)
+        return serializers.ValidationError(message)
+
     def create(self, validated_data):
-        """Create appointment and send confirmation emails"""
-        appointment = super().create(validated_data)
-        self.send_confirmation_email(appointment)
-        return appointment
+        """Book the slot and queue confirmation emails in the same transaction"""
+        try:
+            return write_queue.run(
+                book_appointment,
+                validated_data['doctor'],
+                validated_data['patient'],
+                validated_data['start_date_time'],
+                validated_data['end_date_time'],
+                after_booking=self.queue_confirmation_email,
+            )
+        except DjangoValidationError as error:
+            # Lost a race for the slot after validation passed
+            metrics.booking_validation_failures.inc(reason='booking_conflict')
+            raise serializers.ValidationError(error.messages)
+
+    def update(self, instance, validated_data):
+        """Move the appointment through the booking service's slot claim"""
+        try:
+            return write_queue.run(
+                reschedule_appointment,
+                instance,
+                validated_data.get('doctor', instance.doctor),
+                validated_data.get('start_date_time', instance.start_date_time),
+                validated_data.get('end_date_time', instance.end_date_time),
+            )
+        except DjangoValidationError as error:
+            metrics.booking_validation_failures.inc(reason='booking_conflict')
+            raise serializers.ValidationError(error.messages)
 
-    def send_confirmation_email(self, appointment):
-        """Send confirmation email to both patient and doctor"""
+    def queue_confirmation_email(self, appointment):
+        """Queue confirmation email to both patient and doctor in the outbox"""
         doctor_email = appointment.doctor.user.email
         patient_email = appointment.patient.user.email
 
@@ -126,13 +150,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
         )
 
         if doctor_email and patient_email:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[patient_email, doctor_email],
-                fail_silently=True,
-            )
+            enqueue_email(subject, message, [patient_email, doctor_email])
 
 
 class AppointmentCreateSerializer(serializers.ModelSerializer):
@@ -149,4 +167,24 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
     def validate(self, data):
         # Use the same validation as AppointmentSerializer
         serializer = AppointmentSerializer(context=self.context)
-        return serializer.validate(data)
\ No newline at end of file
+        return serializer.validate(data)
+
+
+class AppointmentExportSerializer(serializers.Serializer):
+    """Query parameters of the appointment export"""
+    # Not `format`: DRF reserves it for content negotiation
+    export_format = serializers.ChoiceField(choices=list(appointment_export.FORMATS), default='csv')
+    doctor = serializers.IntegerField(required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    include_archived = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data.get('start_date') and data.get('end_date') and data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("end_date must not be before start_date.")
+        return data
+
+
+class AppointmentHistorySerializer(serializers.Serializer):
+    """Query parameters of appointment history lists"""
+    include_archived = serializers.BooleanField(default=False)
@@ -1,5 +1,25 @@
+from django.db import models
 from rest_framework import serializers
 from ..models.availability import Availability
+from ..services.slots import BookedSlotIndex
+from ..services.slot_grid import minutes
+from ..services.availability_bulk import expand_template
+from .slot_serializers import SlotSearchSerializer
+
+
+def format_minute(minute):
+    """'HH:MM' of a minute after midnight"""
+    return f'{minute // 60:02d}:{minute % 60:02d}'
+
+
+def format_slots(availability):
+    return [
+        {
+            'start_time': format_minute(start),
+            'end_time': format_minute(start + availability.slot_duration),
+        }
+        for start in availability.slot_starts
+    ]
 
 
 class AvailabilitySerializer(serializers.ModelSerializer):
@@ -24,7 +44,7 @@ class AvailabilitySerializer(serializers.ModelSerializer):
 
     def get_time_slots(self, obj):
         """Get all time slots for this availability"""
-        return obj.get_time_slots()
+        return format_slots(obj)
 
 
 class AvailabilityCreateSerializer(serializers.ModelSerializer):
@@ -43,16 +63,83 @@ class AvailabilityCreateSerializer(serializers.ModelSerializer):
         """Additional validation"""
         # Check if date is not in the past
         from django.utils import timezone
-        if data['date'] < timezone.now().date():
+        # PATCH sends only some fields; compare against the stored ones
+        def value(field):
+            return data[field] if field in data else getattr(self.instance, field)
+
+        if value('date') < timezone.now().date():
             raise serializers.ValidationError("Cannot create availability for past dates.")
         
         # Check if end_time is after start_time
-        if data['end_time'] <= data['start_time']:
+        if value('end_time') <= value('start_time'):
             raise serializers.ValidationError("End time must be after start time.")
         
         return data
 
 
+class AvailabilityItemSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    slot_duration = serializers.IntegerField(default=30)
+
+
+class WeeklyTemplateItemSerializer(serializers.Serializer):
+    weekday = serializers.IntegerField(min_value=0, max_value=6, help_text="0 = Monday ... 6 = Sunday")
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    slot_duration = serializers.IntegerField(default=30)
+
+
+class AvailabilityBulkCreateSerializer(serializers.Serializer):
+    """
+    Either an explicit list of `items`, or a weekly `template` repeated
+    between `start_date` and `end_date`
+    """
+    MAX_RANGE_DAYS = 366
+    # Per request, whether listed or expanded from the template
+    MAX_ITEMS = 1000
+
+    items = AvailabilityItemSerializer(many=True, required=False, max_length=MAX_ITEMS)
+    template = WeeklyTemplateItemSerializer(many=True, required=False, max_length=50)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    skip_invalid = serializers.BooleanField(
+        default=False, help_text="Create the valid items and report the rest instead of rejecting the request"
+    )
+
+    def validate(self, data):
+        if bool(data.get('items')) == bool(data.get('template')):
+            raise serializers.ValidationError("Provide either items or template.")
+
+        if data.get('template'):
+            start_date, end_date = data.get('start_date'), data.get('end_date')
+            if not start_date or not end_date:
+                raise serializers.ValidationError("start_date and end_date are required with a template.")
+            if end_date < start_date:
+                raise serializers.ValidationError("end_date must not be before start_date.")
+            if (end_date - start_date).days >= self.MAX_RANGE_DAYS:
+                raise serializers.ValidationError(f"The date range cannot exceed {self.MAX_RANGE_DAYS} days.")
+            data['items'] = expand_template(data['template'], start_date, end_date)
+            if len(data['items']) > self.MAX_ITEMS:
+                raise serializers.ValidationError(
+                    f"The template expands to {len(data['items'])} items; at most {self.MAX_ITEMS} are allowed."
+                )
+        return data
+
+
+class BookedSlotListSerializer(serializers.ListSerializer):
+    """Resolve booked slots for the whole page with a single query"""
+
+    def to_representation(self, data):
+        iterable = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.booked_index = BookedSlotIndex.for_availabilities(iterable)
+        try:
+            return super().to_representation(iterable)
+        finally:
+            self.child.booked_index = None
+
+
 class DoctorAvailabilityListSerializer(serializers.ModelSerializer):
     """Serializer for listing all availabilities with doctor info"""
     doctor_id = serializers.IntegerField(source='doctor.id', read_only=True)
@@ -60,8 +147,11 @@ class DoctorAvailabilityListSerializer(serializers.ModelSerializer):
     specialty = serializers.CharField(source='doctor.specialty.name', read_only=True)
     time_slots = serializers.SerializerMethodField()
 
+    booked_index = None
+
     class Meta:
         model = Availability
+        list_serializer_class = BookedSlotListSerializer
         fields = [
             "id",
             "doctor_id",
@@ -76,39 +166,32 @@ class DoctorAvailabilityListSerializer(serializers.ModelSerializer):
 
     def get_time_slots(self, obj):
         """Get available time slots (not already booked)"""
-        from ..models.appointment import Appointment
         from django.utils import timezone
-        import datetime
 
-        all_slots = obj.get_time_slots()
-        
-        # Get all booked appointments for this availability
-        booked_appointments = Appointment.objects.filter(
-            doctor=obj.doctor,
-            start_date_time__date=obj.date
-        )
-        
-        # Mark slots as available or booked
-        for slot in all_slots:
-            slot_start_str = slot['start_time']
-            slot_end_str = slot['end_time']
-            
-            # Convert to datetime for comparison
-            slot_start = datetime.datetime.strptime(slot_start_str, '%H:%M').time()
-            slot_end = datetime.datetime.strptime(slot_end_str, '%H:%M').time()
-            
-            # Check if this slot is booked
-            is_booked = booked_appointments.filter(
-                start_date_time__time=slot_start,
-                end_date_time__time=slot_end
-            ).exists()
-            
-            slot['is_available'] = not is_booked
-            
-            # Check if slot is in the past
-            if obj.date == timezone.now().date():
-                current_time = timezone.now().time()
-                if slot_start < current_time:
-                    slot['is_available'] = False
-        
-        return all_slots
\ No newline at end of file
+        # Single-object serialization (e.g. the slots action) builds its own index
+        booked_index = self.booked_index
+        if booked_index is None:
+            booked_index = BookedSlotIndex.for_availabilities([obj])
+
+        now = timezone.localtime()
+        # Slots of today that already started are not available
+        earliest = -1
+        if obj.date == now.date():
+            earliest = minutes(now) + bool(now.second or now.microsecond)
+        duration = obj.slot_duration
+
+        return [
+            {
+                'start_time': format_minute(start),
+                'end_time': format_minute(start + duration),
+                'is_available': start >= earliest and not booked_index.is_booked(
+                    obj.doctor_id, obj.date, start, start + duration
+                ),
+            }
+            for start in obj.slot_starts
+        ]
+
+
+class CalendarQuerySerializer(SlotSearchSerializer):
+    """Query parameters of the bitmap calendar: the slot search window and doctor filters"""
+    limit = None
@@ -13,11 +13,12 @@ class DoctorProfileSerializer(serializers.ModelSerializer):
         fields = ["doctor_id", "user", "contact", "bio", "specialty", "specialty_name"]
 
     def update(self, instance, validated_data):
-        # Update doctor fields
-        for field in ['contact', 'bio', 'specialty']:
-            if field in validated_data:
-                setattr(instance, field, validated_data[field])
-        instance.save()
+        # Update doctor fields; save only those, leaving e.g. is_approved alone
+        fields = [field for field in ['contact', 'bio', 'specialty'] if field in validated_data]
+        for field in fields:
+            setattr(instance, field, validated_data[field])
+        if fields:
+            instance.save(update_fields=fields)
 
         # Update nested user (using UserProfileSerializer)
         user_data = validated_data.get('user')
@@ -36,6 +37,8 @@ class DoctorListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Doctor
         fields = ["doctor_id", "user", "specialty", "contact", "bio"]
+        # Read by get_user / get_specialty
+        related_sources = ["user.id", "user.username", "user.email", "specialty.id", "specialty.name"]
     
     def get_user(self, obj):
         return {
@@ -12,11 +12,12 @@ class PatientProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
     
     def update(self, instance, validated_data):
-        # Update patient fields
-        for field in ['age', 'contact']:
-            if field in validated_data:
-                setattr(instance, field, validated_data[field])
-        instance.save()
+        # Update patient fields, and save only those
+        fields = [field for field in ['age', 'contact'] if field in validated_data]
+        for field in fields:
+            setattr(instance, field, validated_data[field])
+        if fields:
+            instance.save(update_fields=fields)
         
         # Update nested user (using UserProfileSerializer)
         user_data = validated_data.get('user')
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+from ..models.slot import Slot
+
+
+class FreeSlotSerializer(serializers.ModelSerializer):
+    """Serializer for slots returned by the earliest-free-slot search"""
+    doctor_id = serializers.IntegerField(source='doctor.id', read_only=True)
+    doctor_name = serializers.CharField(source='doctor.user.username', read_only=True)
+    specialty = serializers.CharField(source='doctor.specialty.name', read_only=True, default=None)
+    start_time = serializers.TimeField(format='%H:%M')
+    end_time = serializers.TimeField(format='%H:%M')
+
+    class Meta:
+        model = Slot
+        fields = [
+            "id",
+            "availability",
+            "doctor_id",
+            "doctor_name",
+            "specialty",
+            "date",
+            "start_time",
+            "end_time",
+        ]
+
+
+class SlotSearchSerializer(serializers.Serializer):
+    """Query parameters of the earliest-free-slot search"""
+    MAX_WINDOW_DAYS = 90
+    MAX_LIMIT = 50
+
+    specialty = serializers.IntegerField(required=False)
+    doctor_ids = serializers.CharField(required=False, help_text="Comma separated doctor ids")
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    limit = serializers.IntegerField(default=10, min_value=1, max_value=MAX_LIMIT)
+
+    def validate_doctor_ids(self, value):
+        try:
+            return [int(doctor_id) for doctor_id in value.split(',') if doctor_id.strip()]
+        except ValueError:
+            raise serializers.ValidationError("doctor_ids must be a comma separated list of ids.")
+
+    def validate(self, data):
+        start_date = data.get('start_date') or timezone.localdate()
+        end_date = data.get('end_date') or start_date + timedelta(days=self.MAX_WINDOW_DAYS - 1)
+        if end_date < start_date:
+            raise serializers.ValidationError("end_date must not be before start_date.")
+        if (end_date - start_date).days >= self.MAX_WINDOW_DAYS:
+            raise serializers.ValidationError(f"The date window cannot exceed {self.MAX_WINDOW_DAYS} days.")
+        data['start_date'], data['end_date'] = start_date, end_date
+        return data
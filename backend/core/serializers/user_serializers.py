@@ -1,3 +1,6 @@
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode
 from rest_framework import serializers
 from core.models.user import User
 
@@ -49,13 +52,40 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return value
 
     def update(self, instance, validated_data):
-        # Only update provided fields
-        for field in ["username", "email", "role"]:
-            if field in validated_data:
-                setattr(instance, field, validated_data[field])
+        # Only update and save provided fields
+        fields = [field for field in ["username", "email", "role"] if field in validated_data]
+        for field in fields:
+            setattr(instance, field, validated_data[field])
 
         if "password" in validated_data:
             instance.set_password(validated_data["password"])
+            fields.append("password")
 
-        instance.save()
-        return instance
\ No newline at end of file
+        if fields:
+            instance.save(update_fields=fields)
+        return instance
+
+
+class InviteAcceptSerializer(serializers.Serializer):
+    """
+    Set the password of an imported account from its invite link.
+    """
+    uid = serializers.CharField()
+    token = serializers.CharField()
+    password = serializers.CharField(write_only=True, min_length=6)
+
+    def validate(self, attrs):
+        try:
+            user = User.objects.get(pk=force_str(urlsafe_base64_decode(attrs["uid"])))
+        except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+            user = None
+        if user is None or not default_token_generator.check_token(user, attrs["token"]):
+            raise serializers.ValidationError("Invalid or expired invite link.")
+        attrs["user"] = user
+        return attrs
+
+    def save(self):
+        user = self.validated_data["user"]
+        user.set_password(self.validated_data["password"])
+        user.save(update_fields=["password"])
+        return user
@@ -0,0 +1,79 @@
+"""
+Move past appointments from Appointment to ArchivedAppointment.
+
+The booking path (overlap checks, slot claims, upcoming lists) only reads
+Appointment, so that table stays the size of the upcoming calendar plus
+HORIZON_DAYS of history, however many years are archived.
+
+Each batch is copied and deleted in its own transaction, so an
+interrupted run leaves nothing half-moved and a rerun picks up where it
+stopped.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Appointment, ArchivedAppointment, Slot
+
+APPOINTMENT_ARCHIVE_DEFAULTS = {
+    # Appointments that ended more than this many days ago are archived
+    'HORIZON_DAYS': 365,
+    'BATCH_SIZE': 1000,
+}
+
+FIELDS = ['id', 'doctor_id', 'patient_id', 'start_date_time', 'end_date_time']
+
+
+def archive_setting(name):
+    return getattr(settings, 'APPOINTMENT_ARCHIVE', {}).get(name, APPOINTMENT_ARCHIVE_DEFAULTS[name])
+
+
+def archive_cutoff(horizon_days=None, now=None):
+    horizon_days = archive_setting('HORIZON_DAYS') if horizon_days is None else horizon_days
+    return (now or timezone.now()) - timedelta(days=horizon_days)
+
+
+def due(cutoff):
+    return Appointment.objects.filter(end_date_time__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size):
+    """Archive up to batch_size of the oldest due appointments; returns how many"""
+    with transaction.atomic():
+        rows = list(due(cutoff).order_by('start_date_time', 'pk').values_list(*FIELDS)[:batch_size])
+        if not rows:
+            return 0
+        ArchivedAppointment.objects.bulk_create(
+            [ArchivedAppointment(**dict(zip(FIELDS, row))) for row in rows],
+            # An archived copy can only exist if a previous run committed it
+            ignore_conflicts=True,
+        )
+        pks = [row[0] for row in rows]
+        # Past slots stay booked; only the link to the moved row goes, so
+        # the release_slot signal of the delete below finds nothing to free
+        Slot.objects.filter(appointment_id__in=pks).update(appointment=None)
+        # A regular delete, so the signals also drop the rows from the overlap index
+        Appointment.objects.filter(pk__in=pks).delete()
+    return len(rows)
+
+
+def archive_appointments(cutoff=None, batch_size=None, max_batches=None, progress=None):
+    """
+    Archive every appointment that ended before cutoff, batch by batch.
+    `progress(archived_so_far)` is called after each batch. Returns the
+    number of appointments archived.
+    """
+    cutoff = cutoff or archive_cutoff()
+    batch_size = batch_size or archive_setting('BATCH_SIZE')
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        archived += moved
+        batches += 1
+        if progress is not None:
+            progress(archived)
+    return archived
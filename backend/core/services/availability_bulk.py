@@ -0,0 +1,149 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+from itertools import accumulate
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models.availability import Availability
+from ..models.doctor import Doctor
+from ..models.slot import Slot
+from .slots import build_slots
+
+EXISTING_OVERLAP = "This availability overlaps with an existing slot on the same date."
+CONCURRENT_CHANGE = "This availability conflicts with one saved at the same time. Try again."
+
+
+def expand_template(template, start_date, end_date):
+    """Turn a weekly template into one item per matching date in the range"""
+    by_weekday = defaultdict(list)
+    for entry in template:
+        by_weekday[entry['weekday']].append(entry)
+
+    items = []
+    day = start_date
+    while day <= end_date:
+        for entry in by_weekday.get(day.weekday(), []):
+            items.append({
+                'date': day,
+                'start_time': entry['start_time'],
+                'end_time': entry['end_time'],
+                'slot_duration': entry.get('slot_duration', 30),
+            })
+        day += timedelta(days=1)
+    return items
+
+
+def item_errors(item, today):
+    errors = []
+    if item['end_time'] <= item['start_time']:
+        errors.append("End time must be after start time.")
+    if item['date'] < today:
+        errors.append("Cannot create availability for past dates.")
+    if not 5 <= item['slot_duration'] <= 240:
+        errors.append("Slot duration must be between 5 and 240 minutes.")
+    return errors
+
+
+def find_overlaps(doctor, items, skip):
+    """
+    Check each new item against the existing rows of its date (fetched in
+    one query), then sweep the remaining items in start order. Only accepted
+    items extend the sweep, so an item is never blamed on one that will not
+    be created. Returns {item index: message}.
+    """
+    dates = {item['date'] for i, item in enumerate(items) if i not in skip}
+    existing = defaultdict(list)
+    rows = Availability.objects.filter(doctor=doctor, date__in=dates).values_list(
+        'date', 'start_time', 'end_time'
+    )
+    for date, start, end in rows:
+        existing[date].append((start, end))
+    # Per date: the sorted starts, and the furthest end among the first n rows
+    existing = {
+        date: ([start for start, _ in rows], list(accumulate((end for _, end in rows), max)))
+        for date, rows in ((date, sorted(rows)) for date, rows in existing.items())
+    }
+
+    overlaps = {}
+    candidates = defaultdict(list)
+    for i, item in enumerate(items):
+        if i in skip:
+            continue
+        starts, reaches = existing.get(item['date'], ([], []))
+        # Rows starting before the item ends overlap it if any of them ends after it starts
+        before_end = bisect_left(starts, item['end_time'])
+        if before_end and reaches[before_end - 1] > item['start_time']:
+            overlaps[i] = EXISTING_OVERLAP
+        else:
+            candidates[item['date']].append((item['start_time'], item['end_time'], i))
+
+    for day_items in candidates.values():
+        day_items.sort()
+        reach, owner = None, None
+        for start, end, index in day_items:
+            if reach is not None and start < reach:
+                overlaps[index] = f"This availability overlaps with item {owner}."
+            else:
+                reach, owner = end, index
+    return overlaps
+
+
+def validate_items(doctor, items):
+    """Per-item validation; returns {item index: [messages]}"""
+    today = timezone.now().date()
+    errors = {}
+    for i, item in enumerate(items):
+        messages = item_errors(item, today)
+        if messages:
+            errors[i] = messages
+    for i, message in find_overlaps(doctor, items, skip=set(errors)).items():
+        errors.setdefault(i, []).append(message)
+    return errors
+
+
+def save_items(doctor, items, skip_invalid=False):
+    """
+    Validate and insert in one transaction, with the doctor's row locked so
+    concurrent bulk posts for the same doctor run one after the other.
+    Returns (created, {item index: [messages]}). created is None when nothing
+    was written: errors without skip_invalid, or a conflicting concurrent
+    insert that got past the lock (SQLite ignores FOR UPDATE, but BEGIN
+    IMMEDIATE serializes writers there).
+    """
+    try:
+        with transaction.atomic():
+            list(Doctor.objects.select_for_update().filter(pk=doctor.pk).values_list('pk'))
+            errors = validate_items(doctor, items)
+            if errors and not skip_invalid:
+                return None, errors
+            valid_items = [item for i, item in enumerate(items) if i not in errors]
+            return (create_availabilities(doctor, valid_items) if valid_items else []), errors
+    except IntegrityError:
+        errors = {i: [CONCURRENT_CHANGE] for i in range(len(items))}
+        return None, errors
+
+
+def create_availabilities(doctor, items):
+    """
+    Insert already validated items and their slots with bulk_create, inside
+    the caller's transaction (save_items).
+    Bypasses Availability.save(), whose full_clean() would re-run one
+    overlap query per row.
+    """
+    availabilities = Availability.objects.bulk_create(
+        [Availability(doctor=doctor, **item) for item in items]
+    )
+    if any(availability.pk is None for availability in availabilities):
+        # Backends that cannot return ids from a bulk insert
+        keys = Q()
+        for item in items:
+            keys |= Q(date=item['date'], start_time=item['start_time'])
+        availabilities = list(Availability.objects.filter(keys, doctor=doctor))
+    Slot.objects.bulk_create(
+        [slot for availability in availabilities for slot in build_slots(availability)],
+        batch_size=1000,
+    )
+    return availabilities
@@ -0,0 +1,112 @@
+import random
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from ..models.appointment import Appointment
+from ..models.slot import Slot
+from .overlap_index import db_has_overlap
+
+ALREADY_BOOKED = "This time slot is already booked. Please choose another time."
+NO_SLOT = (
+    "The selected time does not match the doctor's available time slots. "
+    "Please select a valid slot from the doctor's schedule."
+)
+
+# SQLite reports lock contention as an error instead of waiting forever
+LOCK_RETRIES = 10
+LOCK_RETRY_DELAY = 0.02
+
+
+def book_appointment(doctor, patient, start, end, after_booking=None):
+    """
+    Book the slot covering [start, end) for the patient.
+
+    The slot row is locked with SELECT ... FOR UPDATE where supported and
+    claimed with a compare-and-set UPDATE, which is the equivalent on SQLite:
+    whichever transaction flips is_free first wins, the others see zero rows
+    updated. The (doctor, start_date_time) unique constraint backs this up
+    for appointments created outside the slot table.
+
+    `after_booking(appointment)` runs inside the same transaction, e.g. to
+    queue confirmation emails in the outbox.
+    """
+    return _retry_when_locked(
+        lambda: _book_slot(_find_slot(doctor, start, end), doctor, patient, start, end, after_booking)
+    )
+
+
+def reschedule_appointment(appointment, doctor, start, end):
+    """
+    Move an appointment to the slot covering [start, end), with the same
+    compare-and-set claim as a booking. The old slot is freed in the same
+    transaction; losing the race raises ValidationError.
+    """
+    return _retry_when_locked(lambda: _move(appointment, _find_slot(doctor, start, end), doctor, start, end))
+
+
+def _retry_when_locked(func):
+    for attempt in range(LOCK_RETRIES):
+        try:
+            return func()
+        except OperationalError as error:
+            if 'locked' not in str(error) or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(LOCK_RETRY_DELAY * (attempt + 1) * random.uniform(0.5, 1.5))
+
+
+def _find_slot(doctor, start, end):
+    slot = Slot.objects.for_range(doctor, start, end).first()
+    if slot is None:
+        raise ValidationError(NO_SLOT)
+    return slot
+
+
+def _book_slot(slot, doctor, patient, start, end, after_booking):
+    with transaction.atomic():
+        if connection.features.has_select_for_update:
+            Slot.objects.select_for_update().filter(pk=slot.pk).first()
+
+        # Claim first so the transaction starts with a write on SQLite
+        if not Slot.objects.claim(slot):
+            raise ValidationError(ALREADY_BOOKED)
+
+        # Guard against appointments that bypassed the slot table
+        if db_has_overlap(doctor.pk, start, end):
+            raise ValidationError(ALREADY_BOOKED)
+
+        try:
+            with transaction.atomic():
+                appointment = Appointment.objects.create(
+                    doctor=doctor,
+                    patient=patient,
+                    start_date_time=start,
+                    end_date_time=end,
+                )
+        except IntegrityError:
+            raise ValidationError(ALREADY_BOOKED)
+
+        Slot.objects.book(slot, appointment)
+        if after_booking is not None:
+            after_booking(appointment)
+    return appointment
+
+
+def _move(appointment, slot, doctor, start, end):
+    try:
+        with transaction.atomic():
+            if slot.appointment_id != appointment.pk:
+                if connection.features.has_select_for_update:
+                    Slot.objects.select_for_update().filter(pk=slot.pk).first()
+                if not Slot.objects.claim(slot):
+                    raise ValidationError(ALREADY_BOOKED)
+                if db_has_overlap(doctor.pk, start, end, exclude=appointment.pk):
+                    raise ValidationError(ALREADY_BOOKED)
+
+            appointment.doctor, appointment.start_date_time, appointment.end_date_time = doctor, start, end
+            # The book_slot signal frees the old slot and links the claimed one
+            appointment.save(update_fields=['doctor', 'start_date_time', 'end_date_time'])
+    except IntegrityError:
+        raise ValidationError(ALREADY_BOOKED)
+    return appointment
@@ -0,0 +1,104 @@
+"""
+Compact schedule calendar: one packed bitmap per availability.
+
+Each availability is a grid of `slots` slots of `slot_duration` minutes
+starting `origin` minutes after midnight. `free` is the base64 of that
+grid's bitmap: bit i (byte i // 8, bit i % 8, least significant first) is
+set when slot i is free. Everything is done in integer minutes on Python
+ints used as bit sets; no datetime objects are built per slot.
+"""
+import base64
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models.appointment import Appointment
+from ..models.availability import Availability
+from .slot_grid import minutes, slot_index
+
+
+def pack(bits, count):
+    return base64.b64encode(bits.to_bytes((count + 7) // 8, 'little')).decode('ascii')
+
+
+def booked_minutes(start_date, end_date, doctor_ids=None, specialty_id=None):
+    """(doctor_id, date) -> [(start, end)] in local minutes, from one query"""
+    appointments = Appointment.objects.filter(
+        start_date_time__gte=timezone.make_aware(datetime.combine(start_date, time.min)),
+        start_date_time__lt=timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min)),
+    )
+    if doctor_ids is not None:
+        appointments = appointments.filter(doctor_id__in=doctor_ids)
+    if specialty_id is not None:
+        appointments = appointments.filter(doctor__specialty_id=specialty_id)
+
+    booked = defaultdict(list)
+    for doctor_id, start, end in appointments.values_list('doctor_id', 'start_date_time', 'end_date_time'):
+        start, end = timezone.localtime(start), timezone.localtime(end)
+        booked[doctor_id, start.date()].append((minutes(start), minutes(end)))
+    return booked
+
+
+def free_bits(origin, duration, count, booked, not_before=None):
+    """
+    Bit set of the free slots of a grid, given its booked (start, end) ranges.
+    Slots starting before minute `not_before` (already started) are not free.
+    """
+    taken = 0
+    if not_before is not None and not_before > origin:
+        started = min(count, -(-(not_before - origin) // duration))
+        taken = (1 << started) - 1
+    end_minute = origin + count * duration
+    for start, end in booked:
+        # Only appointments that are exactly one grid slot book it, as in Slot
+        index = slot_index(origin, end_minute, duration, start, end)
+        if index is not None:
+            taken |= 1 << index
+    return ((1 << count) - 1) & ~taken
+
+
+def schedule_calendar(start_date, end_date, doctor_ids=None, specialty_id=None, approved_only=False,
+                      own_doctor_id=None):
+    """
+    Calendar entries of the matching doctors' availabilities, by doctor and date.
+    With approved_only, unapproved doctors are left out except own_doctor_id.
+    """
+    availabilities = Availability.objects.filter(date__gte=start_date, date__lte=end_date)
+    if doctor_ids is not None:
+        availabilities = availabilities.filter(doctor_id__in=doctor_ids)
+    if specialty_id is not None:
+        availabilities = availabilities.filter(doctor__specialty_id=specialty_id)
+    if approved_only:
+        visible = Q(doctor__is_approved=True)
+        if own_doctor_id is not None:
+            visible |= Q(doctor_id=own_doctor_id)
+        availabilities = availabilities.filter(visible)
+    rows = availabilities.order_by('doctor_id', 'date', 'start_time').values_list(
+        'doctor_id', 'date', 'start_time', 'end_time', 'slot_duration',
+    )
+
+    booked = booked_minutes(start_date, end_date, doctor_ids, specialty_id)
+    # Like the slot search: slots that already started are not free. A part
+    # minute counts as started, as `start_time < now` does there
+    now = timezone.localtime()
+    today, now_minute = now.date(), minutes(now) + bool(now.second or now.microsecond)
+    entries = []
+    for doctor_id, date, start_time, end_time, duration in rows:
+        origin = minutes(start_time)
+        count = (minutes(end_time) - origin) // duration
+        if count <= 0:
+            continue
+        entries.append({
+            'doctor': doctor_id,
+            'date': date.isoformat(),
+            'origin': origin,
+            'slot_duration': duration,
+            'slots': count,
+            'free': pack(free_bits(
+                origin, duration, count, booked.get((doctor_id, date), ()),
+                not_before=24 * 60 if date < today else now_minute if date == today else None,
+            ), count),
+        })
+    return entries
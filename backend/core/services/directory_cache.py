@@ -0,0 +1,78 @@
+"""
+Versioned cache of the doctor directory, with the version as the ETag.
+
+Writes bump the version in the default cache. With a per-process cache
+(LocMem) a bump only reaches the worker that made it, so there the version
+and payload expire after DOCTOR_DIRECTORY_LOCAL_CACHE_TIMEOUT seconds, and
+a system check warns that a shared backend is needed.
+"""
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+
+from ..db_router import PER_PROCESS_CACHES
+
+VERSION_KEY = 'doctor-directory:version'
+
+
+def cache_is_shared():
+    return settings.CACHES.get('default', {}).get('BACKEND') not in PER_PROCESS_CACHES
+
+
+def version_timeout():
+    if cache_is_shared():
+        return None
+    return getattr(settings, 'DOCTOR_DIRECTORY_LOCAL_CACHE_TIMEOUT', 5)
+
+
+def payload_timeout():
+    timeout = getattr(settings, 'DOCTOR_DIRECTORY_CACHE_TIMEOUT', 3600)
+    if cache_is_shared():
+        return timeout
+    return min(timeout, version_timeout())
+
+
+def check_directory_cache(app_configs=None, **kwargs):
+    if cache_is_shared():
+        return []
+    return [checks.Warning(
+        "The doctor directory is cached in a per-process cache.",
+        hint="Other workers do not see a change for up to DOCTOR_DIRECTORY_LOCAL_CACHE_TIMEOUT "
+             "seconds, and hand out different ETags. Use a shared cache backend with more "
+             "than one worker process.",
+        id='core.W002',
+    )]
+
+
+def get_version():
+    """Current directory version; starts from a timestamp so ETags differ across cache flushes"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), version_timeout())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Invalidate the cached directory; called whenever a listed field may have changed"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Key missing (first use or evicted)
+        cache.set(VERSION_KEY, int(time.time() * 1000), version_timeout())
+
+
+def get_etag(version):
+    return f'"doctors-{version}"'
+
+
+def get_payload(version, build):
+    """Serialized directory for `version`, built with `build()` on a miss"""
+    key = f'doctor-directory:{version}:payload'
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, payload_timeout())
+    return payload
@@ -0,0 +1,158 @@
+import logging
+import time
+import uuid
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+from .. import metrics
+from ..models.outbox import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DEFAULTS = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    # Retry n waits BACKOFF_SECONDS * 2 ** (n - 1), capped at MAX_BACKOFF_SECONDS
+    'BACKOFF_SECONDS': 30,
+    'MAX_BACKOFF_SECONDS': 3600,
+    # How long a worker may hold a claimed row before others retry it
+    'LEASE_SECONDS': 300,
+}
+
+
+def outbox_setting(name):
+    return getattr(settings, 'EMAIL_OUTBOX', {}).get(name, OUTBOX_DEFAULTS[name])
+
+
+def enqueue_email(subject, body, recipients):
+    """Queue an email; call inside the transaction of the triggering change"""
+    return OutboxEmail.objects.create(subject=subject, body=body, recipients=list(recipients))
+
+
+def backoff(attempts):
+    delay = outbox_setting('BACKOFF_SECONDS') * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, outbox_setting('MAX_BACKOFF_SECONDS')))
+
+
+def claim_batch(batch_size):
+    """
+    Take ownership of up to `batch_size` due emails. Rows whose lease ran out
+    (worker died mid-send) are due again.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        due = OutboxEmail.objects.filter(
+            status__in=[OutboxEmail.STATUS_PENDING, OutboxEmail.STATUS_SENDING],
+            next_attempt_at__lte=now,
+        ).order_by('next_attempt_at')
+        if db_connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('pk', flat=True)[:batch_size])
+        OutboxEmail.objects.filter(pk__in=ids, next_attempt_at__lte=now).update(
+            status=OutboxEmail.STATUS_SENDING,
+            claimed_by=token,
+            next_attempt_at=now + timedelta(seconds=outbox_setting('LEASE_SECONDS')),
+        )
+    return list(OutboxEmail.objects.filter(claimed_by=token, status=OutboxEmail.STATUS_SENDING))
+
+
+def mark_sent(email):
+    email.status = OutboxEmail.STATUS_SENT
+    email.sent_at = timezone.now()
+    email.attempts += 1
+    email.last_error = ''
+    email.save(update_fields=['status', 'sent_at', 'attempts', 'last_error'])
+
+
+def mark_failed(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= max_attempts:
+        email.status = OutboxEmail.STATUS_DEAD
+        logger.error("Outbox email %s dead-lettered after %s attempts: %s", email.pk, email.attempts, error)
+    else:
+        email.status = OutboxEmail.STATUS_PENDING
+        email.next_attempt_at = timezone.now() + backoff(email.attempts)
+    email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+
+
+def send(message, connection):
+    try:
+        message.send(fail_silently=False)
+    except SMTPServerDisconnected:
+        # The server dropped the connection, e.g. after an idle timeout;
+        # open() is a no-op until it is closed
+        connection.close()
+        connection.open()
+        message.send(fail_silently=False)
+
+
+def deliver(emails, connection, max_attempts):
+    """Send a claimed batch over one open connection; returns (sent, failed)"""
+    sent = failed = 0
+    for email in emails:
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=email.recipients,
+            connection=connection,
+        )
+        started = time.perf_counter()
+        try:
+            send(message, connection)
+        except Exception as error:
+            record_delivery('failed', started)
+            mark_failed(email, error, max_attempts)
+            failed += 1
+        else:
+            record_delivery('sent', started)
+            mark_sent(email)
+            sent += 1
+    return sent, failed
+
+
+def record_delivery(result, started):
+    metrics.outbox_send_duration.observe(time.perf_counter() - started, result=result)
+    metrics.outbox_emails.inc(result=result)
+
+
+def drain_outbox(connection=None, batch_size=None, max_attempts=None, max_batches=None):
+    """
+    Deliver due emails batch by batch until none are left. The mail
+    connection is opened once, reused for every batch and closed at the
+    end, so `send_outbox --loop` never keeps an idle connection between
+    drains. Returns (sent, failed) totals.
+    """
+    batch_size = batch_size or outbox_setting('BATCH_SIZE')
+    max_attempts = max_attempts or outbox_setting('MAX_ATTEMPTS')
+    connection = connection or get_connection(fail_silently=False)
+
+    total_sent = total_failed = batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            emails = claim_batch(batch_size)
+            if not emails:
+                break
+            batches += 1
+            try:
+                connection.open()
+            except Exception as error:
+                # Nothing can go out this round; schedule retries and stop
+                for email in emails:
+                    mark_failed(email, error, max_attempts)
+                total_failed += len(emails)
+                break
+            sent, failed = deliver(emails, connection, max_attempts)
+            total_sent += sent
+            total_failed += failed
+    finally:
+        if batches:
+            connection.close()
+    return total_sent, total_failed
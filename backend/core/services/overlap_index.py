@@ -0,0 +1,131 @@
+import threading
+from bisect import bisect_left, insort
+
+from django.utils import timezone
+
+from ..models.appointment import Appointment
+
+
+class DoctorIntervals:
+    """
+    Sorted (start, end, pk) intervals of one doctor's appointments.
+
+    Bookings never overlap, so ends are sorted along with starts and an
+    overlap test only has to look at the neighbours of the insertion point.
+    """
+
+    def __init__(self, rows=()):
+        self._intervals = sorted(rows)
+        self._by_pk = {pk: (start, end, pk) for start, end, pk in self._intervals}
+
+    def add(self, pk, start, end):
+        self.remove(pk)
+        interval = (start, end, pk)
+        insort(self._intervals, interval)
+        self._by_pk[pk] = interval
+
+    def remove(self, pk):
+        interval = self._by_pk.pop(pk, None)
+        if interval is None:
+            return
+        i = bisect_left(self._intervals, interval)
+        if i < len(self._intervals) and self._intervals[i] == interval:
+            del self._intervals[i]
+
+    def overlaps(self, start, end, exclude=None):
+        # Every interval that could overlap starts before `end`
+        i = bisect_left(self._intervals, (end,))
+        while i > 0:
+            i -= 1
+            other_start, other_end, pk = self._intervals[i]
+            if pk == exclude:
+                continue
+            return other_end > start
+        return False
+
+    def __len__(self):
+        return len(self._intervals)
+
+
+class OverlapIndex:
+    """
+    Process-local registry of DoctorIntervals, loaded lazily per doctor and
+    kept current by the Appointment save/delete signals.
+
+    Entries are changed by whichever thread commits a booking (the writer
+    thread with SQLITE_WRITE_QUEUE) and read by request threads, so both go
+    through self._lock.
+
+    Other workers' bookings are not seen here, so a miss is only a hint:
+    the database check in the booking path stays as the final guard. A hit
+    is confirmed against the database and a stale doctor entry is reloaded.
+    """
+
+    def __init__(self):
+        self._doctors = {}
+        self._lock = threading.Lock()
+
+    def _load(self, doctor_id):
+        rows = Appointment.objects.filter(
+            doctor_id=doctor_id,
+            end_date_time__gt=timezone.now(),
+        ).values_list('start_date_time', 'end_date_time', 'pk')
+        return DoctorIntervals(rows)
+
+    def intervals(self, doctor_id):
+        """The doctor's entry, loaded on first use; read it under self._lock"""
+        with self._lock:
+            intervals = self._doctors.get(doctor_id)
+        if intervals is None:
+            # Load outside the lock so one slow query does not block every doctor
+            intervals = self._load(doctor_id)
+            with self._lock:
+                intervals = self._doctors.setdefault(doctor_id, intervals)
+        return intervals
+
+    def has_overlap(self, doctor_id, start, end, exclude=None):
+        intervals = self.intervals(doctor_id)
+        with self._lock:
+            hit = intervals.overlaps(start, end, exclude)
+        if not hit:
+            return False
+        if db_has_overlap(doctor_id, start, end, exclude):
+            return True
+        # The index knew about a booking that is gone (rolled back or
+        # cancelled in another worker)
+        self.forget(doctor_id)
+        return False
+
+    def add(self, appointment):
+        with self._lock:
+            intervals = self._doctors.get(appointment.doctor_id)
+            if intervals is not None:
+                intervals.add(appointment.pk, appointment.start_date_time, appointment.end_date_time)
+
+    def remove(self, appointment):
+        with self._lock:
+            intervals = self._doctors.get(appointment.doctor_id)
+            if intervals is not None:
+                intervals.remove(appointment.pk)
+
+    def forget(self, doctor_id=None):
+        with self._lock:
+            if doctor_id is None:
+                self._doctors.clear()
+            else:
+                self._doctors.pop(doctor_id, None)
+
+
+def db_has_overlap(doctor_id, start, end, exclude=None):
+    """Authoritative range check against the Appointment table"""
+    overlapping = Appointment.objects.filter(
+        doctor_id=doctor_id,
+        start_date_time__lt=end,
+        end_date_time__gt=start,
+    )
+    if exclude is not None:
+        overlapping = overlapping.exclude(pk=exclude)
+    return overlapping.exists()
+
+
+overlap_index = OverlapIndex()
@@ -0,0 +1,173 @@
+"""
+Synthetic data at production-like scale, for load tests and benchmarks.
+
+Everything is written with bulk_create, bypassing save() and the
+post_save signals (profile creation, slot sync, booking), so the
+side effects those signals would have are produced here directly.
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Appointment, Availability, Doctor, Patient, Slot, Specialty, User
+from . import directory_cache
+from .overlap_index import overlap_index
+from .slots import build_slots
+
+SEED_PASSWORD = 'seed-password'
+
+SPECIALTY_NAMES = [
+    'Cardiology', 'Dermatology', 'Neurology', 'Pediatrics', 'Orthopedics', 'Psychiatry',
+    'Ophthalmology', 'Gynecology', 'Urology', 'Oncology', 'Endocrinology', 'Gastroenterology',
+    'Pulmonology', 'Nephrology', 'Rheumatology', 'Radiology', 'Dentistry', 'ENT',
+]
+
+# (start, end) working blocks and how often doctors pick them
+SHIFTS = [((time(9), time(13)), 4), ((time(13), time(17)), 3), ((time(9), time(17)), 2), ((time(17), time(21)), 1)]
+SLOT_DURATIONS = [(15, 2), (20, 1), (30, 6), (60, 1)]
+
+
+@dataclass
+class SeedConfig:
+    specialties: int = 10
+    doctors: int = 100
+    patients: int = 1000
+    # Days of schedule ahead of today, and of history before it
+    days: int = 30
+    past_days: int = 30
+    # Share of a popular doctor's future slots that end up booked
+    fill_rate: float = 0.6
+    # Chance a doctor takes a given weekday off
+    absence_rate: float = 0.1
+    prefix: str = 'seed'
+    seed: int = 0
+    batch_size: int = 2000
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def zipf_weights(count, exponent=1.1):
+    """Popularity falls off with rank: a few busy doctors, a long quiet tail"""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+@transaction.atomic
+def seed_scale(config):
+    """Generate the data set described by `config`; returns row counts"""
+    rng = random.Random(config.seed)
+    password = make_password(SEED_PASSWORD)
+
+    specialties = Specialty.objects.bulk_create([
+        Specialty(name=SPECIALTY_NAMES[i] if i < len(SPECIALTY_NAMES) else f'{config.prefix} specialty {i}')
+        for i in range(config.specialties)
+    ], ignore_conflicts=True)
+    specialties = list(Specialty.objects.filter(name__in=[s.name for s in specialties]))
+
+    doctor_users = User.objects.bulk_create([
+        User(
+            username=f'{config.prefix}-doctor-{i}', email=f'{config.prefix}-doctor-{i}@example.com',
+            role='doctor', password=password,
+        )
+        for i in range(config.doctors)
+    ], batch_size=config.batch_size)
+    patient_users = User.objects.bulk_create([
+        User(
+            username=f'{config.prefix}-patient-{i}', email=f'{config.prefix}-patient-{i}@example.com',
+            role='patient', password=password,
+        )
+        for i in range(config.patients)
+    ], batch_size=config.batch_size)
+
+    # Specialties are as uneven as doctor popularity
+    specialty_weights = zipf_weights(len(specialties), exponent=0.8)
+    doctors = Doctor.objects.bulk_create([
+        Doctor(
+            user=user,
+            specialty=rng.choices(specialties, specialty_weights)[0] if specialties else None,
+            is_approved=rng.random() < 0.9,
+        )
+        for user in doctor_users
+    ], batch_size=config.batch_size)
+    patients = Patient.objects.bulk_create([
+        Patient(user=user, age=rng.randint(1, 90)) for user in patient_users
+    ], batch_size=config.batch_size)
+
+    availabilities = Availability.objects.bulk_create(
+        generate_availabilities(rng, doctors, config), batch_size=config.batch_size
+    )
+    # Appointments go in first so slots are inserted already booked
+    slots = [slot for availability in availabilities for slot in build_slots(availability)]
+    appointments, booked = generate_appointments(rng, doctors, patients, slots, config)
+    appointments = Appointment.objects.bulk_create(appointments, batch_size=config.batch_size)
+    for slot, appointment in zip(booked, appointments):
+        slot.is_free = False
+        slot.appointment = appointment
+    slots = Slot.objects.bulk_create(slots, batch_size=config.batch_size)
+
+    # The signals that normally keep these caches fresh did not fire
+    transaction.on_commit(directory_cache.bump_version)
+    transaction.on_commit(overlap_index.forget)
+
+    return {
+        'specialties': len(specialties),
+        'doctors': len(doctors),
+        'patients': len(patients),
+        'availabilities': len(availabilities),
+        'slots': len(slots),
+        'appointments': len(appointments),
+    }
+
+
+def generate_availabilities(rng, doctors, config):
+    """One shift per working weekday, mostly the doctor's usual one"""
+    today = timezone.localdate()
+    first = today - timedelta(days=config.past_days)
+    availabilities = []
+    for doctor in doctors:
+        usual_shift = weighted(rng, SHIFTS)
+        duration = weighted(rng, SLOT_DURATIONS)
+        for offset in range(config.past_days + config.days):
+            date = first + timedelta(days=offset)
+            if date.weekday() >= 5 or rng.random() < config.absence_rate:
+                continue
+            start, end = usual_shift if rng.random() < 0.8 else weighted(rng, SHIFTS)
+            availabilities.append(Availability(
+                doctor=doctor, date=date, start_time=start, end_time=end, slot_duration=duration,
+            ))
+    return availabilities
+
+
+def generate_appointments(rng, doctors, patients, slots, config):
+    """
+    Book slots with a Zipf popularity per doctor. Past slots are fuller
+    than future ones, and the nearer a future slot, the likelier it is booked.
+    Returns (unsaved appointments, the slots they book) in matching order.
+    """
+    if not patients:
+        return [], []
+    today = timezone.localdate()
+    popularity = dict(zip((doctor.pk for doctor in doctors), zipf_weights(len(doctors), exponent=0.7)))
+    appointments, booked = [], []
+    for slot in slots:
+        days_ahead = (slot.date - today).days
+        if days_ahead < 0:
+            rate = min(0.95, config.fill_rate * 1.3)
+        else:
+            rate = config.fill_rate * (1 - days_ahead / (config.days + 1))
+        if rng.random() >= rate * popularity[slot.doctor_id] ** 0.5:
+            continue
+        start = timezone.make_aware(datetime.combine(slot.date, slot.start_time))
+        end = timezone.make_aware(datetime.combine(slot.date, slot.end_time))
+        appointments.append(Appointment(
+            doctor_id=slot.doctor_id, patient=rng.choice(patients),
+            start_date_time=start, end_date_time=end,
+        ))
+        booked.append(slot)
+    return appointments, booked
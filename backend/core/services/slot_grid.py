@@ -0,0 +1,34 @@
+"""
+Integer-minute slot grids.
+
+A slot is (start minute after midnight, duration). An availability's grid
+is the tuple of its slot start minutes, memoized per (start, end,
+duration) since doctors reuse a handful of shifts. Checking that a range
+is a grid slot is modular arithmetic, with no scan over the grid.
+Formatting to 'HH:MM' strings belongs to the serializers.
+"""
+from datetime import time
+from functools import lru_cache
+
+
+def minutes(value):
+    """Minutes after midnight of a time or datetime"""
+    return value.hour * 60 + value.minute
+
+
+def to_time(minute):
+    return time(minute // 60, minute % 60)
+
+
+@lru_cache(maxsize=1024)
+def slot_grid(start_minute, end_minute, duration):
+    """Start minutes of every whole slot between start and end"""
+    return tuple(range(start_minute, end_minute - duration + 1, duration))
+
+
+def slot_index(start_minute, end_minute, duration, slot_start, slot_end):
+    """Index of the grid slot spanning exactly [slot_start, slot_end), or None"""
+    offset = slot_start - start_minute
+    if slot_end - slot_start != duration or offset < 0 or offset % duration or slot_end > end_minute:
+        return None
+    return offset // duration
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.utils import timezone
+
+from ..models.appointment import Appointment
+from ..models.slot import Slot
+from .slot_grid import minutes
+
+
+class BookedSlotIndex:
+    """
+    In-memory index of booked appointments keyed by (doctor_id, date, start
+    minute, end minute).
+
+    Built from a single query covering every (doctor, date) pair of a page of
+    availabilities, so marking slots never goes back to the database.
+    """
+
+    def __init__(self, keys=()):
+        self._keys = set(keys)
+
+    @classmethod
+    def for_availabilities(cls, availabilities):
+        """Fetch all appointments touching the given availabilities in one query"""
+        pairs = {(a.doctor_id, a.date) for a in availabilities if a.date}
+        if not pairs:
+            return cls()
+
+        doctor_ids = {doctor_id for doctor_id, _ in pairs}
+        dates = [date for _, date in pairs]
+
+        appointments = Appointment.objects.filter(
+            doctor_id__in=doctor_ids,
+            start_date_time__date__gte=min(dates),
+            start_date_time__date__lte=max(dates),
+        ).values_list('doctor_id', 'start_date_time', 'end_date_time')
+
+        keys = []
+        for doctor_id, start, end in appointments:
+            start = timezone.localtime(start)
+            end = timezone.localtime(end)
+            # The date range is a superset of the requested pairs
+            if (doctor_id, start.date()) not in pairs:
+                continue
+            keys.append((doctor_id, start.date(), minutes(start), minutes(end)))
+        return cls(keys)
+
+    def is_booked(self, doctor_id, date, start_minute, end_minute):
+        return (doctor_id, date, start_minute, end_minute) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+
+def build_slots(availability):
+    """Unsaved Slot rows for every slot of an availability"""
+    return [
+        Slot(
+            availability=availability,
+            doctor_id=availability.doctor_id,
+            date=availability.date,
+            start_time=start,
+            end_time=end,
+        )
+        for start, end in availability.iter_slot_bounds()
+    ]
+
+
+def link_booked_slots(doctor_id, dates):
+    """Attach existing appointments to the free slots they occupy"""
+    appointments = Appointment.objects.filter(
+        doctor_id=doctor_id,
+        start_date_time__date__in=dates,
+        slot__isnull=True,
+    )
+    for appointment in appointments:
+        Slot.objects.for_range(
+            doctor_id, appointment.start_date_time, appointment.end_date_time
+        ).free().update(is_free=False, appointment=appointment)
+
+
+@transaction.atomic
+def sync_availability_slots(availability):
+    """
+    Bring the Slot rows of an availability in line with its current grid.
+    Unchanged slots keep their booking, vanished ones are dropped.
+    """
+    def key(slot):
+        return slot.date, slot.start_time, slot.end_time
+
+    wanted = {key(slot): slot for slot in build_slots(availability)}
+    existing = list(Slot.objects.filter(availability=availability))
+
+    stale = [slot.pk for slot in existing if key(slot) not in wanted]
+    Slot.objects.filter(pk__in=stale).delete()
+
+    kept = {key(slot) for slot in existing if slot.pk not in stale}
+    Slot.objects.bulk_create([slot for k, slot in wanted.items() if k not in kept])
+
+    link_booked_slots(availability.doctor_id, [availability.date])
+
+
+def earliest_free_slots(limit, start_date, end_date, specialty_id=None, doctor_ids=None):
+    """
+    The `limit` earliest free slots across all matching doctors.
+
+    Slots are materialized, so merging the per-doctor streams is done by the
+    database: it walks the (date, is_free) index in date order, sorts one
+    day at a time and stops after `limit` matches, so the cost follows
+    `limit` rather than the size of the date window.
+    """
+    now = timezone.localtime()
+    slots = Slot.objects.free().filter(
+        date__gte=max(start_date, now.date()),
+        date__lte=end_date,
+        doctor__is_approved=True,
+    ).exclude(
+        date=now.date(), start_time__lt=now.time()
+    )
+    if specialty_id is not None:
+        slots = slots.filter(doctor__specialty_id=specialty_id)
+    if doctor_ids:
+        slots = slots.filter(doctor_id__in=doctor_ids)
+    return list(
+        slots.select_related('doctor__user', 'doctor__specialty')
+        .order_by('date', 'start_time', 'doctor_id')[:limit]
+    )
@@ -0,0 +1,197 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from ..db_router import use_primary
+
+TOKEN_BLACKLIST_FILTER_DEFAULTS = {
+    # Blacklisted tokens the filter is sized for; it is rebuilt larger when exceeded
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.001,
+    'PURGE_BATCH_SIZE': 1000,
+    # Longest a token blacklisted by another worker can go unseen: the
+    # filter polls the table this often even if the cache version is stale
+    'SYNC_SECONDS': 1,
+    # Each poll re-reads rows blacklisted this long before the previous one,
+    # to catch transactions that committed late
+    'SYNC_OVERLAP_SECONDS': 300,
+}
+
+VERSION_KEY = 'token-blacklist:version'
+
+
+def blacklist_filter_setting(name):
+    return getattr(settings, 'TOKEN_BLACKLIST_FILTER', {}).get(name, TOKEN_BLACKLIST_FILTER_DEFAULTS[name])
+
+
+def get_version(cache=cache):
+    """
+    Blacklist version; a worker syncs its filter as soon as it changes.
+    Only a hint: with a per-process cache other workers never see it move
+    and fall back to polling every SYNC_SECONDS.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version(cache=cache):
+    """Tell other workers a token was blacklisted; call once it is committed"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), None)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings.
+
+    `key in filter` is False only for keys never added; it can be True for
+    a key that was not added, at about `error_rate` once `capacity` keys are in.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class BlacklistFilter:
+    """
+    Process-local Bloom filter of blacklisted refresh token JTIs.
+
+    Built from the BlacklistedToken table on first use, then kept current:
+    tokens blacklisted in this process are added right away, and rows
+    blacklisted by other workers are loaded when the cache version moves,
+    or at the latest SYNC_SECONDS after the last load. A miss means the
+    token is not blacklisted, with no query. A hit is confirmed against
+    the database.
+
+    Loads go by blacklisted_at, not by pk: a row can commit after rows
+    with higher pks were already loaded, so every load re-reads the last
+    SYNC_OVERLAP_SECONDS.
+
+    Purged tokens stay in the filter and only raise the false positive
+    rate, until the filter outgrows its capacity and is rebuilt.
+    """
+
+    def __init__(self, cache=cache):
+        self._cache = cache
+        self._filter = None
+        self._version = None
+        # Start of the last load (wall clock, compared with blacklisted_at)
+        self._loaded_at = None
+        # When the last load ran (monotonic, for SYNC_SECONDS)
+        self._checked = 0
+        self._lock = threading.Lock()
+
+    def _load(self, since=None):
+        rows = BlacklistedToken.objects.order_by()
+        if since is not None:
+            rows = rows.filter(blacklisted_at__gte=since)
+        # A replica could lag behind the load's watermark and skip rows for good
+        with use_primary():
+            return list(rows.values_list('token__jti', flat=True))
+
+    def rebuild(self):
+        version, started = get_version(self._cache), timezone.now()
+        jtis = self._load()
+        capacity = max(blacklist_filter_setting('CAPACITY'), 2 * len(jtis))
+        bloom = BloomFilter(capacity, blacklist_filter_setting('ERROR_RATE'))
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            self._filter, self._version = bloom, version
+            self._loaded_at, self._checked = started, time.monotonic()
+
+    def sync(self):
+        """Load tokens blacklisted elsewhere, if the version moved or the last load is too old"""
+        if self._filter is None:
+            return self.rebuild()
+        version = get_version(self._cache)
+        if version == self._version and time.monotonic() - self._checked < blacklist_filter_setting('SYNC_SECONDS'):
+            return
+        # Read before the load: rows committed after it move the version again
+        started = timezone.now()
+        since = self._loaded_at - timedelta(seconds=blacklist_filter_setting('SYNC_OVERLAP_SECONDS'))
+        jtis = self._load(since)
+        with self._lock:
+            for jti in jtis:
+                # The overlap re-reads rows: count each token once
+                if jti not in self._filter:
+                    self._filter.add(jti)
+            self._version, self._loaded_at, self._checked = version, started, time.monotonic()
+            full = self._filter.count > self._filter.capacity
+        if full:
+            self.rebuild()
+
+    def add(self, jti):
+        """Record a token blacklisted in this process"""
+        if self._filter is None:
+            return
+        with self._lock:
+            if jti not in self._filter:
+                self._filter.add(jti)
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self._filter
+
+    def is_blacklisted(self, jti):
+        if not self.might_contain(jti):
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def forget(self):
+        with self._lock:
+            self._filter, self._version, self._loaded_at, self._checked = None, None, None, 0
+
+
+def purge_expired(batch_size=None, now=None):
+    """
+    Delete expired outstanding tokens (their blacklist rows cascade) in
+    batches, so no single statement locks the tables for long. Returns the
+    number of outstanding tokens deleted.
+    """
+    batch_size = batch_size or blacklist_filter_setting('PURGE_BATCH_SIZE')
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        pks = list(
+            OutstandingToken.objects.filter(expires_at__lt=now)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+        OutstandingToken.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+
+
+blacklist_filter = BlacklistFilter()
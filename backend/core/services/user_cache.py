@@ -0,0 +1,84 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from ..db_router import use_primary
+
+USER_CACHE_DEFAULTS = {
+    'MAX_SIZE': 1024,
+    # Bounds how long another worker can serve a user changed elsewhere
+    'TTL_SECONDS': 60,
+}
+
+
+# Loaded with every user so the request identity (core.identity) needs no extra query
+PROFILE_RELATIONS = ('doctor__specialty', 'patient_profile')
+
+
+def user_cache_setting(name):
+    return getattr(settings, 'AUTH_USER_CACHE', {}).get(name, USER_CACHE_DEFAULTS[name])
+
+
+def clone(user):
+    """Copy of a cached user and its loaded profile"""
+    user = copy.copy(user)
+    for name in ('doctor', 'patient_profile'):
+        profile = user._state.fields_cache.get(name)
+        if profile is not None:
+            user._state.fields_cache[name] = profile = copy.copy(profile)
+            profile._state.fields_cache['user'] = user
+    return user
+
+
+class UserCache:
+    """
+    Process-local LRU cache of User rows, with their doctor or patient
+    profile, with a TTL, keyed on user id.
+
+    Saves and deletes of users and profiles in this process invalidate the
+    entry right away (see
+    core.signals); changes made by other workers show up within TTL_SECONDS.
+    Callers get a copy, so per-request state never leaks between requests.
+    Ids are keyed as strings, the form Simple JWT puts in tokens.
+    """
+
+    def __init__(self):
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """The user with this id, or raises User.DoesNotExist"""
+        key, now = str(user_id), time.monotonic()
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is not None and entry[1] > now:
+                self._users.move_to_end(key)
+                return clone(entry[0])
+
+        # Served to every later request, writes included: never from a lagging replica
+        with use_primary():
+            user = get_user_model().objects.select_related(*PROFILE_RELATIONS).get(pk=user_id)
+        with self._lock:
+            self._users[key] = (user, now + user_cache_setting('TTL_SECONDS'))
+            self._users.move_to_end(key)
+            while len(self._users) > user_cache_setting('MAX_SIZE'):
+                self._users.popitem(last=False)
+        return clone(user)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def __len__(self):
+        return len(self._users)
+
+
+user_cache = UserCache()
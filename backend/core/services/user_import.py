@@ -0,0 +1,264 @@
+"""
+Bulk onboarding of users from CSV or NDJSON.
+
+Rows are streamed in chunks of BATCH_SIZE. Each chunk is validated,
+hashed and inserted in its own transaction with bulk_create, so memory
+stays bounded by one chunk whatever the file size, and a failure only
+loses the chunk it happened in. bulk_create skips the post_save signals,
+so role profiles are inserted here directly.
+
+Rows without a password get an unusable one. With `invite`, they are
+sent a link (through the outbox) to set it with the invite-accept endpoint.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from ..models import Doctor, OutboxEmail, Patient, Specialty, User
+from . import directory_cache
+
+USER_IMPORT_DEFAULTS = {
+    'BATCH_SIZE': 1000,
+    # Password hashing processes; 1 hashes in the importing process
+    'WORKERS': os.cpu_count() or 1,
+    'INVITE_URL': 'http://localhost:3000/invite/{uid}/{token}/',
+}
+
+FORMATS = ('csv', 'ndjson')
+ROLES = {role for role, _ in User.ROLE_CHOICES}
+# Errors kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+INVITE_SUBJECT = "You have been invited to the clinic"
+INVITE_BODY = (
+    "Hello {username},\n\n"
+    "An account has been created for you. Choose your password here:\n{url}\n"
+)
+
+
+def user_import_setting(name):
+    return getattr(settings, 'USER_IMPORT', {}).get(name, USER_IMPORT_DEFAULTS[name])
+
+
+class RowError(Exception):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    invited: int = 0
+    failed: int = 0
+    # (line number, message) of the first MAX_REPORTED_ERRORS failures
+    errors: list = field(default_factory=list)
+
+    def fail(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def detect_format(path):
+    return 'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def read_rows(stream, format):
+    """(line number, raw row) pairs; NDJSON lines are parsed in clean_row"""
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                yield number, line
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def clean_row(raw):
+    """Normalized field dict of one input row, or raises RowError"""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError as e:
+            raise RowError(f"invalid JSON: {e}")
+        if not isinstance(raw, dict):
+            raise RowError("expected a JSON object")
+    row = {key.strip(): value.strip() if isinstance(value, str) else value for key, value in raw.items() if key}
+
+    username = row.get('username') or ''
+    try:
+        User.username_validator(username)
+    except ValidationError:
+        raise RowError(f"invalid username {username!r}")
+    if len(username) > User._meta.get_field('username').max_length:
+        raise RowError(f"username {username!r} is too long")
+
+    email = row.get('email') or ''
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise RowError(f"invalid email {email!r}")
+
+    role = row.get('role') or 'patient'
+    if role not in ROLES:
+        raise RowError(f"unknown role {role!r}")
+
+    age = row.get('age')
+    if age in (None, ''):
+        age = None
+    else:
+        try:
+            age = int(age)
+        except (TypeError, ValueError):
+            raise RowError(f"invalid age {age!r}")
+        if age < 0:
+            raise RowError(f"invalid age {age!r}")
+
+    return {
+        'username': username,
+        'email': email,
+        'role': role,
+        'password': row.get('password') or None,
+        'first_name': row.get('first_name') or '',
+        'last_name': row.get('last_name') or '',
+        'contact': row.get('contact') or '',
+        'bio': row.get('bio') or '',
+        'specialty': row.get('specialty') or None,
+        'age': age,
+    }
+
+
+def setup_worker(settings_module):
+    """Pool initializer: worker processes started with spawn need Django configured"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+class UserImporter:
+
+    def __init__(self, batch_size=None, workers=None, invite=False, invite_url=None):
+        self.batch_size = batch_size or user_import_setting('BATCH_SIZE')
+        self.workers = workers or user_import_setting('WORKERS')
+        self.invite = invite
+        self.invite_url = invite_url or user_import_setting('INVITE_URL')
+        self.result = ImportResult()
+        self._specialties = {}
+        self._executor = None
+
+    def run(self, rows):
+        """Import (line number, raw row) pairs; returns the ImportResult"""
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=setup_worker, initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'),),
+            )
+        try:
+            for chunk in chunked(rows, self.batch_size):
+                self.import_chunk(chunk)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        return self.result
+
+    def import_chunk(self, chunk):
+        rows, seen = [], set()
+        for line, raw in chunk:
+            try:
+                row = clean_row(raw)
+            except RowError as e:
+                self.result.fail(line, str(e))
+                continue
+            if row['username'] in seen:
+                self.result.fail(line, f"duplicate username {row['username']!r} in file")
+                continue
+            seen.add(row['username'])
+            rows.append(row)
+
+        # Earlier chunks are committed, so this also catches repeats across chunks
+        existing = set(User.objects.filter(username__in=seen).values_list('username', flat=True))
+        self.result.skipped += len(existing)
+        rows = [row for row in rows if row['username'] not in existing]
+        if not rows:
+            return
+
+        hashes = self.hash_passwords([row['password'] for row in rows])
+        specialties = self.specialties({row['specialty'] for row in rows if row['role'] == 'doctor'} - {None})
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    username=row['username'], email=row['email'], role=row['role'], password=password,
+                    first_name=row['first_name'], last_name=row['last_name'],
+                )
+                for row, password in zip(rows, hashes)
+            ])
+            doctors = Doctor.objects.bulk_create([
+                Doctor(user=user, specialty=specialties.get(row['specialty']), bio=row['bio'], contact=row['contact'])
+                for row, user in zip(rows, users) if row['role'] == 'doctor'
+            ])
+            Patient.objects.bulk_create([
+                Patient(user=user, age=row['age'], contact=row['contact'])
+                for row, user in zip(rows, users) if row['role'] == 'patient'
+            ])
+            if self.invite:
+                invites = OutboxEmail.objects.bulk_create([
+                    self.invite_email(user)
+                    for row, user in zip(rows, users) if row['password'] is None and user.email
+                ])
+                self.result.invited += len(invites)
+            if doctors:
+                transaction.on_commit(directory_cache.bump_version)
+        self.result.created += len(users)
+
+    def hash_passwords(self, passwords):
+        """Hashes in input order; rows without a password get an unusable one"""
+        hashes = [make_password(None) for _ in passwords]
+        given = [(i, password) for i, password in enumerate(passwords) if password is not None]
+        if self._executor is None or len(given) < 2:
+            hashed = map(make_password, (password for _, password in given))
+        else:
+            chunksize = max(1, len(given) // (self.workers * 4))
+            hashed = self._executor.map(make_password, [password for _, password in given], chunksize=chunksize)
+        for (i, _), value in zip(given, hashed):
+            hashes[i] = value
+        return hashes
+
+    def specialties(self, names):
+        """Specialty rows by name, created if missing"""
+        missing = names - self._specialties.keys()
+        if missing:
+            Specialty.objects.bulk_create([Specialty(name=name) for name in missing], ignore_conflicts=True)
+            self._specialties.update(Specialty.objects.filter(name__in=missing).in_bulk(field_name='name'))
+        return self._specialties
+
+    def invite_email(self, user):
+        url = self.invite_url.format(
+            uid=urlsafe_base64_encode(force_bytes(user.pk)),
+            token=default_token_generator.make_token(user),
+        )
+        return OutboxEmail(
+            subject=INVITE_SUBJECT,
+            body=INVITE_BODY.format(username=user.username, url=url),
+            recipients=[user.email],
+        )
@@ -0,0 +1,61 @@
+import contextvars
+import queue
+import threading
+from concurrent.futures import Future
+
+from django.db import close_old_connections, connection
+
+from ..sqlite import sqlite_setting
+
+
+class SingleWriter:
+    """
+    Run writes one at a time on a dedicated thread with its own connection.
+
+    On SQLite only one transaction can write at a time. Threads of a worker
+    process that write concurrently just queue up on the database lock and
+    burn their busy timeout. Here they queue in memory instead, and a lock
+    is never contended within the process. Callers block until their write
+    is done and get its result or exception.
+
+    Callers inside a transaction run inline: their connection may already
+    hold the write lock, which the writer thread would wait on forever.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def _work(self):
+        while True:
+            context, func, args, kwargs, future = self._queue.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(context.run(func, *args, **kwargs))
+                except BaseException as error:
+                    future.set_exception(error)
+            close_old_connections()
+            self._queue.task_done()
+
+    def run(self, func, *args, **kwargs):
+        if (
+            not sqlite_setting('WRITE_QUEUE')
+            or threading.current_thread() is self._thread
+            or connection.in_atomic_block
+        ):
+            return func(*args, **kwargs)
+        self._ensure_thread()
+        future = Future()
+        # The caller's context carries request state, e.g. db_router's record of writes
+        self._queue.put((contextvars.copy_context(), func, args, kwargs, future))
+        return future.result()
+
+
+write_queue = SingleWriter()
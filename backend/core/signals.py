@@ -1,8 +1,19 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.conf import settings
 from .models.doctor import Doctor
 from .models.patient import Patient
+from .models.availability import Availability
+from .models.appointment import Appointment
+from .models.slot import Slot
+from .models.specialty import Specialty
+from .services.slots import sync_availability_slots
+from .services.overlap_index import overlap_index
+from .services import directory_cache
+from .services.user_cache import user_cache
+from .services import token_blacklist
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 
 
 @receiver(post_save,sender=settings.AUTH_USER_MODEL)
@@ -15,4 +26,89 @@ def create_user_profile(sender, instance, created, **kwargs):
         if role == 'doctor':
             Doctor.objects.create(user=instance)
         elif role == 'patient':
-            Patient.objects.create(user=instance)
\ No newline at end of file
+            Patient.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Availability)
+def sync_slots(sender, instance, **kwargs):
+    """
+    Keep the materialized Slot rows in line with the availability.
+    """
+    sync_availability_slots(instance)
+
+
+@receiver(post_save, sender=Appointment)
+def book_slot(sender, instance, **kwargs):
+    """
+    Mark the slot covered by the appointment as booked, releasing the
+    previous one when an appointment is moved.
+    """
+    slot = Slot.objects.for_range(
+        instance.doctor_id, instance.start_date_time, instance.end_date_time
+    ).first()
+    if slot is not None and slot.appointment_id == instance.pk:
+        return
+    Slot.objects.release(instance)
+    if slot is not None:
+        Slot.objects.book(slot, instance)
+
+
+@receiver(pre_delete, sender=Appointment)
+def release_slot(sender, instance, **kwargs):
+    """
+    Free the slot of a cancelled appointment.
+    """
+    Slot.objects.release(instance)
+
+
+@receiver(post_save, sender=Appointment)
+def index_appointment(sender, instance, **kwargs):
+    """
+    Add the appointment to the overlap index once the booking is committed.
+    """
+    transaction.on_commit(lambda: overlap_index.add(instance))
+
+
+@receiver(post_delete, sender=Appointment)
+def unindex_appointment(sender, instance, **kwargs):
+    transaction.on_commit(lambda: overlap_index.remove(instance))
+
+
+@receiver([post_save, post_delete], sender=Doctor)
+@receiver([post_save, post_delete], sender=Specialty)
+def invalidate_doctor_directory(sender, **kwargs):
+    """
+    Drop the cached doctor directory when a listed doctor or specialty changes.
+    """
+    directory_cache.bump_version()
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_doctor_directory_for_user(sender, instance, **kwargs):
+    if instance.role == 'doctor':
+        directory_cache.bump_version()
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop the user from the authentication cache so the next request reloads it.
+    """
+    user_cache.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Doctor)
+@receiver([post_save, post_delete], sender=Patient)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    user_cache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    """
+    Add the token to this process's filter now, and tell other workers once
+    the row is committed, so they never sync before they can see it.
+    """
+    if created:
+        token_blacklist.blacklist_filter.add(instance.token.jti)
+        transaction.on_commit(token_blacklist.bump_version)
@@ -0,0 +1,56 @@
+"""
+Production settings for SQLite, applied to every new connection.
+
+- WAL lets readers run alongside the single writer.
+- busy_timeout makes a writer wait for the lock instead of failing with
+  "database is locked".
+- synchronous=NORMAL is durable in WAL mode except on power loss.
+- mmap and a larger page cache cut read syscalls.
+
+Writers should also start their transactions with BEGIN IMMEDIATE
+(DATABASES OPTIONS 'transaction_mode'). A deferred transaction that reads
+first and then writes cannot wait for the lock, and fails at once.
+
+BUSY_TIMEOUT_MS replaces the busy handler that OPTIONS 'timeout' would
+set, so leave 'timeout' out of OPTIONS.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+SQLITE_DEFAULTS = {
+    'ENABLED': True,
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'BUSY_TIMEOUT_MS': 5000,
+    'MMAP_SIZE': 256 * 1024 * 1024,
+    # Negative: KiB rather than pages
+    'CACHE_SIZE': -64 * 1024,
+    'TEMP_STORE': 'MEMORY',
+    # Funnel bookings through one writer thread per process (core.services.write_queue)
+    'WRITE_QUEUE': False,
+}
+
+
+def sqlite_setting(name):
+    return getattr(settings, 'SQLITE', {}).get(name, SQLITE_DEFAULTS[name])
+
+
+def pragmas():
+    return [
+        f"PRAGMA journal_mode={sqlite_setting('JOURNAL_MODE')}",
+        f"PRAGMA synchronous={sqlite_setting('SYNCHRONOUS')}",
+        f"PRAGMA busy_timeout={int(sqlite_setting('BUSY_TIMEOUT_MS'))}",
+        f"PRAGMA mmap_size={int(sqlite_setting('MMAP_SIZE'))}",
+        f"PRAGMA cache_size={int(sqlite_setting('CACHE_SIZE'))}",
+        f"PRAGMA temp_store={sqlite_setting('TEMP_STORE')}",
+    ]
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not sqlite_setting('ENABLED'):
+        return
+    with connection.cursor() as cursor:
+        for pragma in pragmas():
+            cursor.execute(pragma)
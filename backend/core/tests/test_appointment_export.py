@@ -0,0 +1,72 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Appointment, Specialty, User
+
+
+class AppointmentExportTests(APITestCase):
+
+    def setUp(self):
+        self.day = timezone.localdate() + timedelta(days=1)
+        self.admin = User.objects.create_user(username="admin", role="admin")
+        self.doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        self.doctor.specialty = Specialty.objects.create(name="Cardiology")
+        self.doctor.save()
+        other = User.objects.create_user(username="other", role="doctor").doctor
+        patient = User.objects.create_user(username="pat", role="patient").patient_profile
+        for days, doctor in [(0, self.doctor), (1, self.doctor), (2, self.doctor), (0, other)]:
+            start = timezone.make_aware(datetime.combine(self.day + timedelta(days=days), time(9)))
+            Appointment.objects.create(
+                doctor=doctor, patient=patient, start_date_time=start, end_date_time=start + timedelta(minutes=30),
+            )
+
+    def export(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse("appointment-export"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_doctor_exports_own_appointments_as_csv(self):
+        rows = list(csv.DictReader(StringIO(self.export(self.doctor.user, doctor=999))))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row["doctor"] for row in rows}, {"doc"})
+        self.assertEqual(rows[0]["specialty"], "Cardiology")
+        self.assertEqual(rows[0]["patient"], "pat")
+
+    def test_admin_filters_by_doctor_and_date_range_as_ndjson(self):
+        content = self.export(
+            self.admin, export_format="ndjson", doctor=self.doctor.pk,
+            start_date=self.day + timedelta(days=1), end_date=self.day + timedelta(days=2),
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["doctor_id"], self.doctor.pk)
+        self.assertTrue(rows[0]["start_date_time"].startswith(str(self.day + timedelta(days=1))))
+
+    def test_rows_and_names_come_from_one_query(self):
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("appointment-export"))
+            b"".join(response.streaming_content)
+        self.assertEqual(len(captured.captured_queries), 1)
+
+    def test_patients_cannot_export(self):
+        self.client.force_authenticate(User.objects.get(username="pat"))
+        self.assertEqual(self.client.get(reverse("appointment-export")).status_code, 403)
+
+    def test_command_writes_ndjson(self):
+        out = StringIO()
+        call_command("export_appointments", format="ndjson", doctor=self.doctor.pk, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
@@ -0,0 +1,116 @@
+import csv
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import generics
+from rest_framework.test import APITestCase
+
+from core.history import ArchivedHistoryMixin
+from core.models import Appointment, ArchivedAppointment, Availability, Slot, User
+from core.services.archive import archive_appointments, archive_cutoff
+
+
+class ArchiveTests(APITestCase):
+
+    def setUp(self):
+        self.doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        self.patient = User.objects.create_user(username="pat", role="patient").patient_profile
+        self.today = timezone.localdate()
+        # Five appointments well past the horizon, two recent, two upcoming
+        self.old = [self.book(-400 - n) for n in range(5)]
+        self.recent = [self.book(-10), self.book(-3)]
+        self.upcoming = [self.book(2), self.book(5)]
+
+    def book(self, days):
+        start = timezone.make_aware(datetime.combine(self.today + timedelta(days=days), time(9)))
+        return Appointment.objects.create(
+            doctor=self.doctor, patient=self.patient, start_date_time=start, end_date_time=start + timedelta(minutes=30),
+        )
+
+    def ids(self, appointments):
+        return sorted(a.pk for a in appointments)
+
+    def test_moves_only_appointments_past_the_horizon(self):
+        archived = archive_appointments(archive_cutoff(365), batch_size=2)
+
+        self.assertEqual(archived, 5)
+        self.assertEqual(self.ids(ArchivedAppointment.objects.all()), self.ids(self.old))
+        self.assertEqual(self.ids(Appointment.objects.all()), self.ids(self.recent + self.upcoming))
+        kept = ArchivedAppointment.objects.get(pk=self.old[0].pk)
+        self.assertEqual(
+            (kept.doctor_id, kept.patient_id, kept.start_date_time),
+            (self.doctor.pk, self.patient.pk, self.old[0].start_date_time),
+        )
+
+    def test_interrupted_runs_resume(self):
+        self.assertEqual(archive_appointments(archive_cutoff(365), batch_size=2, max_batches=1), 2)
+        self.assertEqual(archive_appointments(archive_cutoff(365), batch_size=2), 3)
+        self.assertEqual(archive_appointments(archive_cutoff(365), batch_size=2), 0)
+        self.assertEqual(ArchivedAppointment.objects.count(), 5)
+
+    def test_archived_slots_stay_booked(self):
+        day = self.today - timedelta(days=500)
+        availability = Availability(doctor=self.doctor, date=day, start_time=time(9), end_time=time(10))
+        # bulk_create skips the validation of past dates and the slot sync
+        Availability.objects.bulk_create([availability])
+        slot = Slot.objects.create(
+            availability=Availability.objects.get(date=day), doctor=self.doctor, date=day,
+            start_time=time(9), end_time=time(9, 30), is_free=False, appointment=self.old[0],
+        )
+
+        archive_appointments(archive_cutoff(365))
+
+        slot.refresh_from_db()
+        self.assertEqual((slot.is_free, slot.appointment_id), (False, None))
+
+    def test_command(self):
+        out = StringIO()
+        call_command("archive_appointments", "--horizon-days", "5", "--dry-run", stdout=out)
+        self.assertIn("6 appointment(s)", out.getvalue())
+        self.assertEqual(ArchivedAppointment.objects.count(), 0)
+
+        call_command("archive_appointments", "--horizon-days", "5", "--batch-size", "4", stdout=out)
+        self.assertIn("Archived 6 appointment(s)", out.getvalue())
+        self.assertEqual(self.ids(Appointment.objects.all()), self.ids([self.recent[1]] + self.upcoming))
+
+    def test_history_includes_archive_on_request(self):
+        archive_appointments(archive_cutoff(365))
+        self.client.force_authenticate(self.patient.user)
+        url = reverse("patient-appointment-list-create")
+
+        live = self.client.get(url).data['results']
+        self.assertEqual([a['id'] for a in live], [a.pk for a in self.recent + self.upcoming])
+
+        # Oldest first across both tables, paged with one cursor
+        everything = sorted(self.old + self.recent + self.upcoming, key=lambda a: a.start_date_time)
+        ids, next_url = [], url + "?include_archived=true&page_size=3"
+        while next_url:
+            page = self.client.get(next_url).data
+            ids += [a['id'] for a in page['results']]
+            next_url = page['next']
+        self.assertEqual(ids, [a.pk for a in everything])
+
+        self.assertEqual(self.client.get(url, {"include_archived": "maybe"}).status_code, 400)
+
+    def test_doctor_history_and_export_include_archive(self):
+        archive_appointments(archive_cutoff(365))
+        self.client.force_authenticate(self.doctor.user)
+
+        results = self.client.get(reverse("doctor-appointments"), {"include_archived": "true"}).data['results']
+        newest_first = sorted(self.old + self.recent + self.upcoming, key=lambda a: a.start_date_time, reverse=True)
+        self.assertEqual([a['id'] for a in results], [a.pk for a in newest_first])
+        self.assertEqual(results[-1]['patient_name'], "pat")
+
+        response = self.client.get(reverse("appointment-export"), {"include_archived": "true"})
+        rows = list(csv.DictReader(StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([int(row['id']) for row in rows], [a.pk for a in reversed(newest_first)])
+
+    def test_history_views_must_read_the_archive(self):
+        class IncompleteView(ArchivedHistoryMixin, generics.ListAPIView):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteView()
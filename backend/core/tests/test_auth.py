@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.authentication import ClaimsUser
+from core.models import User
+from core.services.user_cache import user_cache
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CachedJWTAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username="pat", password="secret123", role="patient")
+        response = self.client.post(reverse("token_obtain_pair"), {"username": "pat", "password": "secret123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q["sql"] for q in captured.captured_queries if 'FROM "core_user"' in q["sql"]]
+
+    def test_claims_user_needs_no_query(self):
+        self.assertEqual(self.user_queries(reverse("patient-dashboard")), [])
+        response = self.client.get(reverse("patient-dashboard"))
+        self.assertEqual(response.data, {"message": "Welcome pat!"})
+
+        user = response.wsgi_request.user
+        self.assertIsInstance(user, ClaimsUser)
+        # Anything beyond the claims comes from the full user
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, self.user.email)
+
+    def test_full_user_is_cached_until_saved(self):
+        url = reverse("patient-appointment-list-create")
+        self.assertEqual(len(self.user_queries(url)), 1)
+        self.assertEqual(self.user_queries(url), [])
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 401)
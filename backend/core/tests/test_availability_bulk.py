@@ -0,0 +1,136 @@
+from datetime import time, timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Availability, Slot, User
+
+
+class BulkAvailabilityTests(APITestCase):
+
+    def setUp(self):
+        self.doctor_user = User.objects.create_user(username="doc", role="doctor")
+        self.client.force_authenticate(self.doctor_user)
+        self.url = reverse("availability-bulk")
+        # Start on a Monday so weekday maths in the assertions stay simple
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday())
+
+    def test_weekly_template_over_a_quarter(self):
+        payload = {
+            "template": [
+                {"weekday": 0, "start_time": "09:00", "end_time": "12:00"},
+                {"weekday": 2, "start_time": "14:00", "end_time": "16:00", "slot_duration": 60},
+                {"weekday": 4, "start_time": "09:00", "end_time": "10:00", "slot_duration": 15},
+            ],
+            "start_date": self.monday.isoformat(),
+            "end_date": (self.monday + timedelta(weeks=13, days=-1)).isoformat(),
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["created"], 39)
+        self.assertEqual(Availability.objects.count(), 39)
+        self.assertEqual(Slot.objects.count(), 13 * (6 + 2 + 4))
+        self.assertLess(len(ctx.captured_queries), 15)
+
+    def test_conflicts_are_reported_per_item_and_nothing_is_written(self):
+        Availability.objects.create(
+            doctor=self.doctor_user.doctor, date=self.monday, start_time=time(10), end_time=time(11)
+        )
+        day = self.monday.isoformat()
+        payload = {"items": [
+            {"date": day, "start_time": "08:00", "end_time": "09:00"},
+            {"date": day, "start_time": "10:30", "end_time": "12:00"},
+            {"date": day, "start_time": "08:30", "end_time": "08:45"},
+            {"date": day, "start_time": "13:00", "end_time": "12:00"},
+        ]}
+
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        errors = {e["index"]: e["errors"] for e in response.data["errors"]}
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertIn("existing slot", errors[1][0])
+        self.assertIn("item 0", errors[2][0])
+        self.assertIn("End time", errors[3][0])
+        self.assertEqual(Availability.objects.count(), 1)
+
+        payload["skip_invalid"] = True
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(len(response.data["errors"]), 3)
+
+    def test_items_covering_or_starting_before_an_existing_row_are_reported(self):
+        Availability.objects.create(
+            doctor=self.doctor_user.doctor, date=self.monday, start_time=time(10), end_time=time(11)
+        )
+        day = self.monday.isoformat()
+        payload = {"items": [
+            # Covers the existing 10:00-11:00
+            {"date": day, "start_time": "09:00", "end_time": "12:00"},
+            {"date": (self.monday + timedelta(days=1)).isoformat(), "start_time": "09:00", "end_time": "10:00"},
+        ]}
+
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        errors = {e["index"]: e["errors"] for e in response.data["errors"]}
+        self.assertEqual(list(errors), [0])
+        self.assertIn("existing slot", errors[0][0])
+
+        # Starts before the existing row and runs into it
+        payload["items"][0]["end_time"] = "10:30"
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [0])
+        self.assertEqual(Availability.objects.count(), 1)
+
+    def test_rejected_items_do_not_block_later_ones(self):
+        Availability.objects.create(
+            doctor=self.doctor_user.doctor, date=self.monday, start_time=time(10), end_time=time(11)
+        )
+        day = self.monday.isoformat()
+        payload = {"skip_invalid": True, "items": [
+            # Runs into the existing row, so never created
+            {"date": day, "start_time": "08:00", "end_time": "10:30"},
+            {"date": day, "start_time": "08:30", "end_time": "09:00"},
+        ]}
+
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [0])
+
+    def test_conflicting_concurrent_insert_is_a_400(self):
+        # Another request saved 09:00 between this one's validation and insert
+        Availability.objects.create(
+            doctor=self.doctor_user.doctor, date=self.monday, start_time=time(9), end_time=time(10)
+        )
+        payload = {"items": [{"date": self.monday.isoformat(), "start_time": "09:00", "end_time": "10:00"}]}
+
+        with mock.patch("core.services.availability_bulk.find_overlaps", return_value={}):
+            response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("saved at the same time", response.data["errors"][0]["errors"][0])
+        self.assertEqual(Availability.objects.count(), 1)
+
+    def test_item_count_is_limited(self):
+        item = {"date": self.monday.isoformat(), "start_time": "09:00", "end_time": "10:00"}
+        response = self.client.post(self.url, {"items": [item] * 1001}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Availability.objects.count(), 0)
+
+    def test_patients_cannot_bulk_create(self):
+        patient = User.objects.create_user(username="pat", role="patient")
+        self.client.force_authenticate(patient)
+        response = self.client.post(self.url, {"items": []}, format="json")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,71 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Appointment, Availability, User
+
+
+class AvailabilitySlotListingTests(APITestCase):
+
+    def setUp(self):
+        self.patient_user = User.objects.create_user(username="patient", password="secret123", role="patient")
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def make_doctor(self, username):
+        user = User.objects.create_user(username=username, password="secret123", role="doctor")
+        return user.doctor
+
+    def add_availabilities(self, doctor, days, first_day=0):
+        for offset in range(first_day, first_day + days):
+            Availability.objects.create(
+                doctor=doctor,
+                date=self.tomorrow + timedelta(days=offset),
+                start_time=time(9, 0),
+                end_time=time(12, 0),
+                slot_duration=30,
+            )
+
+    def book(self, doctor, date, hour, minute=0):
+        start = timezone.make_aware(datetime.combine(date, time(hour, minute)))
+        return Appointment.objects.create(
+            doctor=doctor,
+            patient=self.patient_user.patient_profile,
+            start_date_time=start,
+            end_date_time=start + timedelta(minutes=30),
+        )
+
+    def list_availabilities(self):
+        self.client.force_authenticate(self.patient_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("availability-list"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_booked_slots_are_marked_unavailable(self):
+        doctor = self.make_doctor("doc")
+        self.add_availabilities(doctor, 1)
+        self.book(doctor, self.tomorrow, 10)
+
+        response, _ = self.list_availabilities()
+
+        slots = {s["start_time"]: s["is_available"] for s in response.data["results"][0]["time_slots"]}
+        self.assertFalse(slots["10:00"])
+        self.assertTrue(slots["09:00"])
+        self.assertTrue(slots["11:30"])
+
+    def test_query_count_does_not_grow_with_availabilities(self):
+        doctor = self.make_doctor("doc")
+        self.add_availabilities(doctor, 1)
+        _, small = self.list_availabilities()
+
+        other = self.make_doctor("doc2")
+        self.add_availabilities(doctor, 5, first_day=1)
+        self.add_availabilities(other, 5)
+        self.book(other, self.tomorrow, 9)
+        _, large = self.list_availabilities()
+
+        self.assertEqual(small, large)
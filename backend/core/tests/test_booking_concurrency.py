@@ -0,0 +1,141 @@
+import threading
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from core.models import Appointment, Availability, Slot, User
+from core.services.booking import book_appointment, reschedule_appointment
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Many threads race for the same slots; each slot must be booked once"""
+
+    THREADS = 12
+    SLOTS = 4
+
+    def setUp(self):
+        self.doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        self.patients = [
+            User.objects.create_user(username=f"pat{i}", role="patient").patient_profile
+            for i in range(self.THREADS)
+        ]
+        self.date = timezone.localdate() + timedelta(days=1)
+        Availability.objects.create(
+            doctor=self.doctor, date=self.date, start_time=time(9), end_time=time(11), slot_duration=30
+        )
+
+    def at(self, minutes):
+        return timezone.make_aware(datetime.combine(self.date, time(9))) + timedelta(minutes=minutes)
+
+    def test_no_double_booking(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes, errors = [], []
+
+        def worker(patient):
+            try:
+                barrier.wait()
+                for slot in range(self.SLOTS):
+                    start = self.at(slot * 30)
+                    try:
+                        book_appointment(self.doctor, patient, start, start + timedelta(minutes=30))
+                        outcomes.append("booked")
+                    except ValidationError:
+                        outcomes.append("rejected")
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(patient,)) for patient in self.patients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(outcomes.count("booked"), self.SLOTS)
+        self.assertEqual(outcomes.count("rejected"), self.SLOTS * (self.THREADS - 1))
+        self.assertFalse(
+            Appointment.objects.values("doctor", "start_date_time").annotate(n=Count("id")).filter(n__gt=1).exists()
+        )
+        self.assertEqual(Slot.objects.filter(is_free=False, appointment__isnull=False).count(), self.SLOTS)
+
+    def test_concurrent_reschedules_claim_the_slot_once(self):
+        movers = 6
+        length = timedelta(minutes=30)
+        Availability.objects.create(
+            doctor=self.doctor, date=self.date + timedelta(days=1), start_time=time(9), end_time=time(13),
+        )
+        target = self.at(24 * 60)
+        appointments = [
+            book_appointment(self.doctor, patient, target + length * (i + 1), target + length * (i + 2))
+            for i, patient in enumerate(self.patients[:movers])
+        ]
+        barrier = threading.Barrier(movers)
+        outcomes, errors = [], []
+
+        def worker(appointment):
+            try:
+                barrier.wait()
+                try:
+                    reschedule_appointment(appointment, self.doctor, target, target + length)
+                    outcomes.append(appointment.pk)
+                except ValidationError:
+                    outcomes.append(None)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(appointment,)) for appointment in appointments]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        winners = [pk for pk in outcomes if pk is not None]
+        self.assertEqual(len(winners), 1)
+        slot = Slot.objects.for_range(self.doctor, target, target + length).get()
+        self.assertEqual(slot.appointment_id, winners[0])
+        # The winner's old slot is free again; the others kept theirs
+        self.assertEqual(Slot.objects.filter(appointment__isnull=False).count(), movers)
+        self.assertEqual(Appointment.objects.filter(start_date_time=target).count(), 1)
+
+
+class DoubleBookingMigrationTests(TransactionTestCase):
+    before = [('core', '0005_outbox_email')]
+    after = [('core', '0006_appointment_doctor_start_unique')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_unique_constraint_migration_lists_double_bookings(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        User, Appointment = apps.get_model('core', 'User'), apps.get_model('core', 'Appointment')
+        doctor = apps.get_model('core', 'Doctor').objects.create(
+            user=User.objects.create(username="doc", role="doctor")
+        )
+        patient = apps.get_model('core', 'Patient').objects.create(
+            user=User.objects.create(username="pat", role="patient")
+        )
+        start = timezone.now() + timedelta(days=1)
+        for _ in range(2):
+            Appointment.objects.create(
+                doctor=doctor, patient=patient, start_date_time=start, end_date_time=start + timedelta(minutes=30),
+            )
+
+        executor = MigrationExecutor(connection)
+        with self.assertRaisesMessage(RuntimeError, f"doctor {doctor.pk} at"):
+            executor.migrate(self.after)
+
+        # Once resolved, the migration applies (tearDown migrates forward)
+        Appointment.objects.exclude(pk=Appointment.objects.earliest('pk').pk).delete()
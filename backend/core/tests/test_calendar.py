@@ -0,0 +1,94 @@
+import base64
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Appointment, Availability, User
+
+
+def free_slots(entry):
+    """Indexes of the free slots of a calendar entry"""
+    bits = int.from_bytes(base64.b64decode(entry["free"]), "little")
+    return [i for i in range(entry["slots"]) if bits >> i & 1]
+
+
+class ScheduleCalendarTests(APITestCase):
+
+    def setUp(self):
+        self.day = timezone.localdate() + timedelta(days=1)
+        self.patient = User.objects.create_user(username="pat", role="patient")
+        self.doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        self.doctor.is_approved = True
+        self.doctor.save()
+        self.other = User.objects.create_user(username="other", role="doctor").doctor
+        for doctor in (self.doctor, self.other):
+            Availability.objects.create(doctor=doctor, date=self.day, start_time=time(9), end_time=time(12))
+        Availability.objects.create(
+            doctor=self.doctor, date=self.day + timedelta(days=1), start_time=time(14), end_time=time(15, 40),
+            slot_duration=20,
+        )
+
+    def book(self, doctor, date, hour, minute=0, length=30):
+        start = timezone.make_aware(datetime.combine(date, time(hour, minute)))
+        Appointment.objects.create(
+            doctor=doctor, patient=self.patient.patient_profile,
+            start_date_time=start, end_date_time=start + timedelta(minutes=length),
+        )
+
+    def calendar(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse("availability-calendar"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["days"]
+
+    def test_bitmap_marks_booked_slots(self):
+        self.book(self.doctor, self.day, 9, 30)
+        self.book(self.doctor, self.day, 11, 30)
+        self.book(self.doctor, self.day + timedelta(days=1), 15, length=20)
+
+        days = self.calendar(self.patient, doctor_ids=str(self.doctor.pk))
+
+        self.assertEqual(len(days), 2)
+        first, second = days
+        self.assertEqual((first["origin"], first["slot_duration"], first["slots"]), (540, 30, 6))
+        self.assertEqual(free_slots(first), [0, 2, 3, 4])
+        # 14:00-15:40 in 20 minute slots; 15:00 is slot 3
+        self.assertEqual((second["origin"], second["slots"]), (840, 5))
+        self.assertEqual(free_slots(second), [0, 1, 2, 4])
+
+    def test_defaults_to_own_schedule_for_doctors_and_approved_doctors_otherwise(self):
+        self.assertEqual({day["doctor"] for day in self.calendar(self.other.user)}, {self.other.pk})
+        self.assertEqual({day["doctor"] for day in self.calendar(self.patient)}, {self.doctor.pk})
+
+    def test_unapproved_doctors_are_hidden_unless_their_own(self):
+        both = f"{self.doctor.pk},{self.other.pk}"
+        self.assertEqual({day["doctor"] for day in self.calendar(self.patient, doctor_ids=both)}, {self.doctor.pk})
+        self.assertEqual(self.calendar(self.patient, doctor_ids=str(self.other.pk)), [])
+        # The unapproved doctor still sees their own schedule, asked for or not
+        self.assertEqual(
+            {day["doctor"] for day in self.calendar(self.other.user, doctor_ids=both)}, {self.doctor.pk, self.other.pk},
+        )
+        self.assertEqual(
+            {day["doctor"] for day in self.calendar(self.doctor.user, doctor_ids=both)}, {self.doctor.pk},
+        )
+
+    def test_started_slots_are_not_free(self):
+        today = timezone.localdate()
+        Availability.objects.create(doctor=self.doctor, date=today, start_time=time(9), end_time=time(12))
+        now = timezone.make_aware(datetime.combine(today, time(10, 15)))
+
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            days = self.calendar(self.patient, doctor_ids=str(self.doctor.pk), start_date=today, end_date=self.day)
+
+        # 09:00, 09:30 and 10:00 have started; tomorrow is untouched
+        self.assertEqual([free_slots(day) for day in days[:2]], [[3, 4, 5], [0, 1, 2, 3, 4, 5]])
+
+    def test_window_is_limited(self):
+        self.client.force_authenticate(self.patient)
+        response = self.client.get(reverse("availability-calendar"), {
+            "start_date": self.day, "end_date": self.day + timedelta(days=120),
+        })
+        self.assertEqual(response.status_code, 400)
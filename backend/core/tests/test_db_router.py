@@ -0,0 +1,101 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITransactionTestCase
+
+from core.db_router import ReplicaRouter, check_replica_cache
+from core.models import Availability, User
+from core.services.user_cache import user_cache
+
+
+# The replica is a test mirror of default: a second connection to the same database
+@override_settings(
+    READ_REPLICAS={'ALIASES': ['replica'], 'PIN_SECONDS': 5},
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class ReplicaRoutingTests(APITransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.day = timezone.localdate() + timedelta(days=1)
+        self.doctor = User.objects.create_user(username="doc", password="secret123", role="doctor").doctor
+        self.doctor.is_approved = True
+        self.doctor.save()
+        Availability.objects.create(doctor=self.doctor, date=self.day, start_time=time(9), end_time=time(11))
+        User.objects.create_user(username="pat", password="secret123", role="patient")
+        response = self.client.post(reverse("token_obtain_pair"), {"username": "pat", "password": "secret123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def captured(self, method, url, data=None):
+        """(status, SQL run on default, SQL run on the replica)"""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(url, data, format='json' if method != 'get' else None)
+        return (
+            response.status_code,
+            [q['sql'] for q in primary.captured_queries],
+            [q['sql'] for q in replica.captured_queries],
+        )
+
+    def queries(self, method, url, data=None):
+        """(status, queries on default, queries on the replica)"""
+        status, primary, replica = self.captured(method, url, data)
+        return status, len(primary), len(replica)
+
+    def book(self, hour):
+        start = timezone.make_aware(datetime.combine(self.day, time(hour)))
+        return self.queries('post', reverse('patient-appointment-list-create'), {
+            'doctor': self.doctor.pk,
+            'start_date_time': start.isoformat(),
+            'end_date_time': (start + timedelta(minutes=30)).isoformat(),
+        })
+
+    def test_safe_requests_to_flagged_views_read_from_the_replica(self):
+        status, primary, replica = self.captured('get', reverse('availability-list'))
+        self.assertEqual(status, 200)
+        self.assertTrue(replica)
+        # Only the user cache fill goes to the primary
+        self.assertTrue(all('FROM "core_user"' in sql for sql in primary))
+
+    def test_unflagged_views_and_writes_use_the_primary(self):
+        status, primary, replica = self.queries('get', reverse('patient-appointment-list-create'))
+        self.assertEqual((status, replica), (200, 0))
+
+        status, primary, replica = self.book(9)
+        self.assertEqual((status, replica), (201, 0))
+        self.assertGreater(primary, 0)
+
+    def test_client_reads_its_writes_from_the_primary(self):
+        self.assertEqual(self.book(9)[0], 201)
+        status, primary, replica = self.queries('get', reverse('availability-list'))
+        self.assertEqual((status, replica), (200, 0))
+        self.assertGreater(primary, 0)
+
+        # Other clients are not pinned
+        self.client.credentials()
+        self.client.force_authenticate(User.objects.get(username="pat"))
+        status, primary, replica = self.queries('get', reverse('availability-list'))
+        self.assertGreater(replica, 0)
+
+    def test_shared_caches_are_filled_from_the_primary(self):
+        user_cache.clear()
+        status, primary, replica = self.captured('get', reverse('availability-list'))
+        self.assertEqual(status, 200)
+        self.assertTrue(any('FROM "core_user"' in sql for sql in primary))
+        self.assertFalse(any('FROM "core_user"' in sql for sql in replica))
+        # The rest of the request still reads from the replica
+        self.assertTrue(replica)
+
+    def test_per_process_cache_is_reported(self):
+        self.assertEqual([w.id for w in check_replica_cache()], ['core.W001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_replica_cache(), [])
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Availability), 'default')
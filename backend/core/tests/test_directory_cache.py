@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Doctor, Specialty, User
+from core.services import directory_cache
+
+
+class DoctorDirectoryCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("doctors-list")
+        self.patient = User.objects.create_user(username="pat", role="patient")
+        self.doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        self.doctor.is_approved = True
+        self.doctor.save()
+        self.client.force_authenticate(self.patient)
+
+    def test_conditional_get_skips_database(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.data), 1)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.data, first.data)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_the_directory(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.doctor.specialty = Specialty.objects.create(name="Cardiology")
+        self.doctor.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["specialty"]["name"], "Cardiology")
+
+        etag = response["ETag"]
+        self.doctor.user.email = "doc@example.com"
+        self.doctor.user.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data[0]["user"]["email"], "doc@example.com")
+
+    def test_admin_actions_invalidate_the_directory(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        admin = site._registry[Doctor]
+        request = RequestFactory().post("/")
+        with mock.patch.object(admin, "message_user"):
+            admin.block_doctors(request, Doctor.objects.all())
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [])
+
+    def test_per_process_cache_expires_quickly(self):
+        with mock.patch.object(directory_cache.cache, "set", wraps=directory_cache.cache.set) as set_:
+            self.client.get(self.url)
+        self.assertEqual(set_.call_args.args[2], 5)
+        self.assertEqual([w.id for w in directory_cache.check_directory_cache()], ["core.W002"])
+
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual((directory_cache.version_timeout(), directory_cache.payload_timeout()), (None, 3600))
+            self.assertEqual(directory_cache.check_directory_cache(), [])
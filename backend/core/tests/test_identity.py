@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Doctor, Patient, Specialty, User
+from core.services.user_cache import user_cache
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class IdentityTests(APITestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.doctor_user = User.objects.create_user(username="doc", password="secret123", role="doctor")
+        self.patient_user = User.objects.create_user(username="pat", password="secret123", role="patient")
+
+    def login(self, username):
+        response = self.client.post(reverse("token_obtain_pair"), {"username": username, "password": "secret123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def identity_queries(self, url):
+        """Queries that load the user or a role profile"""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        tables = ('FROM "core_user"', 'FROM "core_doctor"', 'FROM "core_patient"')
+        return [q["sql"] for q in captured.captured_queries if any(table in q["sql"] for table in tables)]
+
+    def test_user_and_profile_load_in_one_joined_query(self):
+        self.login("doc")
+        url = reverse("doctor-profile")
+        queries = self.identity_queries(url)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"core_doctor"', queries[0])
+        self.assertIn('"core_user"', queries[0])
+        # Then served from the user cache
+        self.assertEqual(self.identity_queries(url), [])
+
+    def test_profile_change_invalidates_cached_identity(self):
+        self.login("doc")
+        url = reverse("doctor-profile")
+        self.client.get(url)
+        doctor = self.doctor_user.doctor
+        doctor.specialty = Specialty.objects.create(name="Cardiology")
+        doctor.save()
+        self.assertEqual(self.client.get(url).data["specialty"], doctor.specialty.pk)
+
+    def test_patient_without_profile_is_refused(self):
+        Patient.objects.filter(user=self.patient_user).delete()
+        self.login("pat")
+        self.assertEqual(self.client.get(reverse("patient-profile")).status_code, 404)
+        self.assertEqual(self.client.get(reverse("patient-appointment-list-create")).status_code, 403)
+
+    def test_is_doctor_uses_identity_role(self):
+        self.login("pat")
+        self.assertEqual(self.client.get(reverse("availability-my-schedule")).status_code, 403)
+
+    def test_profile_updates_do_not_write_back_a_cached_copy(self):
+        self.login("doc")
+        url = reverse("doctor-profile")
+        self.client.get(url)  # caches the profile, unapproved
+        # Approved elsewhere, e.g. by an admin on another worker
+        Doctor.objects.filter(user=self.doctor_user).update(is_approved=True)
+        User.objects.filter(pk=self.doctor_user.pk).update(email="new@example.com")
+
+        response = self.client.patch(url, {"bio": "Cardiologist", "user": {"role": "doctor"}}, format="json")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        doctor = Doctor.objects.select_related("user").get(user=self.doctor_user)
+        self.assertEqual((doctor.bio, doctor.is_approved), ("Cardiologist", True))
+        self.assertEqual(doctor.user.email, "new@example.com")
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Doctor, OutboxEmail, Patient, User
+
+CSV = """username,email,role,password,specialty,age
+alice,alice@example.com,patient,secret123,,34
+bob,bob@example.com,doctor,secret123,Cardiology,
+carol,carol@example.com,doctor,,Cardiology,
+dave,not-an-email,patient,secret123,,
+alice,alice2@example.com,patient,secret123,,
+"""
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportUsersCommandTests(APITestCase):
+
+    def write(self, content, suffix):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def run_import(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command("import_users", path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_users_with_profiles_in_batches(self):
+        out, err = self.run_import(self.write(CSV, '.csv'), batch_size=2, workers=1)
+
+        # The second alice lands in a later batch, after the first was committed
+        self.assertIn("Created 3 user(s), skipped 1 existing, 1 invalid", out)
+        self.assertIn("line 5: invalid email", err)
+        self.assertEqual(Patient.objects.get(user__username="alice").age, 34)
+        self.assertEqual(Doctor.objects.get(user__username="bob").specialty.name, "Cardiology")
+        self.assertTrue(User.objects.get(username="bob").check_password("secret123"))
+        self.assertFalse(User.objects.get(username="carol").has_usable_password())
+
+        # Rerunning skips everyone already imported
+        out, err = self.run_import(self.write(CSV, '.csv'), workers=1)
+        self.assertIn("Created 0 user(s), skipped 3 existing", out)
+        self.assertIn("duplicate username 'alice' in file", err)
+
+    def test_hashes_in_a_process_pool(self):
+        rows = "".join(
+            json.dumps({"username": f"user{i}", "password": f"secret{i}", "role": "patient"}) + "\n"
+            for i in range(6)
+        )
+        out, _ = self.run_import(self.write(rows, '.ndjson'), workers=2)
+
+        self.assertIn("Created 6 user(s)", out)
+        self.assertTrue(User.objects.get(username="user5").check_password("secret5"))
+
+    def test_invited_user_sets_password_from_link(self):
+        self.run_import(self.write(CSV, '.csv'), workers=1, invite=True)
+
+        invite = OutboxEmail.objects.get()
+        self.assertEqual(invite.recipients, ["carol@example.com"])
+        uid, token = invite.body.rstrip("/\n").split("/")[-2:]
+
+        response = self.client.post(
+            reverse("invite-accept"), {"uid": uid, "token": token, "password": "newpass123"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.get(username="carol").check_password("newpass123"))
+        # The link is single use: the token is bound to the old password
+        response = self.client.post(
+            reverse("invite-accept"), {"uid": uid, "token": token, "password": "other123"}
+        )
+        self.assertEqual(response.status_code, 400)
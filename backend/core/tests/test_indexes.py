@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Appointment, Availability, User
+from core.services.appointment_export import export_queryset
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite specific")
+class SchedulingIndexPlanTests(TestCase):
+    """The planner must pick the composite indexes for the hot query shapes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        cls.patient_user = User.objects.create_user(username="pat", role="patient")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"{index_name} not used by:\n{queryset.query}\n{plan}")
+
+    def test_overlap_check(self):
+        now = timezone.now()
+        queryset = Appointment.objects.filter(
+            doctor_id=self.doctor.pk,
+            start_date_time__lt=now + timedelta(minutes=30),
+            end_date_time__gt=now,
+        )
+        self.assertUsesIndex(queryset, "appt_doctor_range_idx")
+
+    def test_patient_appointment_list(self):
+        queryset = Appointment.objects.filter(
+            patient__user=self.patient_user
+        ).order_by("start_date_time")
+        self.assertUsesIndex(queryset, "appt_patient_start_idx")
+
+    def test_upcoming_availabilities(self):
+        queryset = Availability.objects.filter(
+            date__gte=timezone.localdate()
+        ).order_by("date", "start_time")
+        self.assertUsesIndex(queryset, "avail_date_start_idx")
+
+    def test_export_by_doctor(self):
+        today = timezone.localdate()
+        queryset = export_queryset(self.doctor.pk, today, today + timedelta(days=30))
+        self.assertUsesIndex(queryset, "appt_doctor_")
+        self.assertNotIn("TEMP B-TREE", queryset.explain())
+
+    def test_export_by_date_range(self):
+        today = timezone.localdate()
+        queryset = export_queryset(start_date=today, end_date=today + timedelta(days=30))
+        self.assertUsesIndex(queryset, "appt_start_idx")
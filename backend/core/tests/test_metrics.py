@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import time as clock
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core import metrics
+from core.metrics import Registry, exposition
+from core.models import User
+
+
+class ExpositionTests(SimpleTestCase):
+
+    def test_counter_and_histogram_format(self):
+        registry = Registry()
+        requests = registry.counter("requests_total", "Requests.", ["view"])
+        latency = registry.histogram("latency_seconds", "Latency.", ["view"], buckets=(0.1, 1.0))
+        requests.inc(view='say "hi"')
+        latency.observe(0.05, view="a")
+        latency.observe(0.5, view="a")
+
+        text = exposition(registry.collect())
+
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{view="say \\"hi\\""} 1', text)
+        self.assertIn('latency_seconds_bucket{view="a",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{view="a",le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{view="a",le="+Inf"} 2', text)
+        self.assertIn('latency_seconds_count{view="a"} 2', text)
+
+    def test_multiprocess_files_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS={"MULTIPROCESS_DIR": directory}):
+            this_worker, other_worker = Registry(), Registry()
+            for registry in (this_worker, other_worker):
+                registry.counter("jobs_total", "Jobs.", ["kind"]).inc(kind="email")
+                registry.histogram("job_seconds", "Job time.", buckets=(1.0,)).observe(0.5)
+            Path(directory, "metrics-999999.json").write_text(json.dumps(other_worker.snapshot()))
+
+            collected = this_worker.collect()
+
+        self.assertEqual(collected["jobs_total"]["samples"], [[["email"], 2]])
+        self.assertEqual(collected["job_seconds"]["samples"][0][1]["buckets"], [2])
+        self.assertEqual(collected["job_seconds"]["samples"][0][1]["count"], 2)
+
+    def test_throttled_changes_are_flushed_later(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS={"MULTIPROCESS_DIR": directory, "FLUSH_INTERVAL": 0.1}):
+            registry = Registry()
+            jobs = registry.counter("jobs_total", "Jobs.")
+            path = Path(directory) / f"metrics-{os.getpid()}.json"
+
+            jobs.inc()
+            jobs.inc()  # within the interval: not written yet
+            self.assertEqual(json.loads(path.read_text())["jobs_total"]["samples"], [[[], 1]])
+
+            # No further change comes, the deferred flush writes the tail
+            deadline = clock.monotonic() + 2
+            while json.loads(path.read_text())["jobs_total"]["samples"] != [[[], 2]]:
+                self.assertLess(clock.monotonic(), deadline, "tail was never flushed")
+                clock.sleep(0.02)
+
+            # At exit (atexit / gunicorn worker_exit) the tail is written at once
+            jobs.inc()
+            registry.flush(force=True)
+            self.assertEqual(json.loads(path.read_text())["jobs_total"]["samples"], [[[], 3]])
+
+
+class MetricsEndpointTests(APITestCase):
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.url = reverse("metrics")
+
+    def test_admin_only(self):
+        self.client.force_authenticate(User.objects.create_user(username="pat", role="patient"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_requests_and_booking_failures_are_exposed(self):
+        patient_user = User.objects.create_user(username="pat", role="patient")
+        doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        start = timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=1), time(9)))
+        self.client.force_authenticate(patient_user)
+        response = self.client.post(reverse("patient-appointment-list-create"), {
+            "doctor": doctor.pk,
+            "start_date_time": start.isoformat(),
+            "end_date_time": (start + timedelta(minutes=30)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(User.objects.create_user(username="admin", role="admin"))
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        text = response.content.decode()
+        self.assertIn('booking_validation_failures_total{reason="in_past"} 1', text)
+        self.assertIn(
+            'http_requests_total{view="patient-appointment-list-create",method="POST",status="400"} 1', text
+        )
+        self.assertIn('http_request_db_queries_count{view="patient-appointment-list-create"} 1', text)
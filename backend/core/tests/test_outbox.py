@@ -0,0 +1,134 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from smtplib import SMTPServerDisconnected
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Availability, OutboxEmail, User
+from core.services.outbox import drain_outbox, enqueue_email
+
+
+class BrokenConnection:
+    """Mail connection that always fails, standing in for an SMTP outage"""
+
+    def open(self):
+        return True
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError("SMTP down")
+
+
+class DroppingConnection:
+    """Mail connection the server can drop while it sits idle"""
+
+    def __init__(self):
+        self.connected = self.dropped = False
+        self.opens = 0
+        self.sent = []
+
+    def open(self):
+        if self.connected:
+            return False
+        self.connected, self.dropped = True, False
+        self.opens += 1
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, messages):
+        if not self.connected or self.dropped:
+            raise SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.extend(messages)
+        return len(messages)
+
+
+class BookingOutboxTests(APITestCase):
+
+    def test_booking_queues_email_instead_of_sending(self):
+        doctor_user = User.objects.create_user(username="doc", email="doc@example.com", role="doctor")
+        patient_user = User.objects.create_user(username="pat", email="pat@example.com", role="patient")
+        date = timezone.localdate() + timedelta(days=1)
+        Availability.objects.create(doctor=doctor_user.doctor, date=date, start_time=time(9), end_time=time(10))
+        start = timezone.make_aware(datetime.combine(date, time(9)))
+
+        self.client.force_authenticate(patient_user)
+        response = self.client.post(reverse("patient-appointment-list-create"), {
+            "doctor": doctor_user.doctor.pk,
+            "start_date_time": start.isoformat(),
+            "end_date_time": (start + timedelta(minutes=30)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.recipients, ["pat@example.com", "doc@example.com"])
+
+        call_command("send_outbox", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, OutboxEmail.STATUS_SENT)
+
+
+@override_settings(EMAIL_OUTBOX={"MAX_ATTEMPTS": 3, "BACKOFF_SECONDS": 10})
+class DrainOutboxTests(TestCase):
+
+    def test_batches_share_one_connection(self):
+        for i in range(5):
+            enqueue_email(f"Subject {i}", "Body", [f"user{i}@example.com"])
+        self.assertEqual(drain_outbox(batch_size=2), (5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.STATUS_SENT).exists())
+
+    def test_each_drain_opens_and_closes_its_connection(self):
+        connection = DroppingConnection()
+        for _ in range(2):
+            enqueue_email("Subject", "Body", ["user@example.com"])
+            self.assertEqual(drain_outbox(connection=connection), (1, 0))
+            self.assertFalse(connection.connected)
+        self.assertEqual((connection.opens, len(connection.sent)), (2, 2))
+
+    def test_dropped_connection_is_reopened(self):
+        connection = DroppingConnection()
+        connection.open()
+        connection.dropped = True
+        for i in range(2):
+            enqueue_email(f"Subject {i}", "Body", [f"user{i}@example.com"])
+
+        self.assertEqual(drain_outbox(connection=connection), (2, 0))
+        self.assertEqual(connection.opens, 2)
+
+    def test_retry_with_backoff_then_dead_letter(self):
+        email = enqueue_email("Subject", "Body", ["user@example.com"])
+
+        self.assertEqual(drain_outbox(connection=BrokenConnection()), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.STATUS_PENDING, 1))
+        self.assertIn("SMTP down", email.last_error)
+        first_retry = email.next_attempt_at - timezone.now()
+        self.assertTrue(timedelta(seconds=8) < first_retry <= timedelta(seconds=10))
+
+        # Not due yet
+        self.assertEqual(drain_outbox(connection=BrokenConnection()), (0, 0))
+
+        with self.assertLogs("core.services.outbox", "ERROR"):
+            for attempts in (2, 3):
+                OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+                drain_outbox(connection=BrokenConnection())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.STATUS_DEAD, 3))
+
+    def test_expired_lease_is_reclaimed(self):
+        email = enqueue_email("Subject", "Body", ["user@example.com"])
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            status=OutboxEmail.STATUS_SENDING, claimed_by="crashed-worker", next_attempt_at=timezone.now()
+        )
+        self.assertEqual(drain_outbox(), (1, 0))
@@ -0,0 +1,76 @@
+from datetime import datetime, time, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from core.models import Appointment, User
+from core.services.overlap_index import DoctorIntervals, overlap_index
+
+
+class DoctorIntervalsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.intervals = DoctorIntervals([(9, 10, 1), (10, 11, 2), (13, 14, 3)])
+
+    def test_overlaps(self):
+        self.assertTrue(self.intervals.overlaps(9, 10))
+        self.assertTrue(self.intervals.overlaps(8, 12))
+        self.assertTrue(self.intervals.overlaps(13, 15))
+        self.assertFalse(self.intervals.overlaps(11, 13))
+        self.assertFalse(self.intervals.overlaps(7, 9))
+        self.assertFalse(self.intervals.overlaps(14, 16))
+
+    def test_exclude_and_updates(self):
+        self.assertFalse(self.intervals.overlaps(10, 11, exclude=2))
+        self.intervals.add(2, 11, 12)
+        self.assertFalse(self.intervals.overlaps(10, 11))
+        self.intervals.remove(3)
+        self.assertFalse(self.intervals.overlaps(13, 14))
+        self.assertEqual(len(self.intervals), 2)
+
+
+class OverlapIndexTests(TestCase):
+
+    def setUp(self):
+        self.index = overlap_index
+        self.index.forget()
+        self.doctor = User.objects.create_user(username="doc", password="secret123", role="doctor").doctor
+        self.patient = User.objects.create_user(username="pat", password="secret123", role="patient").patient_profile
+        self.date = timezone.localdate() + timedelta(days=1)
+
+    def tearDown(self):
+        self.index.forget()
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.date, time(hour)))
+
+    def book(self, hour):
+        return Appointment.objects.create(
+            doctor=self.doctor, patient=self.patient,
+            start_date_time=self.at(hour), end_date_time=self.at(hour + 1),
+        )
+
+    def test_lazy_load_and_signal_updates(self):
+        self.book(9)
+        self.assertTrue(self.index.has_overlap(self.doctor.pk, self.at(9), self.at(10)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = self.book(11)
+        self.assertEqual(len(self.index.intervals(self.doctor.pk)), 2)
+        self.assertTrue(self.index.has_overlap(self.doctor.pk, self.at(11), self.at(12)))
+        self.assertFalse(self.index.has_overlap(self.doctor.pk, self.at(10), self.at(11)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.delete()
+        self.assertFalse(self.index.has_overlap(self.doctor.pk, self.at(11), self.at(12)))
+
+    def test_stale_hit_is_confirmed_against_database(self):
+        appointment = self.book(9)
+        self.index.intervals(self.doctor.pk)
+        # Bypass the signals, as if another worker had moved it
+        Appointment.objects.filter(pk=appointment.pk).update(
+            start_date_time=self.at(14), end_date_time=self.at(15)
+        )
+
+        self.assertFalse(self.index.has_overlap(self.doctor.pk, self.at(9), self.at(10)))
+        self.assertTrue(self.index.has_overlap(self.doctor.pk, self.at(14), self.at(15)))
@@ -0,0 +1,114 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Appointment, Availability, User
+from core.pagination import KeysetPagination
+
+
+@override_settings(API_PAGE_SIZE=3, API_MAX_PAGE_SIZE=5)
+class AppointmentKeysetPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.doctor_user = User.objects.create_user(username="doc", password="secret123", role="doctor")
+        self.patient_user = User.objects.create_user(username="pat", password="secret123", role="patient")
+        self.day = timezone.localdate() + timedelta(days=1)
+        for hour in range(8, 16):
+            self.book(hour)
+
+    def book(self, hour, minute=0):
+        start = timezone.make_aware(datetime.combine(self.day, time(hour, minute)))
+        return Appointment.objects.create(
+            doctor=self.doctor_user.doctor,
+            patient=self.patient_user.patient_profile,
+            start_date_time=start,
+            end_date_time=start + timedelta(minutes=30),
+        )
+
+    def walk(self, user, url):
+        self.client.force_authenticate(user)
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+            pages += 1
+            if pages == 1:
+                # Inserted behind the cursor: must not shift later pages
+                self.book(8, 30)
+        return ids, pages
+
+    def test_patient_pages_are_ascending_and_stable(self):
+        ids, pages = self.walk(self.patient_user, reverse("patient-appointment-list-create"))
+        expected = list(
+            Appointment.objects.exclude(start_date_time__time=time(8, 30)).values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_doctor_pages_are_descending(self):
+        ids, _ = self.walk(self.doctor_user, reverse("doctor-appointments"))
+        # The 08:30 insert lands ahead of the cursor here, so it is served once
+        expected = list(Appointment.objects.order_by("-start_date_time").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_page_size_is_capped_and_never_counts(self):
+        self.client.force_authenticate(self.patient_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("patient-appointment-list-create"), {"page_size": 1000})
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertFalse(any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries))
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(self.patient_user)
+        response = self.client.get(reverse("patient-appointment-list-create"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_null_cursor_values_are_invalid(self):
+        self.client.force_authenticate(self.patient_user)
+        cursor = KeysetPagination().encode_cursor([None, 1])
+        response = self.client.get(reverse("patient-appointment-list-create"), {"cursor": cursor})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(API_PAGE_SIZE=2)
+class AvailabilityKeysetPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.doctor_user = User.objects.create_user(username="doc", role="doctor")
+        self.patient_user = User.objects.create_user(username="pat", role="patient")
+        day = timezone.localdate() + timedelta(days=1)
+        for offset in range(3):
+            Availability.objects.create(
+                doctor=self.doctor_user.doctor, date=day + timedelta(days=offset), start_time=time(9), end_time=time(10)
+            )
+        # A legacy row without a date; bulk_create skips the validation
+        Availability.objects.bulk_create([
+            Availability(doctor=self.doctor_user.doctor, date=None, start_time=time(9), end_time=time(10)),
+        ])
+
+    def walk(self, user, url, params):
+        self.client.force_authenticate(user)
+        response = self.client.get(url, params)
+        dates = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            dates += [row["date"] for row in response.data["results"]]
+            if not response.data["next"]:
+                return dates
+            response = self.client.get(response.data["next"])
+
+    def test_schedule_endpoints_are_paginated(self):
+        dated = [str(d) for d in Availability.objects.exclude(date=None).values_list("date", flat=True)]
+        self.assertEqual(self.walk(self.doctor_user, reverse("availability-list"), {}), dated)
+        self.assertEqual(self.walk(self.doctor_user, reverse("availability-my-schedule"), {}), dated)
+        doctor_id = self.doctor_user.doctor.pk
+        self.assertEqual(
+            self.walk(self.patient_user, reverse("availability-by-doctor"), {"doctor_id": doctor_id}), dated,
+        )
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, time, timedelta
+
+from django.http import JsonResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import path, reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.middleware.profiling import fingerprint
+from core.models import Appointment, User
+
+
+def patient_names(request):
+    """One query for the appointments, then one per patient and one per user"""
+    appointments = Appointment.objects.all()
+    if request.GET.get('joined'):
+        appointments = appointments.select_related('patient__user')
+    return JsonResponse({'names': [a.patient.user.username for a in appointments]})
+
+
+urlpatterns = [path('patient-names/', patient_names)]
+
+
+class FingerprintTests(SimpleTestCase):
+
+    def test_literals_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "a" = %s AND "b" IN (%s, %s, %s) AND c = \'x\' LIMIT 21'),
+            fingerprint('SELECT * FROM "t" WHERE "a" = %s AND "b" IN (%s) AND c = \'y\' LIMIT 1'),
+        )
+
+
+@override_settings(SQL_PROFILING={"ENABLED": True, "N_PLUS_ONE_THRESHOLD": 3})
+class SQLProfilingMiddlewareTests(APITestCase):
+
+    def setUp(self):
+        self.doctor_user = User.objects.create_user(username="doc", role="doctor")
+        day = timezone.localdate() + timedelta(days=1)
+        for hour in range(9, 14):
+            patient = User.objects.create_user(username=f"pat{hour}", role="patient").patient_profile
+            start = timezone.make_aware(datetime.combine(day, time(hour)))
+            Appointment.objects.create(
+                doctor=self.doctor_user.doctor, patient=patient,
+                start_date_time=start, end_date_time=start + timedelta(minutes=30),
+            )
+        self.client.force_authenticate(self.doctor_user)
+
+    def test_headers_and_log_line(self):
+        with self.assertLogs("core.profiling") as logs:
+            response = self.client.get(reverse("doctor-appointments"))
+
+        self.assertGreater(int(response["X-DB-Query-Count"]), 0)
+        self.assertIn("X-DB-Time-Ms", response)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["path"], reverse("doctor-appointments"))
+        self.assertEqual(record["queries"], int(response["X-DB-Query-Count"]))
+        self.assertEqual(int(response["X-DB-N-Plus-One"]), len(record["n_plus_one"]))
+
+    @override_settings(SQL_PROFILING={"ENABLED": False})
+    def test_disabled_middleware_is_removed(self):
+        response = self.client.get(reverse("doctor-appointments"))
+        self.assertNotIn("X-DB-Query-Count", response)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_repeated_queries_are_reported(self):
+        with self.assertLogs("core.profiling") as logs:
+            response = self.client.get("/patient-names/")
+
+        # Five appointments: the patient and the user lookups each run five times
+        self.assertEqual(response["X-DB-Query-Count"], "11")
+        self.assertEqual(response["X-DB-N-Plus-One"], "2")
+        self.assertEqual(logs.records[-1].levelname, "WARNING")
+        repeated = json.loads(logs.records[-1].getMessage())["n_plus_one"]
+        self.assertEqual([r["count"] for r in repeated], [5, 5])
+        self.assertEqual(
+            sorted(r["sql"].split(" FROM ")[1].split()[0] for r in repeated),
+            ['"core_patient"', '"core_user"'],
+        )
+
+        with self.assertLogs("core.profiling") as logs:
+            response = self.client.get("/patient-names/", {"joined": "1"})
+        self.assertEqual((response["X-DB-Query-Count"], response["X-DB-N-Plus-One"]), ("1", "0"))
+        self.assertEqual(logs.records[-1].levelname, "INFO")
@@ -0,0 +1,208 @@
+"""
+Query budgets for every route in core/urls.py.
+
+Each endpoint is called at two data sizes. It fails if its query count
+grows with the number of rows (an N+1) or goes over its budget below.
+A new route fails until it gets a budget here.
+"""
+import difflib
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import urls
+from core.middleware.profiling import fingerprint
+from core.models import Appointment, Availability, Specialty, User
+from core.services.overlap_index import overlap_index
+
+# (url name, method): (acting user, max queries)
+QUERY_BUDGETS = {
+    ('token_obtain_pair', 'post'): (None, 2),
+    ('token_refresh', 'post'): (None, 2),
+    ('user-register', 'post'): (None, 3),
+    ('token_logout', 'post'): ('patient', 7),
+    ('invite-accept', 'post'): (None, 2),
+    ('doctor-dashboard', 'get'): ('doctor', 0),
+    ('patient-dashboard', 'get'): ('patient', 0),
+    ('doctor-profile', 'get'): ('doctor', 0),
+    ('doctor-profile', 'put'): ('doctor', 3),
+    ('user-view', 'get'): (None, 1),
+    ('user-view', 'post'): (None, 3),
+    ('patient-appointment-list-create', 'get'): ('patient', 1),
+    ('patient-appointment-list-create', 'post'): ('patient', 17),
+    ('patient-appointment-detail', 'get'): ('patient', 1),
+    ('patient-appointment-detail', 'put'): ('patient', 15),
+    ('doctor-appointments', 'get'): ('doctor', 1),
+    ('appointment-export', 'get'): ('doctor', 1),
+    ('doctors-list', 'get'): ('patient', 1),
+    ('slot-search', 'get'): ('patient', 1),
+    ('metrics', 'get'): ('admin', 0),
+    ('specialties-list', 'get'): ('patient', 1),
+    ('patient-profile', 'get'): ('patient', 0),
+    ('patient-profile', 'put'): ('patient', 2),
+    ('availability-list', 'get'): ('patient', 2),
+    ('availability-list', 'post'): ('doctor', 9),
+    ('availability-bulk', 'post'): ('doctor', 6),
+    ('availability-by-doctor', 'get'): ('patient', 2),
+    ('availability-my-schedule', 'get'): ('doctor', 1),
+    ('availability-detail', 'get'): ('doctor', 1),
+    ('availability-detail', 'put'): ('doctor', 11),
+    ('availability-detail', 'patch'): ('doctor', 11),
+    ('availability-detail', 'delete'): ('doctor', 3),
+    ('availability-slots', 'get'): ('patient', 2),
+    ('availability-calendar', 'get'): ('patient', 2),
+    ('api-root', 'get'): ('patient', 0),
+}
+
+SMALL, LARGE = 2, 8
+
+
+def route_names():
+    """Named routes of core/urls.py, router actions included"""
+    return {pattern.name for pattern in urls.urlpatterns if isinstance(pattern, URLPattern) and pattern.name}
+
+
+def sql_diff(small, large):
+    """Query shapes whose count grew, then a diff of the normalized SQL"""
+    small_shapes, large_shapes = Counter(map(fingerprint, small)), Counter(map(fingerprint, large))
+    grown = [
+        f"  {small_shapes[shape]} -> {count}x  {shape}"
+        for shape, count in large_shapes.items() if count > small_shapes[shape]
+    ]
+    diff = difflib.unified_diff(
+        [fingerprint(sql) for sql in small], [fingerprint(sql) for sql in large],
+        f"{SMALL} rows", f"{LARGE} rows", n=1, lineterm='',
+    )
+    return "\n".join(["Repeated queries:", *grown, "", *diff])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTests(APITestCase):
+
+    def setUp(self):
+        self.day = timezone.localdate() + timedelta(days=1)
+        self.specialty = Specialty.objects.create(name="General")
+        self.users = {
+            role: User.objects.create_user(username=role, password="secret123", role=role)
+            for role in ('admin', 'doctor', 'patient')
+        }
+        self.doctor = self.users['doctor'].doctor
+        self.doctor.specialty = self.specialty
+        self.doctor.is_approved = True
+        self.doctor.save()
+        self.patient = self.users['patient'].patient_profile
+
+    def at(self, days, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day + timedelta(days=days), time(hour, minute)))
+
+    def populate(self, start, stop):
+        """Rows i in [start, stop) for every list an endpoint can return"""
+        for i in range(start, stop):
+            other = User.objects.create_user(username=f"doctor{i}", role='doctor').doctor
+            other.specialty = Specialty.objects.create(name=f"Specialty {i}")
+            other.is_approved = True
+            other.save()
+            Availability.objects.create(doctor=other, date=self.day, start_time=time(9), end_time=time(12))
+            Availability.objects.create(doctor=self.doctor, date=self.day + timedelta(days=i), start_time=time(9), end_time=time(12))
+            Appointment.objects.create(
+                doctor=other, patient=self.patient, start_date_time=self.at(0, 9), end_date_time=self.at(0, 9, 30),
+            )
+            Appointment.objects.create(
+                doctor=self.doctor, patient=self.patient,
+                start_date_time=self.at(i, 9), end_date_time=self.at(i, 9, 30),
+            )
+            # Booked by someone else, so slots views show several patients
+            Appointment.objects.create(
+                doctor=self.doctor, patient=User.objects.create_user(username=f"patient{i}", role='patient').patient_profile,
+                start_date_time=self.at(i, 9, 30), end_date_time=self.at(i, 10),
+            )
+
+    def request_for(self, name, method):
+        """(url, payload) of a representative call"""
+        availability = Availability.objects.filter(doctor=self.doctor).first()
+        appointment = Appointment.objects.filter(patient=self.patient, doctor=self.doctor).first()
+        refresh = str(RefreshToken.for_user(self.users['patient']))
+        availability_payload = {'date': self.day + timedelta(days=60), 'start_time': '09:00', 'end_time': '12:00'}
+        requests = {
+            ('token_obtain_pair', 'post'): ({}, {'username': 'patient', 'password': 'secret123'}),
+            ('token_refresh', 'post'): ({}, {'refresh': refresh}),
+            ('user-register', 'post'): ({}, {'username': 'new', 'password': 'secret123', 'role': 'patient'}),
+            ('token_logout', 'post'): ({}, {'refresh': refresh}),
+            ('invite-accept', 'post'): ({}, {
+                'uid': urlsafe_base64_encode(force_bytes(self.users['patient'].pk)),
+                'token': default_token_generator.make_token(self.users['patient']),
+                'password': 'secret456',
+            }),
+            ('doctor-profile', 'put'): ({}, {'bio': 'Cardiologist', 'contact': '555', 'specialty': self.specialty.pk}),
+            ('user-view', 'post'): ({}, {'username': 'new', 'password': 'secret123', 'role': 'patient'}),
+            ('patient-appointment-list-create', 'post'): ({}, {
+                'doctor': self.doctor.pk,
+                'start_date_time': self.at(0, 10).isoformat(), 'end_date_time': self.at(0, 10, 30).isoformat(),
+            }),
+            ('patient-appointment-detail', 'get'): ({'pk': appointment.pk}, None),
+            ('patient-appointment-detail', 'put'): ({'pk': appointment.pk}, {
+                'doctor': self.doctor.pk,
+                'start_date_time': self.at(0, 10, 30).isoformat(), 'end_date_time': self.at(0, 11).isoformat(),
+            }),
+            ('patient-profile', 'put'): ({}, {'age': 40, 'contact': '555'}),
+            ('availability-list', 'post'): ({}, availability_payload),
+            ('availability-bulk', 'post'): ({}, {'items': [availability_payload]}),
+            ('availability-by-doctor', 'get'): ({}, {'doctor_id': self.doctor.pk}),
+            ('availability-detail', 'get'): ({'pk': availability.pk}, None),
+            ('availability-detail', 'put'): ({'pk': availability.pk}, {
+                'date': availability.date, 'start_time': '09:00', 'end_time': '12:30',
+            }),
+            ('availability-detail', 'patch'): ({'pk': availability.pk}, {'end_time': '12:30'}),
+            ('availability-detail', 'delete'): ({'pk': availability.pk}, None),
+            ('availability-slots', 'get'): ({'pk': availability.pk}, None),
+        }
+        kwargs, payload = requests.get((name, method), ({}, None))
+        return reverse(name, kwargs=kwargs), payload
+
+    def measure(self, name, method, role):
+        """SQL run by one call, rolled back so every call sees the same data"""
+        url, payload = self.request_for(name, method)
+        self.client.force_authenticate(self.users[role] if role else None)
+        cache.clear()
+        overlap_index.forget()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                response = getattr(self.client, method)(url, payload, format='json' if method != 'get' else None)
+                # Streaming responses query while their body is read
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 400, f"{method.upper()} {name}: {content[:500]}")
+        return [query['sql'] for query in captured.captured_queries]
+
+    def test_every_route_has_a_budget(self):
+        missing = route_names() - {name for name, _ in QUERY_BUDGETS}
+        self.assertFalse(missing, f"Routes without a query budget: {sorted(missing)}")
+
+    def test_query_counts_stay_flat_and_within_budget(self):
+        self.populate(0, SMALL)
+        small = {key: self.measure(*key, role) for key, (role, _) in QUERY_BUDGETS.items()}
+        self.populate(SMALL, LARGE)
+        large = {key: self.measure(*key, role) for key, (role, _) in QUERY_BUDGETS.items()}
+
+        for (name, method), (_, budget) in QUERY_BUDGETS.items():
+            with self.subTest(f"{method.upper()} {name}"):
+                queries = large[name, method]
+                if len(queries) > len(small[name, method]):
+                    self.fail(
+                        f"{len(small[name, method])} queries with {SMALL} rows, {len(queries)} with {LARGE}\n"
+                        + sql_diff(small[name, method], queries)
+                    )
+                self.assertLessEqual(
+                    len(queries), budget, "Over budget:\n" + "\n".join(map(fingerprint, queries))
+                )
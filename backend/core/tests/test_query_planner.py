@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from core.models import Appointment, Doctor
+from core.query_planner import plan_for
+from core.serializers.appointment_serializers import AppointmentSerializer
+from core.serializers.doctor_serializers import DoctorListSerializer, DoctorProfileSerializer
+
+
+class QueryPlanTests(SimpleTestCase):
+
+    def test_dotted_sources_become_joins_and_columns(self):
+        plan = plan_for(AppointmentSerializer, Appointment)
+
+        self.assertEqual(
+            plan.select_related, {'doctor', 'doctor__user', 'doctor__specialty', 'patient', 'patient__user'}
+        )
+        columns = plan.columns()
+        self.assertIn('doctor__user__username', columns)
+        self.assertNotIn('doctor__user__password', columns)
+        # Appointment.duration is a property, so the appointment row loads whole
+        self.assertIn('end_date_time', columns)
+
+    def test_nested_serializer_and_primary_key_field(self):
+        plan = plan_for(DoctorProfileSerializer, Doctor)
+
+        self.assertEqual(plan.select_related, {'user', 'specialty'})
+        self.assertIn('user__email', plan.columns())
+        # password is write-only
+        self.assertNotIn('user__password', plan.columns())
+
+    def test_method_fields_use_declared_sources(self):
+        plan = plan_for(DoctorListSerializer, Doctor)
+        self.assertEqual(plan.select_related, {'user', 'specialty'})
+        self.assertNotIn('user__password', plan.columns())
+
+    def test_reverse_relations_are_prefetched(self):
+        class DoctorAppointmentsSerializer(serializers.ModelSerializer):
+            appointment_ids = serializers.PrimaryKeyRelatedField(source='appointment_set', many=True, read_only=True)
+
+            class Meta:
+                model = Doctor
+                fields = ['id', 'appointment_ids']
+
+        plan = plan_for(DoctorAppointmentsSerializer, Doctor)
+        self.assertEqual(plan.prefetch_related, {'appointment_set'})
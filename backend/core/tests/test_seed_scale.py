@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.models import Appointment, Availability, Doctor, Patient, Slot, User
+
+
+class SeedScaleCommandTests(TestCase):
+
+    def seed(self, **options):
+        call_command(
+            "seed_scale", specialties=3, doctors=4, patients=10, days=7, past_days=7, seed=1,
+            stdout=StringIO(), **options,
+        )
+
+    def test_generates_consistent_data(self):
+        self.seed()
+
+        self.assertEqual(Doctor.objects.count(), 4)
+        self.assertEqual(Patient.objects.count(), 10)
+        self.assertTrue(Availability.objects.exists())
+        self.assertEqual(Slot.objects.count(), sum(len(a.slot_starts) for a in Availability.objects.all()))
+        # Every appointment holds exactly the slot it covers
+        self.assertGreater(Appointment.objects.count(), 0)
+        self.assertEqual(Slot.objects.filter(is_free=False).count(), Appointment.objects.count())
+        self.assertEqual(Slot.objects.filter(appointment__isnull=False).count(), Appointment.objects.count())
+        self.assertTrue(User.objects.get(username="seed-doctor-0").check_password("seed-password"))
+
+    def test_refuses_to_reuse_a_prefix(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed(prefix="other")
+        self.assertEqual(Doctor.objects.count(), 8)
@@ -0,0 +1,68 @@
+from datetime import datetime, time, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Appointment, Availability, Slot, Specialty, User
+
+
+class EarliestFreeSlotSearchTests(APITestCase):
+
+    def setUp(self):
+        self.url = reverse("slot-search")
+        self.patient = User.objects.create_user(username="pat", role="patient")
+        self.cardiology = Specialty.objects.create(name="Cardiology")
+        self.dermatology = Specialty.objects.create(name="Dermatology")
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+        self.early = self.make_doctor("early", self.cardiology, time(8))
+        self.late = self.make_doctor("late", self.cardiology, time(9))
+        self.skin = self.make_doctor("skin", self.dermatology, time(7))
+        self.client.force_authenticate(self.patient)
+
+    def make_doctor(self, username, specialty, start):
+        doctor = User.objects.create_user(username=username, role="doctor").doctor
+        doctor.specialty = specialty
+        doctor.is_approved = True
+        doctor.save()
+        for day in range(30):
+            Availability.objects.create(
+                doctor=doctor, date=self.tomorrow + timedelta(days=day),
+                start_time=start, end_time=time(start.hour + 2),
+            )
+        return doctor
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(row["doctor_name"], row["start_time"]) for row in response.data]
+
+    def test_merges_doctors_in_time_order(self):
+        Appointment.objects.create(
+            doctor=self.early, patient=self.patient.patient_profile,
+            start_date_time=timezone.make_aware(datetime.combine(self.tomorrow, time(8, 30))),
+            end_date_time=timezone.make_aware(datetime.combine(self.tomorrow, time(9))),
+        )
+        self.assertEqual(self.search(specialty=self.cardiology.pk, limit=4), [
+            ("early", "08:00"), ("early", "09:00"), ("late", "09:00"), ("early", "09:30"),
+        ])
+
+    def test_doctor_filter_and_limit(self):
+        results = self.search(doctor_ids=f"{self.late.pk},{self.skin.pk}", limit=3)
+        self.assertEqual(results, [("skin", "07:00"), ("skin", "07:30"), ("skin", "08:00")])
+
+    def test_cost_does_not_depend_on_window(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"limit": 5})
+        plan = (
+            Slot.objects.free().filter(date__gte=self.tomorrow).order_by("date", "start_time").explain()
+        )
+        self.assertIn("slot_date_free_idx", plan)
+
+    def test_rejects_oversized_window(self):
+        response = self.client.get(self.url, {
+            "start_date": self.tomorrow.isoformat(),
+            "end_date": (self.tomorrow + timedelta(days=200)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
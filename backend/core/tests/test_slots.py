@@ -0,0 +1,95 @@
+from datetime import datetime, time, timedelta
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.models import Appointment, Availability, Slot, User
+from core.services.slot_grid import slot_grid, slot_index
+
+
+class SlotSyncTests(APITestCase):
+
+    def setUp(self):
+        self.doctor = User.objects.create_user(username="doc", password="secret123", role="doctor").doctor
+        self.patient_user = User.objects.create_user(username="patient", password="secret123", role="patient")
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.availability = Availability.objects.create(
+            doctor=self.doctor, date=self.date, start_time=time(9, 0), end_time=time(11, 0), slot_duration=30,
+        )
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.date, time(hour, minute)))
+
+    def test_slots_created_with_availability(self):
+        starts = list(Slot.objects.filter(availability=self.availability).values_list("start_time", flat=True))
+        self.assertEqual(starts, [time(9, 0), time(9, 30), time(10, 0), time(10, 30)])
+        self.assertTrue(all(slot.is_free for slot in Slot.objects.all()))
+
+    def test_slots_follow_availability_edits(self):
+        self.availability.end_time = time(10, 0)
+        self.availability.save()
+        self.assertEqual(Slot.objects.count(), 2)
+
+        self.availability.slot_duration = 60
+        self.availability.save()
+        self.assertEqual(
+            list(Slot.objects.values_list("start_time", "end_time")), [(time(9, 0), time(10, 0))]
+        )
+
+        self.availability.delete()
+        self.assertFalse(Slot.objects.exists())
+
+    def test_appointment_books_and_releases_slot(self):
+        appointment = Appointment.objects.create(
+            doctor=self.doctor,
+            patient=self.patient_user.patient_profile,
+            start_date_time=self.at(9, 30),
+            end_date_time=self.at(10, 0),
+        )
+        slot = Slot.objects.get(start_time=time(9, 30))
+        self.assertFalse(slot.is_free)
+        self.assertEqual(slot.appointment, appointment)
+
+        appointment.delete()
+        slot.refresh_from_db()
+        self.assertTrue(slot.is_free)
+        self.assertIsNone(slot.appointment)
+
+    def test_booking_rejects_taken_and_misaligned_slots(self):
+        self.client.force_authenticate(self.patient_user)
+        url = reverse("patient-appointment-list-create")
+        payload = {
+            "doctor": self.doctor.pk,
+            "start_date_time": self.at(10).isoformat(),
+            "end_date_time": self.at(10, 30).isoformat(),
+        }
+
+        self.assertEqual(self.client.post(url, payload).status_code, 201)
+        self.assertFalse(Slot.objects.get(start_time=time(10, 0)).is_free)
+
+        response = self.client.post(url, payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("already booked", str(response.data))
+
+        payload["start_date_time"] = self.at(10, 15).isoformat()
+        payload["end_date_time"] = self.at(10, 45).isoformat()
+        response = self.client.post(url, payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("does not match", str(response.data))
+
+
+class SlotGridTests(SimpleTestCase):
+
+    def test_grid_holds_whole_slots_and_is_memoized(self):
+        # 09:00-10:40 in 30 minute slots: the last 10 minutes are no slot
+        self.assertEqual(slot_grid(540, 640, 30), (540, 570, 600))
+        self.assertIs(slot_grid(540, 640, 30), slot_grid(540, 640, 30))
+
+    def test_slot_index(self):
+        self.assertEqual(slot_index(540, 640, 30, 570, 600), 1)
+        self.assertIsNone(slot_index(540, 640, 30, 555, 585))  # off grid
+        self.assertIsNone(slot_index(540, 640, 30, 570, 630))  # wrong length
+        self.assertIsNone(slot_index(540, 640, 30, 630, 660))  # past the end
+        self.assertIsNone(slot_index(540, 640, 30, 510, 540))  # before the start
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time as clock
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.models import Appointment, Availability, User
+from core.services.booking import book_appointment
+from core.services.write_queue import SingleWriter
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    # Opens its own connections to throwaway database files
+    databases = {'default'}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+
+    def wrapper(self):
+        """A connection configured like the default database, to a throwaway file"""
+        default = connections['default']
+        wrapper = default.__class__({**default.settings_dict, 'NAME': self.path})
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def connect(self):
+        return self.wrapper().cursor()
+
+    def pragma(self, cursor, name):
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        cursor = self.connect()
+        self.assertEqual(self.pragma(cursor, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(cursor, 'busy_timeout'), 5000)
+        # NORMAL
+        self.assertEqual(self.pragma(cursor, 'synchronous'), 1)
+
+    @override_settings(SQLITE={'ENABLED': False})
+    def test_tuning_can_be_disabled(self):
+        cursor = self.connect()
+        self.assertEqual(self.pragma(cursor, 'journal_mode'), 'delete')
+
+    def test_writers_wait_for_the_lock(self):
+        self.connect().execute("CREATE TABLE t (n INTEGER)")
+        # Another process holds the write lock for a moment
+        other = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.addCleanup(other.close)
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("INSERT INTO t VALUES (1)")
+        threading.Timer(0.3, other.execute, ["COMMIT"]).start()
+
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        started = clock.monotonic()
+        # What atomic() runs to open a transaction: BEGIN IMMEDIATE
+        wrapper._start_transaction_under_autocommit()
+        with wrapper.cursor() as cursor:
+            cursor.execute("INSERT INTO t VALUES (2)")
+        wrapper.commit()
+
+        self.assertGreaterEqual(clock.monotonic() - started, 0.25)
+        self.assertEqual(other.execute("SELECT count(*) FROM t").fetchone()[0], 2)
+
+
+@override_settings(SQLITE={'WRITE_QUEUE': True})
+class WriteQueueTests(TransactionTestCase):
+
+    def setUp(self):
+        self.writer = SingleWriter()
+
+    def test_writes_run_in_order_on_one_thread(self):
+        ran = []
+
+        def write(n):
+            ran.append((n, threading.current_thread().name))
+            return n * 2
+
+        results = []
+        threads = [threading.Thread(target=lambda n=n: results.append(self.writer.run(write, n))) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), [n * 2 for n in range(8)])
+        self.assertEqual({name for _, name in ran}, {'sqlite-writer'})
+
+    def test_errors_reach_the_caller(self):
+        def fail():
+            raise ValidationError("taken")
+
+        with self.assertRaises(ValidationError):
+            self.writer.run(fail)
+
+    def test_callers_in_a_transaction_run_inline(self):
+        with transaction.atomic():
+            self.assertEqual(self.writer.run(lambda: threading.current_thread().name), threading.current_thread().name)
+
+    def test_bookings_go_through_the_writer(self):
+        doctor = User.objects.create_user(username="doc", role="doctor").doctor
+        patient = User.objects.create_user(username="pat", role="patient").patient_profile
+        day = timezone.localdate() + timedelta(days=1)
+        Availability.objects.create(doctor=doctor, date=day, start_time=time(9), end_time=time(10))
+        start = timezone.make_aware(datetime.combine(day, time(9)))
+
+        appointment = self.writer.run(book_appointment, doctor, patient, start, start + timedelta(minutes=30))
+
+        self.assertTrue(Appointment.objects.filter(pk=appointment.pk, patient=patient).exists())
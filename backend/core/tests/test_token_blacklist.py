@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.models import User
+from core.services.token_blacklist import BlacklistFilter, BloomFilter, blacklist_filter
+from core.token_utils import FilteredRefreshToken
+
+
+class BloomFilterTests(TestCase):
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        self.assertTrue(all(f"jti-{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RefreshBlacklistTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.forget()
+        self.user = User.objects.create_user(username="pat", password="secret123", role="patient")
+        self.refresh = FilteredRefreshToken.for_user(self.user)
+
+    def blacklist_queries(self, refresh):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(reverse("token_refresh"), {"refresh": str(refresh)})
+        queries = [q["sql"] for q in captured.captured_queries if "token_blacklist_blacklistedtoken" in q["sql"]]
+        return response, queries
+
+    @override_settings(TOKEN_BLACKLIST_FILTER={'SYNC_SECONDS': 60})
+    def test_unlisted_token_refreshes_without_blacklist_query(self):
+        self.blacklist_queries(self.refresh)  # builds the filter
+        response, queries = self.blacklist_queries(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_logged_out_token_is_refused(self):
+        self.blacklist_queries(self.refresh)
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse("token_logout"), {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, 205)
+
+        response, queries = self.blacklist_queries(self.refresh)
+        self.assertEqual(response.status_code, 401)
+        # A filter hit, confirmed in the database
+        self.assertEqual(len(queries), 1)
+
+    def test_tokens_blacklisted_by_another_worker_are_synced(self):
+        other_worker = BlacklistFilter()
+        self.assertFalse(other_worker.is_blacklisted(self.refresh["jti"]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.refresh.blacklist()
+        self.assertTrue(other_worker.is_blacklisted(self.refresh["jti"]))
+
+    def worker(self, name):
+        """A filter with its own per-process cache, as under gunicorn with LocMemCache"""
+        return BlacklistFilter(cache=LocMemCache(name, {}))
+
+    @override_settings(TOKEN_BLACKLIST_FILTER={'SYNC_SECONDS': 0})
+    def test_workers_with_separate_caches_see_each_others_logouts(self):
+        first, second = self.worker("first"), self.worker("second")
+        self.assertFalse(first.is_blacklisted(self.refresh["jti"]))
+        self.assertFalse(second.is_blacklisted(self.refresh["jti"]))
+
+        # Blacklisted through the first worker: only its cache hears of it
+        with self.captureOnCommitCallbacks(execute=True):
+            self.refresh.blacklist()
+        first.add(self.refresh["jti"])
+
+        self.assertTrue(second.is_blacklisted(self.refresh["jti"]))
+
+    @override_settings(TOKEN_BLACKLIST_FILTER={'SYNC_SECONDS': 0})
+    def test_rows_committed_behind_the_last_loaded_pk_are_loaded(self):
+        other = self.worker("other")
+        later = FilteredRefreshToken.for_user(self.user)
+        later.blacklist()
+        self.assertTrue(other.is_blacklisted(later["jti"]))
+
+        # A transaction that took a lower pk commits after the sync
+        token = OutstandingToken.objects.get(jti=self.refresh["jti"])
+        BlacklistedToken.objects.create(pk=BlacklistedToken.objects.get().pk - 1, token=token)
+        self.assertTrue(other.is_blacklisted(self.refresh["jti"]))
+
+
+class PurgeExpiredTokensTests(TestCase):
+
+    def test_purges_expired_tokens_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            token = OutstandingToken.objects.create(jti=f"old-{i}", token="x", expires_at=now - timedelta(days=1))
+            BlacklistedToken.objects.create(token=token)
+        OutstandingToken.objects.create(jti="live", token="x", expires_at=now + timedelta(days=1))
+
+        out = StringIO()
+        call_command("purge_expired_tokens", batch_size=2, stdout=out)
+
+        self.assertIn("Deleted 5", out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), ["live"])
+        self.assertFalse(BlacklistedToken.objects.exists())
@@ -1,11 +1,31 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import serializers
 
+from core.services.token_blacklist import blacklist_filter
+
+
+class FilteredRefreshToken(RefreshToken):
+    """Refresh token whose blacklist check goes through the in-memory filter"""
+
+    def check_blacklist(self):
+        if blacklist_filter.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = FilteredRefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
+        # Identity claims read by core.authentication.ClaimsUser
         token['role'] = user.role
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
         return token
 
     def validate(self, attrs):
@@ -20,4 +40,8 @@ class LogoutSerializer(serializers.Serializer):
     """
     Used for blacklisting refresh tokens during logout.
     """
-    refresh = serializers.CharField()
\ No newline at end of file
+    refresh = serializers.CharField()
+
+
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
@@ -1,11 +1,12 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 from core.views.doctor_views import DoctorDashboardView
 from core.views.patient_views import PatientDashboardView
 from core.views.auth_views import (
     UserRegistrationView,
     MyTokenObtainPairView,
+    MyTokenRefreshView,
+    InviteAcceptView,
     LogoutView,
 )
 from core.views.availabilities_views import AvailabilityViewSet
@@ -19,6 +20,9 @@ from core.views.doctor_views import DoctorAppointmentListView
 from core.views.patient_views import DoctorListView
 from core.views.specialty_views import SpecialtyListView
 from core.views.patient_views import PatientRetrieveUpdateAPIView
+from core.views.slot_views import EarliestFreeSlotsView
+from core.views.admin_views import MetricsView
+from core.views.export_views import AppointmentExportView
 
 
 router = DefaultRouter()
@@ -32,9 +36,10 @@ router.register(
 urlpatterns = [
     # Authentication
     path("token/", MyTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/refresh/", MyTokenRefreshView.as_view(), name="token_refresh"),
     path("api/register/", UserRegistrationView.as_view(), name="user-register"),
     path("api/logout/", LogoutView.as_view(), name="token_logout"),
+    path("api/invite/accept/", InviteAcceptView.as_view(), name="invite-accept"),
     
     # Dashboards
     path(
@@ -70,10 +75,19 @@ urlpatterns = [
         name="patient-appointment-detail",
     ),
     path('api/doctor/appointments/', DoctorAppointmentListView.as_view(), name='doctor-appointments'),
+
+    # Doctors (own) and admins (all) - streaming CSV/NDJSON export
+    path('api/appointments/export/', AppointmentExportView.as_view(), name='appointment-export'),
     
     # Patient - browse doctors
     path('api/doctors/', DoctorListView.as_view(), name='doctors-list'),
     
+    # Patient - earliest free slots across doctors
+    path('api/slots/search/', EarliestFreeSlotsView.as_view(), name='slot-search'),
+
+    # Admin - Prometheus metrics
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+
     # Specialties
     path('api/specialties/', SpecialtyListView.as_view(), name='specialties-list'),
     path(
@@ -0,0 +1,19 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from ..metrics import exposition, registry
+from ..permissions import IsAdmin
+
+
+class MetricsView(APIView):
+    """
+    Prometheus scrape endpoint (text exposition format), admins only.
+    Aggregates all worker processes when METRICS['MULTIPROCESS_DIR'] is set.
+    """
+    permission_classes = [IsAdmin]
+    claims_user = True
+
+    def get(self, request):
+        return HttpResponse(
+            exposition(registry.collect()),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
@@ -9,6 +9,7 @@ from rest_framework.exceptions import PermissionDenied, NotFound
 
 from ..serializers.appointment_serializers import AppointmentSerializer
 from ..models.appointment import Appointment
+from ..identity import get_identity
 
 
 
@@ -17,17 +18,17 @@ class PatientAppointmentListCreateAPIView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role != "patient":
+        patient = get_identity(self.request).patient
+        if patient is None:
             raise PermissionDenied("Only patients can access their appointments")
-        return Appointment.objects.filter(patient__user=user).order_by('start_date_time')
+        return Appointment.objects.filter(patient=patient).order_by('start_date_time')
 
     def perform_create(self, serializer):
-        user = self.request.user
-        if user.role != "patient":
+        identity = get_identity(self.request)
+        if not identity.is_patient:
             raise PermissionDenied("Only patients can create appointments")
         
-        patient = getattr(user, 'patient', None)
+        patient = identity.patient
         if not patient:
             raise PermissionDenied("No patient profile found for this user")
         
@@ -41,10 +42,10 @@ class PatientAppointmentRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
     lookup_field = 'pk'
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role != "patient":
+        patient = get_identity(self.request).patient
+        if patient is None:
             raise PermissionDenied("Only patients can access their appointments")
-        return Appointment.objects.filter(patient__user=user)
+        return Appointment.objects.filter(patient=patient)
 
     def get_object(self):
         queryset = self.get_queryset()
@@ -1,13 +1,12 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from core.serializers.user_serializers import UserRegistrationSerializer
-from rest_framework_simplejwt.views import TokenObtainPairView
-from core.token_utils import MyTokenObtainPairSerializer
+from core.serializers.user_serializers import UserRegistrationSerializer, InviteAcceptSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from core.token_utils import MyTokenObtainPairSerializer, MyTokenRefreshSerializer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from core.token_utils import LogoutSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from core.token_utils import LogoutSerializer, FilteredRefreshToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 
 
@@ -15,6 +14,10 @@ class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
 
+class MyTokenRefreshView(TokenRefreshView):
+    serializer_class = MyTokenRefreshSerializer
+
+
 class UserRegistrationView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
@@ -36,6 +39,20 @@ class UserRegistrationView(generics.CreateAPIView):
         )
 
 
+class InviteAcceptView(APIView):
+    """
+    Let an imported user set their password from the emailed invite link.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = InviteAcceptSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response({"detail": "Password set."}, status=status.HTTP_200_OK)
+
+
 class LogoutView(APIView):
     """
     Blacklist the provided refresh token so it can't be used again.
@@ -48,7 +65,7 @@ class LogoutView(APIView):
         serializer.is_valid(raise_exception=True)
         refresh_token = serializer.validated_data["refresh"]
         try:
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
         except (TokenError, InvalidToken) as e:
             return Response(
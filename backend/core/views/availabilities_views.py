@@ -1,5 +1,6 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import datetime, timedelta
@@ -7,28 +8,39 @@ from ..models.availability import Availability
 from ..serializers.availability_serializers import (
     AvailabilitySerializer,
     AvailabilityCreateSerializer,
+    AvailabilityBulkCreateSerializer,
+    AvailabilityItemSerializer,
+    CalendarQuerySerializer,
     DoctorAvailabilityListSerializer
 )
+from ..services.availability_bulk import save_items
+from ..services.calendar import schedule_calendar
 from ..permissions import IsDoctor
+from ..pagination import AvailabilityCursorPagination
+from ..query_planner import QueryPlannerMixin
+from ..identity import get_identity
 
 
-class AvailabilityViewSet(viewsets.ModelViewSet):
+class AvailabilityViewSet(QueryPlannerMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing doctor availabilities
     - Doctors can CRUD their own availabilities
     - Patients can view availabilities (read-only)
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = AvailabilityCursorPagination
+    # Safe methods only; writes always go to the primary
+    read_replica = True
 
     def get_queryset(self):
-        user = self.request.user
+        identity = get_identity(self.request)
         
         # If doctor, show only their availabilities
-        if user.role == 'doctor':
-            return Availability.objects.filter(doctor=user.doctor)
+        if identity.is_doctor:
+            return Availability.objects.filter(doctor=identity.doctor)
         
         # If patient, show all future availabilities
-        elif user.role == 'patient':
+        elif identity.is_patient:
             return Availability.objects.filter(
                 date__gte=timezone.now().date()
             ).order_by('date', 'start_time')
@@ -38,7 +50,11 @@ class AvailabilityViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'create' or self.action == 'update' or self.action == 'partial_update':
             return AvailabilityCreateSerializer
-        elif self.action == 'list' and self.request.user.role == 'patient':
+        elif self.action == 'bulk':
+            return AvailabilityBulkCreateSerializer
+        elif self.action == 'list' and get_identity(self.request).is_patient:
+            return DoctorAvailabilityListSerializer
+        elif self.action in ('by_doctor', 'slots'):
             return DoctorAvailabilityListSerializer
         return AvailabilitySerializer
 
@@ -47,26 +63,59 @@ class AvailabilityViewSet(viewsets.ModelViewSet):
         Doctors can create/update/delete
         Patients can only view
         """
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'bulk', 'update', 'partial_update', 'destroy']:
             return [permissions.IsAuthenticated(), IsDoctor()]
         return [permissions.IsAuthenticated()]
 
     def perform_create(self, serializer):
         """Automatically assign the doctor when creating availability"""
-        serializer.save(doctor=self.request.user.doctor)
+        serializer.save(doctor=get_identity(self.request).doctor)
 
     def perform_update(self, serializer):
         """Ensure doctor can only update their own availability"""
-        if serializer.instance.doctor != self.request.user.doctor:
-            raise permissions.PermissionDenied("You can only update your own availability.")
+        if serializer.instance.doctor_id != get_identity(self.request).doctor.pk:
+            raise PermissionDenied("You can only update your own availability.")
         serializer.save()
 
     def perform_destroy(self, instance):
         """Ensure doctor can only delete their own availability"""
-        if instance.doctor != self.request.user.doctor:
-            raise permissions.PermissionDenied("You can only delete your own availability.")
+        if instance.doctor_id != get_identity(self.request).doctor.pk:
+            raise PermissionDenied("You can only delete your own availability.")
         instance.delete()
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create many availabilities at once
+        Body:
+        - items: [{date, start_time, end_time, slot_duration}], or
+        - template: [{weekday, start_time, end_time, slot_duration}] with start_date / end_date
+        - skip_invalid: create the valid items even if some fail (default false)
+        All items are checked against each other and the existing schedule
+        and written in the same transaction.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        doctor = get_identity(request).doctor
+
+        created, errors = save_items(doctor, items, serializer.validated_data['skip_invalid'])
+        error_list = [
+            {"index": i, "item": AvailabilityItemSerializer(items[i]).data, "errors": messages}
+            for i, messages in sorted(errors.items())
+        ]
+        if created is None:
+            return Response({"errors": error_list}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "created": len(created),
+                "availabilities": AvailabilitySerializer(created, many=True).data,
+                "errors": error_list,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=['get'])
     def my_schedule(self, request):
         """
@@ -75,13 +124,13 @@ class AvailabilityViewSet(viewsets.ModelViewSet):
         - start_date: filter from this date (YYYY-MM-DD)
         - end_date: filter until this date (YYYY-MM-DD)
         """
-        if request.user.role != 'doctor':
+        if not get_identity(request).is_doctor:
             return Response(
                 {"error": "Only doctors can access this endpoint"},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        queryset = self.get_queryset()
+        queryset = self.plan_queryset(self.get_queryset(), AvailabilitySerializer)
         
         # Filter by date range if provided
         start_date = request.query_params.get('start_date')
@@ -107,8 +156,43 @@ class AvailabilityViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        serializer = AvailabilitySerializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = AvailabilitySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Packed free/booked bitmaps of doctors' schedules (see core.services.calendar)
+        Query params:
+        - doctor_ids: optional comma separated doctor ids; defaults to the
+          doctor's own schedule, or every approved doctor for other users.
+          Only approved doctors are shown, apart from the caller's own schedule
+        - specialty: optional specialty id
+        - start_date / end_date: optional window (YYYY-MM-DD), at most 90 days
+        """
+        params = CalendarQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        identity = get_identity(request)
+        own_doctor_id = identity.doctor.pk if identity.is_doctor and identity.doctor is not None else None
+        doctor_ids = params.get('doctor_ids')
+        if not doctor_ids and own_doctor_id is not None:
+            doctor_ids = [own_doctor_id]
+        days = schedule_calendar(
+            params['start_date'],
+            params['end_date'],
+            doctor_ids=doctor_ids or None,
+            specialty_id=params.get('specialty'),
+            approved_only=True,
+            own_doctor_id=own_doctor_id,
+        )
+        return Response({
+            'start_date': params['start_date'],
+            'end_date': params['end_date'],
+            'days': days,
+        })
 
     @action(detail=False, methods=['get'])
     def by_doctor(self, request):
@@ -126,10 +210,10 @@ class AvailabilityViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        queryset = Availability.objects.filter(
+        queryset = self.plan_queryset(Availability.objects.filter(
             doctor_id=doctor_id,
             date__gte=timezone.now().date()
-        )
+        ))
 
         # Filter by specific date if provided
         date_param = request.query_params.get('date')
@@ -143,8 +227,9 @@ class AvailabilityViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        serializer = DoctorAvailabilityListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = DoctorAvailabilityListSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def slots(self, request, pk=None):
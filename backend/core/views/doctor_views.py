@@ -2,19 +2,23 @@ from rest_framework.views import APIView
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound
-from rest_framework.permissions import IsAuthenticated
-from ..models import Appointment
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from ..models import Appointment, ArchivedAppointment, Doctor
 from ..serializers.appointment_serializers import AppointmentSerializer
 from ..serializers.doctor_serializers import DoctorProfileSerializer
-from ..models.doctor import Doctor
+from ..pagination import RecentAppointmentCursorPagination
+from ..query_planner import QueryPlannerMixin
+from ..identity import get_identity
+from ..history import ArchivedHistoryMixin
 
 
 class DoctorDashboardView(APIView):
     permission_classes = [IsAuthenticated]
+    claims_user = True
 
     def get(self, request):
         user = request.user
-        if user.role != "doctor":
+        if not get_identity(request).is_doctor:
             return Response({"error": "You are not a doctor"}, status=403)
         return Response({"message": f"Welcome Dr. {user.username}"})
 
@@ -25,34 +29,48 @@ class DoctorRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        user = self.request.user
+        identity = get_identity(self.request)
 
-        if user.role != "doctor":
+        if not identity.is_doctor:
             raise PermissionDenied("Not a doctor")
 
-        try:
-            return Doctor.objects.get(user=user)
-        except Doctor.DoesNotExist:
+        # Loaded with the user, specialty included
+        if identity.doctor is None:
             raise NotFound("Doctor not found")
+        if self.request.method in SAFE_METHODS:
+            return identity.doctor
+        # Writes start from the row: the identity holds a cached copy,
+        # and saving it could undo changes made since (e.g. an approval)
+        return Doctor.objects.select_related('user', 'specialty').get(pk=identity.doctor.pk)
 
 
 class DoctorDashboardView(APIView):
     permission_classes = [IsAuthenticated]
+    claims_user = True
 
     def get(self, request):
         user = request.user
-        if user.role != "doctor":
+        if not get_identity(request).is_doctor:
             return Response({"error": "You are not a doctor"}, status=403)
         return Response({"message": f"Welcome Dr. {user.username}"})
     
-class DoctorAppointmentListView(generics.ListAPIView):
-    """Doctor can view their appointments"""
+class DoctorAppointmentListView(ArchivedHistoryMixin, QueryPlannerMixin, generics.ListAPIView):
+    """Doctor can view their appointments; `?include_archived=true` adds archived ones"""
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = RecentAppointmentCursorPagination
+    read_replica = True
     
     def get_queryset(self):
-        if self.request.user.role != 'doctor':
+        doctor = get_identity(self.request).doctor
+        if doctor is None:
             return Appointment.objects.none()
         return Appointment.objects.filter(
-            doctor=self.request.user.doctor
+            doctor=doctor
         ).order_by('-start_date_time')
+
+    def get_archived_queryset(self):
+        doctor = get_identity(self.request).doctor
+        if doctor is None:
+            return ArchivedAppointment.objects.none()
+        return ArchivedAppointment.objects.filter(doctor=doctor)
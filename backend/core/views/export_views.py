@@ -0,0 +1,46 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from ..identity import get_identity
+from ..serializers.appointment_serializers import AppointmentExportSerializer
+from ..services import appointment_export
+
+
+class AppointmentExportView(APIView):
+    """
+    Stream appointments as CSV or NDJSON.
+    Doctors get their own appointments; admins get everyone's.
+    Query params:
+    - export_format: csv (default) or ndjson
+    - doctor: doctor id (admins only)
+    - start_date / end_date: optional window (YYYY-MM-DD), inclusive
+    - include_archived: true to add archived appointments
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = AppointmentExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        identity = get_identity(request)
+        if identity.is_doctor and identity.doctor is not None:
+            doctor_id = identity.doctor.pk
+        elif identity.role == 'admin' or request.user.is_staff:
+            doctor_id = params.get('doctor')
+        else:
+            raise PermissionDenied("Only doctors and admins can export appointments.")
+
+        export_format = params['export_format']
+        rows = appointment_export.export_rows(
+            doctor_id, params.get('start_date'), params.get('end_date'), params['include_archived']
+        )
+        response = StreamingHttpResponse(
+            appointment_export.render(rows, export_format),
+            content_type=appointment_export.FORMATS[export_format],
+        )
+        filename = f"appointments-{timezone.localdate():%Y%m%d}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
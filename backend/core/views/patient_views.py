@@ -1,81 +1,114 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import generics, status
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, NotFound
 from ..serializers.appointment_serializers import AppointmentSerializer
 from ..models.appointment import Appointment
+from ..models.archived_appointment import ArchivedAppointment
 from ..serializers.doctor_serializers import DoctorListSerializer
 from ..models.doctor import Doctor
-from ..serializers.patient_serializers import PatientProfileSerializer
 from ..models.patient import Patient
+from ..serializers.patient_serializers import PatientProfileSerializer
+from ..pagination import AppointmentCursorPagination
+from ..services import directory_cache
+from ..query_planner import QueryPlannerMixin
+from ..identity import get_identity
+from ..db_router import use_primary
+from ..history import ArchivedHistoryMixin
 
 
 class PatientDashboardView(APIView):
     permission_classes = [IsAuthenticated]
+    claims_user = True
     
     def get(self, request):
         user = request.user
-        if user.role != 'patient':
+        if not get_identity(request).is_patient:
             return Response({"error": "You are not a patient"}, status=403)
         return Response({"message": f"Welcome {user.username}!"})
 
 
-class PatientAppointmentListCreateAPIView(generics.ListCreateAPIView):
+class PatientAppointmentListCreateAPIView(ArchivedHistoryMixin, QueryPlannerMixin, generics.ListCreateAPIView):
+    """Patient's appointments; `?include_archived=true` adds archived ones"""
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AppointmentCursorPagination
 
-    def get_queryset(self):
-        user = self.request.user
-        if user.role != "patient":
+    def get_patient(self):
+        patient = get_identity(self.request).patient
+        if patient is None:
             raise PermissionDenied("Only patients can access their appointments")
-        return Appointment.objects.filter(patient__user=user).order_by('start_date_time')
+        return patient
+
+    def get_queryset(self):
+        return Appointment.objects.filter(patient=self.get_patient()).order_by('start_date_time')
+
+    def get_archived_queryset(self):
+        return ArchivedAppointment.objects.filter(patient=self.get_patient())
 
     def perform_create(self, serializer):
-        user = self.request.user
-        if user.role != "patient":
+        identity = get_identity(self.request)
+        if not identity.is_patient:
             raise PermissionDenied("Only patients can create appointments")
         
-        # Get patient profile - check both possible related names
-        patient = None
-        if hasattr(user, 'patient_profile'):
-            patient = user.patient_profile
-        elif hasattr(user, 'patient'):
-            patient = user.patient
-        
-        if not patient:
+        if identity.patient is None:
             raise PermissionDenied("No patient profile found for this user")
         
         # Save with patient automatically set
-        serializer.save(patient=patient)
+        serializer.save(patient=identity.patient)
 
 
-class PatientAppointmentRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
+class PatientAppointmentRetrieveUpdateAPIView(QueryPlannerMixin, generics.RetrieveUpdateAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'pk'
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role != "patient":
+        patient = get_identity(self.request).patient
+        if patient is None:
             raise PermissionDenied("Only patients can access their appointments")
-        return Appointment.objects.filter(patient__user=user)
+        return Appointment.objects.filter(patient=patient)
 
     def get_object(self):
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         try:
             return queryset.get(pk=self.kwargs['pk'])
         except Appointment.DoesNotExist:
             raise NotFound("Appointment not found")
 
 
-class DoctorListView(generics.ListAPIView):
-    """List all approved doctors with proper serialization"""
+class DoctorListView(QueryPlannerMixin, generics.ListAPIView):
+    """
+    List all approved doctors with proper serialization.
+    The payload is cached per directory version and served with an ETag;
+    a matching If-None-Match gets a 304 without touching the database.
+    """
     serializer_class = DoctorListSerializer
     permission_classes = [IsAuthenticated]
+    claims_user = True
+    read_replica = True
     
     def get_queryset(self):
-        return Doctor.objects.filter(is_approved=True).select_related('user', 'specialty')
+        return Doctor.objects.filter(is_approved=True)
+
+    def list(self, request, *args, **kwargs):
+        version = directory_cache.get_version()
+        etag = directory_cache.get_etag(version)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        client_etags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if etag in client_etags or '*' in client_etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        def build():
+            # Cached under the new version for everyone: never from a lagging replica
+            with use_primary():
+                return self.get_serializer(self.filter_queryset(self.get_queryset()), many=True).data
+
+        payload = directory_cache.get_payload(version, build)
+        return Response(payload, headers=headers)
 
 
 class PatientRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
@@ -84,18 +117,14 @@ class PatientRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        user = self.request.user
+        identity = get_identity(self.request)
         
-        if user.role != "patient":
+        if not identity.is_patient:
             raise PermissionDenied("Not a patient")
         
-        try:
-            # Check both possible related names
-            if hasattr(user, 'patient_profile'):
-                return user.patient_profile
-            elif hasattr(user, 'patient'):
-                return user.patient
-            else:
-                raise Patient.DoesNotExist
-        except Patient.DoesNotExist:
-            raise NotFound("Patient profile not found")
\ No newline at end of file
+        if identity.patient is None:
+            raise NotFound("Patient profile not found")
+        if self.request.method in SAFE_METHODS:
+            return identity.patient
+        # Writes start from the row, not the identity's cached copy
+        return Patient.objects.select_related('user').get(pk=identity.patient.pk)
\ No newline at end of file
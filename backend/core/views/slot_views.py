@@ -0,0 +1,33 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from ..serializers.slot_serializers import FreeSlotSerializer, SlotSearchSerializer
+from ..services.slots import earliest_free_slots
+
+
+class EarliestFreeSlotsView(APIView):
+    """
+    Earliest free slots across doctors
+    Query params:
+    - specialty: optional specialty id
+    - doctor_ids: optional comma separated doctor ids
+    - start_date / end_date: optional window (YYYY-MM-DD), at most 90 days
+    - limit: number of slots to return (default 10, max 50)
+    """
+    permission_classes = [IsAuthenticated]
+    claims_user = True
+    read_replica = True
+
+    def get(self, request):
+        params = SlotSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        slots = earliest_free_slots(
+            params['limit'],
+            params['start_date'],
+            params['end_date'],
+            specialty_id=params.get('specialty'),
+            doctor_ids=params.get('doctor_ids'),
+        )
+        return Response(FreeSlotSerializer(slots, many=True).data)
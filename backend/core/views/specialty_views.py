@@ -2,8 +2,11 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from ..models import Specialty
 from ..serializers.specialty_serializers import SpecialtySerializer
+from ..query_planner import QueryPlannerMixin
 
-class SpecialtyListView(generics.ListAPIView):
+class SpecialtyListView(QueryPlannerMixin, generics.ListAPIView):
     queryset = Specialty.objects.all()
     serializer_class = SpecialtySerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+    claims_user = True
+    read_replica = True
\ No newline at end of file
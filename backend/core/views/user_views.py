@@ -3,9 +3,10 @@
 from rest_framework import generics, permissions
 from ..models.user import User
 from ..serializers.user_serializers import UserRegistrationSerializer
+from ..query_planner import QueryPlannerMixin
 
 
-class UserListCreateView(generics.ListCreateAPIView):
+class UserListCreateView(QueryPlannerMixin, generics.ListCreateAPIView):
     """
     GET: List all users
     POST: Create a new user
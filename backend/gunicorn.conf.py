@@ -0,0 +1,8 @@
+# gunicorn settings, loaded from the working directory: cd backend && gunicorn medical_backend.wsgi
+
+
+def worker_exit(server, worker):
+    # Write this worker's last metrics for the multiprocess scrape (core.metrics)
+    from core.metrics import registry
+
+    registry.flush(force=True)
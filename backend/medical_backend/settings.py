@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.metrics.MetricsMiddleware',
+    'core.middleware.profiling.SQLProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_router.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'medical_backend.urls'
@@ -130,13 +134,59 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# Users resolved by core.authentication are cached per process for TTL_SECONDS
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL_SECONDS': 60,
+}
+
+# Refresh tokens are checked against an in-memory Bloom filter of the
+# blacklist first; run `python manage.py purge_expired_tokens` periodically
+TOKEN_BLACKLIST_FILTER = {
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.001,
+    'PURGE_BATCH_SIZE': 1000,
+    # Other workers' logouts reach this worker's filter within this many seconds
+    'SYNC_SECONDS': 1,
+    'SYNC_OVERLAP_SECONDS': 300,
+}
+
+# Use a shared backend (Redis / Memcached) in production so every worker
+# sees the same doctor directory version (system check core.W002)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+DOCTOR_DIRECTORY_CACHE_TIMEOUT = 3600
+# With a per-process cache, how stale another worker's directory may get
+DOCTOR_DIRECTORY_LOCAL_CACHE_TIMEOUT = 5
+
+# Per-request SQL profiling (core.middleware.profiling); run with SQL_PROFILING=1
+SQL_PROFILING = {
+    'ENABLED': os.environ.get('SQL_PROFILING') == '1',
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'RESPONSE_HEADERS': True,
+}
+
+# Prometheus metrics at /api/metrics/ (core.metrics). Under gunicorn point
+# METRICS_DIR at a directory shared by the workers and emptied on deploy.
+METRICS = {
+    'ENABLED': True,
+    'MULTIPROCESS_DIR': os.environ.get('METRICS_DIR') or None,
+}
+
+# Keyset pagination for list endpoints (core.pagination)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 AUTH_USER_MODEL = 'core.User'
@@ -144,10 +194,60 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Take the write lock at BEGIN, so busy_timeout applies. The wait
+            # is SQLITE['BUSY_TIMEOUT_MS'] (core.sqlite), not a 'timeout' here
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Read replica; locally a copy of db.sqlite3 stands in for it:
+    #   cp db.sqlite3 db.replica.sqlite3 && DB_READ_REPLICAS=replica python manage.py runserver
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_REPLICA_NAME', BASE_DIR / 'db.replica.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Safe requests to views with `read_replica = True` read from these aliases.
+# With several workers, CACHES must be shared: clients are pinned to the
+# primary after a write through the cache (check core.W001)
+READ_REPLICAS = {
+    'ALIASES': [alias for alias in os.environ.get('DB_READ_REPLICAS', '').split(',') if alias],
+    'PIN_SECONDS': 5,
+}
+
+# `manage.py archive_appointments` moves appointments older than this to ArchivedAppointment
+APPOINTMENT_ARCHIVE = {
+    'HORIZON_DAYS': 365,
+    'BATCH_SIZE': 1000,
+}
+
+# Connection pragmas for SQLite (core.sqlite)
+SQLITE = {
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'BUSY_TIMEOUT_MS': 5000,
+    # Serialize bookings through one writer thread per worker process
+    'WRITE_QUEUE': os.environ.get('SQLITE_WRITE_QUEUE') == '1',
 }
 # settings.py (development)
+# Mail goes through the outbox; run `python manage.py send_outbox --loop` to deliver it
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # OR to file:
 # EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
-# EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
\ No newline at end of file
+# EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# `python manage.py import_users`; INVITE_URL is the frontend page that
+# posts uid, token and the new password to api/invite/accept/
+USER_IMPORT = {
+    'BATCH_SIZE': 1000,
+    'INVITE_URL': 'http://localhost:3000/invite/{uid}/{token}/',
+}
+
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+}
@@ -24,6 +24,9 @@ const AvailabilityList = ({ refresh }: AvailabilityListProps) => {
   const [availabilities, setAvailabilities] = useState<Availability[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
+  // Cursor URL of the next page, null on the last one
+  const [next, setNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchAvailabilities();
@@ -35,7 +38,8 @@ const AvailabilityList = ({ refresh }: AvailabilityListProps) => {
       const response = await axiosClient.get("/api/availabilities/", {
         headers: { Authorization: `Bearer ${token}` },
       });
-      setAvailabilities(response.data);
+      setAvailabilities(response.data.results);
+      setNext(response.data.next);
       setError("");
     } catch (err: any) {
       setError("Failed to load availabilities");
@@ -45,6 +49,24 @@ const AvailabilityList = ({ refresh }: AvailabilityListProps) => {
     }
   };
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const token = localStorage.getItem("access_token");
+      const response = await axiosClient.get(next, {
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      setAvailabilities((prev) => [...prev, ...response.data.results]);
+      setNext(response.data.next);
+    } catch (err: any) {
+      window.alert("Failed to load more availabilities");
+      console.error(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id: number) => {
     if (!window.confirm("Are you sure you want to delete this availability?")) {
       return;
@@ -129,6 +151,17 @@ const AvailabilityList = ({ refresh }: AvailabilityListProps) => {
           </div>
         </div>
       ))}
+      {next && (
+        <div className="text-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-4 py-2 bg-gray-200 text-gray-700 rounded hover:bg-gray-300 transition disabled:opacity-50"
+          >
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -13,6 +13,9 @@ const DoctorAppointmentsPage = () => {
   const navigate = useNavigate();
   const [appointments, setAppointments] = useState<Appointment[]>([]);
   const [loading, setLoading] = useState(true);
+  // Cursor URL of the next page, null on the last one
+  const [next, setNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchAppointments();
@@ -24,7 +27,8 @@ const DoctorAppointmentsPage = () => {
       const response = await axiosClient.get('/api/doctor/appointments/', {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setAppointments(response.data);
+      setAppointments(response.data.results);
+      setNext(response.data.next);
     // eslint-disable-next-line @typescript-eslint/no-unused-vars
     } catch (err) {
       console.error('Failed to load appointments');
@@ -33,6 +37,24 @@ const DoctorAppointmentsPage = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const token = localStorage.getItem('access_token');
+      const response = await axiosClient.get(next, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setAppointments(prev => [...prev, ...response.data.results]);
+      setNext(response.data.next);
+    // eslint-disable-next-line @typescript-eslint/no-unused-vars
+    } catch (err) {
+      console.error('Failed to load more appointments');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return <div className="max-w-6xl mx-auto p-6">Loading...</div>;
   }
@@ -64,6 +86,17 @@ const DoctorAppointmentsPage = () => {
               </p>
             </div>
           ))}
+          {next && (
+            <div className="text-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 bg-gray-200 text-gray-700 rounded hover:bg-gray-300 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -33,6 +33,9 @@ const BookAppointmentPage = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [initialLoading, setInitialLoading] = useState(true);
+  // Cursor URL of the next page of dates, null on the last one
+  const [next, setNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchDoctor();
@@ -65,9 +68,10 @@ const BookAppointmentPage = () => {
         { headers: { Authorization: `Bearer ${token}` } }
       );
       
-      setAvailabilities(response.data);
+      setAvailabilities(response.data.results);
+      setNext(response.data.next);
       
-      if (response.data.length === 0) {
+      if (response.data.results.length === 0) {
         setError('This doctor has no available slots at the moment.');
       }
     } catch (err: any) {
@@ -78,6 +82,23 @@ const BookAppointmentPage = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const token = localStorage.getItem('access_token');
+      const response = await axiosClient.get(next, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setAvailabilities(prev => [...prev, ...response.data.results]);
+      setNext(response.data.next);
+    } catch (err: any) {
+      console.error('Failed to load more availabilities:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const selectedAvailability = availabilities.find(a => a.date === selectedDate);
 
   const handleBooking = async () => {
@@ -247,6 +268,17 @@ const BookAppointmentPage = () => {
               </button>
             ))}
           </div>
+          {next && (
+            <div className="text-center mb-6">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 bg-gray-200 text-gray-700 rounded hover:bg-gray-300 transition disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'More dates'}
+              </button>
+            </div>
+          )}
 
           {selectedAvailability && (
             <>
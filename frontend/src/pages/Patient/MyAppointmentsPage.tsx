@@ -15,6 +15,9 @@ const MyAppointmentsPage = () => {
   const navigate = useNavigate();
   const [appointments, setAppointments] = useState<Appointment[]>([]);
   const [loading, setLoading] = useState(true);
+  // Cursor URL of the next page, null on the last one
+  const [next, setNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchAppointments();
@@ -26,7 +29,8 @@ const MyAppointmentsPage = () => {
       const response = await axiosClient.get('/api/patient/appointments/', {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setAppointments(response.data);
+      setAppointments(response.data.results);
+      setNext(response.data.next);
     // eslint-disable-next-line @typescript-eslint/no-unused-vars
     } catch (err) {
       console.error('Failed to load appointments');
@@ -35,6 +39,24 @@ const MyAppointmentsPage = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const token = localStorage.getItem('access_token');
+      const response = await axiosClient.get(next, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setAppointments(prev => [...prev, ...response.data.results]);
+      setNext(response.data.next);
+    // eslint-disable-next-line @typescript-eslint/no-unused-vars
+    } catch (err) {
+      console.error('Failed to load more appointments');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCancel = async (id: number) => {
     if (!confirm('Cancel this appointment?')) return;
 
@@ -97,6 +119,17 @@ const MyAppointmentsPage = () => {
               </div>
             </div>
           ))}
+          {next && (
+            <div className="text-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 bg-gray-200 text-gray-700 rounded hover:bg-gray-300 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>